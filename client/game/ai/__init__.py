@@ -6,4 +6,5 @@ from .behavior_tree import BehaviorTree, SequenceNode, SelectorNode, ActionNode,
 from .ai_controller import AIController
 from .states.wander_state import WanderState
 from .states.chase_state import ChaseState
-from .states.idle_state import IdleState
\ No newline at end of file
+from .states.idle_state import IdleState
+from .states.flee_state import FleeState
\ No newline at end of file
@@ -1,22 +1,43 @@
 """
 Controlador de IA - gerencia o comportamento de entidades não jogáveis
 """
-from .behavior_tree import BehaviorTree, SequenceNode, SelectorNode, ActionNode, ConditionNode
+from .behavior_tree import BehaviorTree, SequenceNode, SelectorNode, ActionNode, ConditionNode, NodeStatus
+from .states.idle_state import IdleState
+from .states.wander_state import WanderState
+from .states.chase_state import ChaseState
+from .states.flee_state import FleeState
 from ..core.entity_system import EntitySystem
 
+# Até este número de jogadores, comparar com cada um é mais barato que varrer as
+# células do índice espacial (que podem estar cheias de outros inimigos)
+DIRECT_PLAYER_CHECK_LIMIT = 16
+# Fração da vida máxima abaixo da qual a entidade foge do jogador
+FLEE_HEALTH_FRACTION = 0.25
+
 class AIController:
     """
     Controlador de IA para entidades não jogáveis
     Utiliza árvore de comportamento para tomar decisões
     """
     
-    def __init__(self):
+    def __init__(self, sight_range: float = 200.0):
+        # Distância máxima em que a entidade enxerga o jogador
+        self.sight_range = sight_range
         # Árvore de comportamento da entidade
         self.behavior_tree = self.create_behavior_tree()
         # Estado atual da IA
         self.current_state = "idle"
         # Timer para troca de estados
         self.state_timer = 0
+        # Estados disponíveis (nome -> estado)
+        self.states = {
+            "idle": IdleState(),
+            "wander": WanderState(),
+            "chase": ChaseState(),
+            "flee": FleeState()
+        }
+        # Indica se o estado atual já recebeu enter()
+        self.state_entered = False
         
     def create_behavior_tree(self) -> BehaviorTree:
         """
@@ -35,7 +56,7 @@ class AIController:
         idle_action = ActionNode(self.idle)
         
         # Comportamento de fuga (prioridade máxima)
-        flee_behavior = SequenceNode([is_low_health, flee_action])
+        flee_behavior = SequenceNode([is_low_health, can_see_player, flee_action])
         
         # Comportamento de perseguição
         chase_behavior = SequenceNode([can_see_player, chase_action])
@@ -56,48 +77,94 @@ class AIController:
         
         return BehaviorTree(root_node)
         
-    def update(self, dt: float, entity_system: EntitySystem) -> None:
+    def update(self, dt: float, entity_system: EntitySystem, entity_id: int = None) -> None:
         """
-        Atualiza o comportamento da IA
+        Atualiza o comportamento da IA: a árvore escolhe o comportamento a cada passo e
+        as ações executam o estado correspondente
         dt: Tempo decorrido desde a última atualização
         entity_system: Referência ao sistema de entidades
+        entity_id: ID da entidade controlada (sem ele não há o que atualizar)
+        """
+        if entity_id is None:
+            return
+        self.state_timer += dt
+        self.behavior_tree.execute(entity_id, entity_system, dt)
+        
+    def run_state(self, state_name: str, entity_id: int, entity_system: EntitySystem, dt: float) -> NodeStatus:
+        """Passa para um estado (se ainda não estiver nele) e o atualiza"""
+        if not self.state_entered:
+            self.current_state = state_name
+            self.states[state_name].enter(entity_id, entity_system)
+            self.state_entered = True
+        elif state_name != self.current_state:
+            self.change_state(state_name, entity_id, entity_system)
+        self.states[state_name].update(entity_id, entity_system, dt)
+        # A árvore é avaliada de novo a cada passo (as prioridades valem imediatamente)
+        return NodeStatus.SUCCESS
+        
+    def change_state(self, state_name: str, entity_id: int, entity_system: EntitySystem) -> None:
+        """
+        Troca o estado atual da IA, chamando exit() do anterior e enter() do novo
         """
-        # Executa a árvore de comportamento
-        # Em uma implementação real, precisaríamos da entity_id
-        # status = self.behavior_tree.execute(entity_id, entity_system, dt)
-        pass
+        self.states[self.current_state].exit(entity_id, entity_system)
+        if state_name == "chase":
+            # Escolhe novamente o jogador mais próximo a cada perseguição
+            self.states["chase"].target_id = None
+        self.current_state = state_name
+        self.state_timer = 0
+        self.states[state_name].enter(entity_id, entity_system)
         
     def can_see_player(self, entity_id, entity_system, dt) -> bool:
-        """Verifica se a entidade pode ver o jogador"""
-        # Em uma implementação real, verificaria visão e distância
+        """Verifica se há um jogador dentro do alcance de visão da entidade"""
+        movement = entity_system.get_component(entity_id, "MovementComponent")
+        players = entity_system.get_entities_with_tag("player")
+        if movement is None or not players:
+            return False
+            
+        # Com muitos jogadores, consulta apenas as células próximas do índice espacial
+        if entity_system.spatial_index is not None and len(players) > DIRECT_PLAYER_CHECK_LIMIT:
+            return entity_system.spatial_index.nearest(
+                movement.x, movement.y, self.sight_range, predicate=players.__contains__
+            ) is not None
+            
+        # Caso contrário, compara distâncias ao quadrado com cada jogador
+        sight_squared = self.sight_range * self.sight_range
+        for player_id in players:
+            position = entity_system.get_position(player_id)
+            if position is None:
+                continue
+            dx = position[0] - movement.x
+            dy = position[1] - movement.y
+            if dx * dx + dy * dy <= sight_squared:
+                return True
         return False
         
     def is_low_health(self, entity_id, entity_system, dt) -> bool:
         """Verifica se a entidade está com pouca saúde"""
-        # Em uma implementação real, verificaria o componente de saúde
-        return False
+        health = entity_system.get_component(entity_id, "HealthComponent")
+        return health is not None and health.current_health <= health.max_health * FLEE_HEALTH_FRACTION
         
     def is_idle_time_over(self, entity_id, entity_system, dt) -> bool:
-        """Verifica se o tempo ocioso acabou"""
-        # Em uma implementação real, usaria um timer
-        return True
-        
-    def wander(self, entity_id, entity_system, dt) -> bool:
+        """Verifica se a entidade deve vagar: o tempo ocioso acabou ou ainda está vagando"""
+        if not self.state_entered:
+            return False
+        finished = self.states[self.current_state].is_finished()
+        if self.current_state == "idle":
+            return finished
+        return self.current_state == "wander" and not finished
+        
+    def wander(self, entity_id, entity_system, dt) -> NodeStatus:
         """Ação de vagar aleatoriamente"""
-        # Em uma implementação real, implementaria movimento aleatório
-        return True
+        return self.run_state("wander", entity_id, entity_system, dt)
         
-    def chase(self, entity_id, entity_system, dt) -> bool:
+    def chase(self, entity_id, entity_system, dt) -> NodeStatus:
         """Ação de perseguir o jogador"""
-        # Em uma implementação real, implementaria perseguição
-        return True
+        return self.run_state("chase", entity_id, entity_system, dt)
         
-    def flee(self, entity_id, entity_system, dt) -> bool:
+    def flee(self, entity_id, entity_system, dt) -> NodeStatus:
         """Ação de fugir do jogador"""
-        # Em uma implementação real, implementaria fuga
-        return True
+        return self.run_state("flee", entity_id, entity_system, dt)
         
-    def idle(self, entity_id, entity_system, dt) -> bool:
+    def idle(self, entity_id, entity_system, dt) -> NodeStatus:
         """Ação de ficar ocioso"""
-        # Em uma implementação real, implementaria comportamento ocioso
-        return True
\ No newline at end of file
+        return self.run_state("idle", entity_id, entity_system, dt)
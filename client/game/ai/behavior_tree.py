@@ -10,6 +10,11 @@ class NodeStatus(Enum):
     FAILURE = 2
     RUNNING = 3
 
+# Atalhos dos estados (comparados por identidade nos nós compostos)
+SUCCESS = NodeStatus.SUCCESS
+FAILURE = NodeStatus.FAILURE
+RUNNING = NodeStatus.RUNNING
+
 class BehaviorNode(ABC):
     """Classe abstrata base para todos os nós da árvore de comportamento"""
     
@@ -37,24 +42,27 @@ class SequenceNode(BehaviorNode):
         
     def execute(self, entity_id, entity_system, dt: float) -> NodeStatus:
         # Executa cada filho em sequência
-        while self.current_child_index < len(self.children):
-            child = self.children[self.current_child_index]
-            status = child.execute(entity_id, entity_system, dt)
+        # (índice em variável local: a árvore roda para cada entidade a cada passo)
+        children = self.children
+        index = self.current_child_index
+        while index < len(children):
+            status = children[index].execute(entity_id, entity_system, dt)
             
-            if status == NodeStatus.FAILURE:
+            if status is FAILURE:
                 # Reinicia e retorna falha
                 self.current_child_index = 0
-                return NodeStatus.FAILURE
-            elif status == NodeStatus.RUNNING:
+                return FAILURE
+            elif status is RUNNING:
                 # Continua executando este filho na próxima atualização
-                return NodeStatus.RUNNING
-            elif status == NodeStatus.SUCCESS:
+                self.current_child_index = index
+                return RUNNING
+            elif status is SUCCESS:
                 # Avança para o próximo filho
-                self.current_child_index += 1
+                index += 1
                 
         # Todos os filhos foram executados com sucesso
         self.current_child_index = 0
-        return NodeStatus.SUCCESS
+        return SUCCESS
 
 class SelectorNode(BehaviorNode):
     """
@@ -72,24 +80,26 @@ class SelectorNode(BehaviorNode):
         
     def execute(self, entity_id, entity_system, dt: float) -> NodeStatus:
         # Executa cada filho até que um tenha sucesso
-        while self.current_child_index < len(self.children):
-            child = self.children[self.current_child_index]
-            status = child.execute(entity_id, entity_system, dt)
+        children = self.children
+        index = self.current_child_index
+        while index < len(children):
+            status = children[index].execute(entity_id, entity_system, dt)
             
-            if status == NodeStatus.SUCCESS:
+            if status is SUCCESS:
                 # Reinicia e retorna sucesso
                 self.current_child_index = 0
-                return NodeStatus.SUCCESS
-            elif status == NodeStatus.RUNNING:
+                return SUCCESS
+            elif status is RUNNING:
                 # Continua executando este filho na próxima atualização
-                return NodeStatus.RUNNING
-            elif status == NodeStatus.FAILURE:
+                self.current_child_index = index
+                return RUNNING
+            elif status is FAILURE:
                 # Avança para o próximo filho
-                self.current_child_index += 1
+                index += 1
                 
         # Todos os filhos falharam
         self.current_child_index = 0
-        return NodeStatus.FAILURE
+        return FAILURE
 
 class ActionNode(BehaviorNode):
     """
@@ -117,9 +127,9 @@ class ConditionNode(BehaviorNode):
     def execute(self, entity_id, entity_system, dt: float) -> NodeStatus:
         # Verifica a condição
         if self.condition_func(entity_id, entity_system, dt):
-            return NodeStatus.SUCCESS
+            return SUCCESS
         else:
-            return NodeStatus.FAILURE
+            return FAILURE
 
 class BehaviorTree:
     """
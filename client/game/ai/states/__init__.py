@@ -4,4 +4,5 @@ Estados de IA - diferentes comportamentos para entidades controladas por IA
 # Expõe os estados de IA
 from .wander_state import WanderState
 from .chase_state import ChaseState
-from .idle_state import IdleState
\ No newline at end of file
+from .idle_state import IdleState
+from .flee_state import FleeState
\ No newline at end of file
@@ -8,7 +8,7 @@ class ChaseState:
     Estado de perseguição - move a entidade em direção a um alvo
     """
     
-    def __init__(self, target_id: str = None):
+    def __init__(self, target_id: int = None):
         # ID da entidade alvo
         self.target_id = target_id
         # Distância mínima para manter do alvo
@@ -18,7 +18,7 @@ class ChaseState:
         """Chamado quando o estado é ativado"""
         # Se nenhum alvo foi especificado, tenta encontrar o jogador
         if self.target_id is None:
-            self.target_id = self.find_player(entity_system)
+            self.target_id = self.find_player(entity_system, entity_id)
             
     def exit(self, entity_id, entity_system):
         """Chamado quando o estado é desativado"""
@@ -32,6 +32,12 @@ class ChaseState:
         """Atualiza o estado"""
         if self.target_id is None:
             return  # Não há alvo para perseguir
+
+        # O alvo pode ter sido removido (ex: jogador desconectado): procura outro
+        if not entity_system.is_alive(self.target_id):
+            self.target_id = self.find_player(entity_system, entity_id)
+            if self.target_id is None:
+                return
             
         # Obtém a posição do alvo
         target_movement = entity_system.get_component(self.target_id, "MovementComponent")
@@ -63,12 +69,27 @@ class ChaseState:
         movement.velocity_x = dx * movement.speed
         movement.velocity_y = dy * movement.speed
         
-    def find_player(self, entity_system) -> str:
+    def is_finished(self) -> bool:
+        """A perseguição dura enquanto a árvore de comportamento a mantiver"""
+        return False
+        
+    @staticmethod
+    def find_player(entity_system, entity_id: int = None, search_radius: float = 1000.0) -> int:
         """
         Encontra o ID do jogador
-        Retorna o ID da primeira entidade com tag "player", ou None se não encontrar
+        Com índice espacial e entity_id informado, retorna o jogador mais próximo
+        dentro de search_radius; caso contrário, a primeira entidade com tag "player"
+        Retorna None se não encontrar
         """
         players = entity_system.get_entities_with_tag("player")
-        if players:
-            return next(iter(players))  # Retorna o primeiro jogador
-        return None
\ No newline at end of file
+        if not players:
+            return None
+            
+        position = entity_system.get_position(entity_id) if entity_id is not None else None
+        if position is not None and entity_system.spatial_index is not None:
+            nearest = entity_system.spatial_index.nearest(
+                position[0], position[1], search_radius, predicate=players.__contains__
+            )
+            if nearest is not None:
+                return nearest
+        return next(iter(players))  # Retorna o primeiro jogador
\ No newline at end of file
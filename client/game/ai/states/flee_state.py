@@ -0,0 +1,55 @@
+"""
+Estado de fuga - faz a entidade se afastar de uma ameaça (geralmente o jogador)
+"""
+from ...core.entity_system import EntitySystem
+from .chase_state import ChaseState
+
+class FleeState:
+    """
+    Estado de fuga - move a entidade na direção oposta à do jogador mais próximo
+    """
+
+    def __init__(self):
+        # ID da entidade da qual foge
+        self.threat_id = None
+
+    def enter(self, entity_id, entity_system):
+        """Chamado quando o estado é ativado"""
+        # Foge do jogador mais próximo (mesma busca da perseguição)
+        self.threat_id = ChaseState.find_player(entity_system, entity_id)
+
+    def exit(self, entity_id, entity_system):
+        """Chamado quando o estado é desativado"""
+        # Para o movimento
+        movement = entity_system.get_component(entity_id, "MovementComponent")
+        if movement:
+            movement.velocity_x = 0
+            movement.velocity_y = 0
+        self.threat_id = None
+
+    def update(self, entity_id, entity_system, dt):
+        """Atualiza o estado"""
+        # A ameaça pode ter sido removida (ex: jogador desconectado): procura outra
+        if self.threat_id is None or not entity_system.is_alive(self.threat_id):
+            self.threat_id = ChaseState.find_player(entity_system, entity_id)
+            if self.threat_id is None:
+                return
+
+        threat = entity_system.get_position(self.threat_id)
+        movement = entity_system.get_component(entity_id, "MovementComponent")
+        if threat is None or movement is None:
+            return
+
+        # Direção oposta à ameaça
+        dx = movement.x - threat[0]
+        dy = movement.y - threat[1]
+        distance = (dx**2 + dy**2)**0.5
+        if distance == 0:
+            dx, distance = 1.0, 1.0
+
+        movement.velocity_x = dx / distance * movement.speed
+        movement.velocity_y = dy / distance * movement.speed
+
+    def is_finished(self) -> bool:
+        """A fuga dura enquanto a árvore de comportamento a mantiver"""
+        return False
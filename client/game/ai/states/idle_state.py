@@ -48,4 +48,8 @@ class IdleState:
             pass
             
         # Em um estado ocioso, a entidade pode fazer animações ou ações passivas
-        # Por exemplo, piscar ou olhar around
\ No newline at end of file
+        # Por exemplo, piscar ou olhar around
+        
+    def is_finished(self) -> bool:
+        """Retorna True quando a duração do estado ocioso terminou"""
+        return self.timer >= self.current_duration
\ No newline at end of file
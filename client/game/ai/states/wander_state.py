@@ -0,0 +1,75 @@
+"""
+Estado de vagar - entidade anda aleatoriamente pelos arredores
+"""
+import random
+from ...core.entity_system import EntitySystem
+from ...utils.helpers import Helpers
+
+class WanderState:
+    """
+    Estado de vagar - move a entidade até pontos aleatórios próximos
+    """
+    
+    def __init__(self, wander_radius: float = 100.0, min_duration: float = 2.0, max_duration: float = 4.0):
+        # Distância máxima do ponto de destino em relação à posição atual
+        self.wander_radius = wander_radius
+        # Duração mínima do estado (segundos)
+        self.min_duration = min_duration
+        # Duração máxima do estado (segundos)
+        self.max_duration = max_duration
+        # Distância a partir da qual o destino é considerado alcançado
+        self.arrive_distance = 5.0
+        # Ponto de destino atual
+        self.target_x = 0.0
+        self.target_y = 0.0
+        # Timer para trocar de estado
+        self.timer = 0
+        # Duração atual do estado
+        self.current_duration = 0
+        
+    def enter(self, entity_id, entity_system):
+        """Chamado quando o estado é ativado"""
+        # Define uma duração aleatória para vagar
+        self.current_duration = random.uniform(self.min_duration, self.max_duration)
+        self.timer = 0
+        
+        # Escolhe um ponto aleatório ao redor da posição atual
+        movement = entity_system.get_component(entity_id, "MovementComponent")
+        if movement:
+            self.target_x, self.target_y = Helpers.random_point_in_circle(movement.x, movement.y, self.wander_radius)
+            
+    def exit(self, entity_id, entity_system):
+        """Chamado quando o estado é desativado"""
+        # Para o movimento
+        movement = entity_system.get_component(entity_id, "MovementComponent")
+        if movement:
+            movement.velocity_x = 0
+            movement.velocity_y = 0
+            
+    def update(self, entity_id, entity_system, dt):
+        """Atualiza o estado"""
+        # Atualiza o timer
+        self.timer += dt
+        
+        movement = entity_system.get_component(entity_id, "MovementComponent")
+        if movement is None:
+            return  # Entidade não tem componente de movimento
+            
+        # Calcula a direção até o destino
+        dx = self.target_x - movement.x
+        dy = self.target_y - movement.y
+        distance = (dx**2 + dy**2)**0.5
+        
+        # Para ao chegar no destino
+        if distance < self.arrive_distance:
+            movement.velocity_x = 0
+            movement.velocity_y = 0
+            return
+            
+        # Move em direção ao destino
+        movement.velocity_x = dx / distance * movement.speed
+        movement.velocity_y = dy / distance * movement.speed
+        
+    def is_finished(self) -> bool:
+        """Retorna True quando a duração do estado terminou"""
+        return self.timer >= self.current_duration
@@ -30,7 +30,7 @@ class CombatComponent:
         current_time = time.time()
         return current_time - self.last_attack_time >= self.attack_cooldown
         
-    def attack(self, target_x: float, target_y: float, entity_system, attacker_id: str) -> bool:
+    def attack(self, target_x: float, target_y: float, entity_system, attacker_id: int) -> bool:
         """
         Executa um ataque em uma posição-alvo
         target_x, target_y: Posição do alvo
@@ -57,7 +57,7 @@ class CombatComponent:
                 
         return False
         
-    def find_target_in_range(self, target_x: float, target_y: float, entity_system, exclude_id: str) -> Optional[str]:
+    def find_target_in_range(self, target_x: float, target_y: float, entity_system, exclude_id: int) -> Optional[int]:
         """
         Encontra uma entidade dentro do alcance do ataque
         target_x, target_y: Posição do alvo
@@ -65,22 +65,27 @@ class CombatComponent:
         exclude_id: ID da entidade a excluir (normalmente o atacante)
         Retorna o ID da entidade atingida, ou None se nenhuma for atingida
         """
-        # Itera por todas as entidades que têm componente de saúde
-        for entity_id in entity_system.get_entities_with_component("HealthComponent"):
+        # Com índice espacial, procura apenas nas células próximas ao alvo
+        if entity_system.spatial_index is not None:
+            damageable = entity_system.components.get("HealthComponent", {})
+            return entity_system.spatial_index.nearest(
+                target_x, target_y, self.attack_range,
+                predicate=damageable.__contains__, exclude=exclude_id
+            )
+            
+        # Itera pelas entidades que têm saúde e posição (consulta em cache)
+        for entity_id, (health, movement) in entity_system.query("HealthComponent", "MovementComponent"):
             if entity_id == exclude_id:
                 continue  # Pula o atacante
                 
-            # Obtém componente de movimento para verificar a posição
-            movement = entity_system.get_component(entity_id, "MovementComponent")
-            if movement:
-                # Calcula a distância até o alvo
-                dx = movement.x - target_x
-                dy = movement.y - target_y
-                distance = (dx**2 + dy**2)**0.5
-                
-                # Verifica se está dentro do alcance
-                if distance <= self.attack_range:
-                    return entity_id
+            # Calcula a distância até o alvo
+            dx = movement.x - target_x
+            dy = movement.y - target_y
+            distance = (dx**2 + dy**2)**0.5
+            
+            # Verifica se está dentro do alcance
+            if distance <= self.attack_range:
+                return entity_id
                     
         return None
         
@@ -9,6 +9,9 @@ class InventoryComponent:
     Permite coletar, armazenar e usar itens
     """
     
+    # Métodos que alteram os dicionários internos (usados pelo rastreamento de mudanças)
+    tracked_methods = ("add_item", "remove_item", "equip_item", "unequip_item")
+    
     def __init__(self, capacity: int = 20):
         # Capacidade máxima do inventário
         self.capacity = capacity
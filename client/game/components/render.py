@@ -10,7 +10,11 @@ class RenderComponent:
     Controla sprites, animações e efeitos visuais
     """
     
-    def __init__(self, sprite_path: Optional[str] = None, width: int = 32, height: int = 32, color: tuple = (255, 0, 0)):
+    def __init__(self, sprite_path: Optional[str] = None, width: int = 32, height: int = 32, color: tuple = (255, 0, 0),
+                 load_sprite: bool = True):
+        """
+        load_sprite: Se False, o sprite não é carregado do disco (mundos headless, sem display)
+        """
         # Caminho para o sprite (None para usar cor sólida)
         self.sprite_path = sprite_path
         # Dimensões do sprite
@@ -28,7 +32,7 @@ class RenderComponent:
         self.facing = "right"
         
         # Carrega o sprite se um caminho foi fornecido
-        if sprite_path:
+        if sprite_path and load_sprite:
             self.load_sprite(sprite_path)
             
     def load_sprite(self, sprite_path: str) -> bool:
@@ -38,7 +42,9 @@ class RenderComponent:
         Retorna True se o sprite foi carregado com sucesso
         """
         try:
-            self.sprite = pygame.image.load(sprite_path).convert_alpha()
+            image = pygame.image.load(sprite_path)
+            # convert_alpha exige um display inicializado
+            self.sprite = image.convert_alpha() if pygame.display.get_surface() else image
             return True
         except:
             print(f"Erro ao carregar sprite: {sprite_path}")
@@ -5,4 +5,5 @@ Módulo core - componentes centrais do jogo
 from .entity_system import EntitySystem
 from .scene_manager import SceneManager
 from .network_client import NetworkClient
-from .game_state import GameState
\ No newline at end of file
+from .game_state import GameState
+from .system_scheduler import System, SystemScheduler
\ No newline at end of file
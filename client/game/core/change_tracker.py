@@ -0,0 +1,135 @@
+"""
+Rastreamento de mudanças - registra quais componentes de quais entidades mudaram desde
+o último frame (base para sincronização por delta, saves incrementais e dirty rects)
+"""
+import functools
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Set
+
+# Componentes rastreados por padrão (posição, saúde e inventário)
+DEFAULT_TRACKED_COMPONENTS = ("MovementComponent", "HealthComponent", "InventoryComponent")
+
+# Marcador para atributos que ainda não existem
+_MISSING = object()
+# Cache das classes rastreadas geradas (classe original -> classe rastreada)
+_tracked_classes: Dict[type, type] = {}
+
+
+@dataclass
+class ChangeSet:
+    """Mudanças acumuladas desde a última drenagem"""
+    # Tipo de componente -> entidades cujo componente mudou
+    changed: Dict[str, Set[int]] = field(default_factory=dict)
+    # Entidades criadas
+    created: Set[int] = field(default_factory=set)
+    # Entidades removidas
+    removed: Set[int] = field(default_factory=set)
+
+    def is_empty(self) -> bool:
+        """Retorna True se nada mudou"""
+        return not (self.changed or self.created or self.removed)
+
+
+class ChangeTracker:
+    """
+    Acumula mudanças por tipo de componente até que sejam drenadas (uma vez por tick)
+    """
+
+    def __init__(self, component_types: Iterable[str] = DEFAULT_TRACKED_COMPONENTS):
+        # Tipos de componente rastreados
+        self.component_types = frozenset(component_types)
+        # Mudanças pendentes
+        self.pending = ChangeSet()
+
+    def mark(self, entity_id: int, component_type: str) -> None:
+        """Marca o componente de uma entidade como alterado"""
+        changed = self.pending.changed.get(component_type)
+        if changed is None:
+            self.pending.changed[component_type] = {entity_id}
+        else:
+            changed.add(entity_id)
+
+    def mark_many(self, entity_ids: Iterable[int], component_type: str) -> None:
+        """Marca o mesmo tipo de componente de várias entidades como alterado"""
+        self.pending.changed.setdefault(component_type, set()).update(entity_ids)
+
+    def mark_created(self, entity_id: int) -> None:
+        """Registra a criação de uma entidade"""
+        self.pending.created.add(entity_id)
+
+    def mark_removed(self, entity_id: int) -> None:
+        """
+        Registra a remoção de uma entidade
+        Entidades criadas e removidas no mesmo tick não aparecem em nenhum dos dois
+        """
+        for changed in self.pending.changed.values():
+            changed.discard(entity_id)
+        if entity_id in self.pending.created:
+            self.pending.created.discard(entity_id)
+        else:
+            self.pending.removed.add(entity_id)
+
+    def drain(self) -> ChangeSet:
+        """Retorna as mudanças acumuladas e começa um novo conjunto vazio"""
+        changes = self.pending
+        self.pending = ChangeSet()
+        return changes
+
+
+def _tracked_class(base: type) -> type:
+    """
+    Obtém (ou cria) a subclasse rastreada de uma classe de componente
+    Atribuições a campos públicos que alteram o valor marcam o componente como alterado;
+    métodos listados em 'tracked_methods' marcam após cada chamada
+    """
+    tracked = _tracked_classes.get(base)
+    if tracked is not None:
+        return tracked
+
+    base_setattr = base.__setattr__
+
+    def __setattr__(self, name, value):
+        if name[0] != "_" and getattr(self, name, _MISSING) != value:
+            base_setattr(self, name, value)
+            tracker, entity_id, component_type = self._change_hook
+            tracker.mark(entity_id, component_type)
+        else:
+            base_setattr(self, name, value)
+
+    def tracked_method(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            result = method(self, *args, **kwargs)
+            tracker, entity_id, component_type = self._change_hook
+            tracker.mark(entity_id, component_type)
+            return result
+        return wrapper
+
+    namespace = {"__setattr__": __setattr__, "_tracked_base": base}
+    for method_name in getattr(base, "tracked_methods", ()):
+        namespace[method_name] = tracked_method(getattr(base, method_name))
+
+    tracked = type(base.__name__, (base,), namespace)
+    tracked.__qualname__ = base.__qualname__
+    tracked.__module__ = base.__module__
+    _tracked_classes[base] = tracked
+    return tracked
+
+
+def track_component(component: Any, tracker: ChangeTracker, entity_id: int, component_type: str) -> None:
+    """
+    Passa a rastrear as escritas de um componente
+    Um componente já rastreado só tem o destino das marcações atualizado
+    """
+    component._change_hook = (tracker, entity_id, component_type)
+    if "_tracked_base" in type(component).__dict__:
+        return
+    component.__class__ = _tracked_class(type(component))
+
+
+def untrack_component(component: Any) -> None:
+    """Deixa de rastrear um componente, restaurando sua classe"""
+    tracked_base = type(component).__dict__.get("_tracked_base")
+    if tracked_base is not None:
+        component.__class__ = tracked_base
+    component.__dict__.pop("_change_hook", None)
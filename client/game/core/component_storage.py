@@ -0,0 +1,182 @@
+"""
+Armazenamento colunar de componentes - mantém componentes "quentes" em arrays NumPy contíguos
+"""
+import numpy as np
+from typing import Any, Dict, List, Optional
+
+# Layouts padrão para armazenamento colunar (tipo de componente -> {campo: dtype})
+# Apenas componentes atualizados a cada frame valem o custo de manter em colunas
+DEFAULT_COLUMNAR_LAYOUTS: Dict[str, Dict[str, Any]] = {
+    "MovementComponent": {
+        "x": np.float64,
+        "y": np.float64,
+        "speed": np.float64,
+        "velocity_x": np.float64,
+        "velocity_y": np.float64,
+        "acceleration": np.float64,
+        "deceleration": np.float64,
+    },
+    "HealthComponent": {
+        # float64: dano e cura podem ser fracionários (como no caminho por objetos)
+        "max_health": np.float64,
+        "current_health": np.float64,
+        "is_dead": np.bool_,
+    },
+}
+
+
+def _column_property(field: str) -> property:
+    """
+    Cria uma propriedade que lê e escreve um campo diretamente na coluna NumPy
+    O objeto do componente passa a ser apenas uma "visão" para o seu slot
+    """
+    def getter(self):
+        return self._columns.arrays[field].item(self._slot)
+
+    def setter(self, value):
+        self._columns.arrays[field][self._slot] = value
+
+    return property(getter, setter)
+
+
+class ComponentColumns:
+    """
+    Armazena todos os componentes de um tipo em arrays NumPy contíguos (struct-of-arrays)
+    Cada entidade ocupa um slot denso; remoções movem o último slot para o buraco
+    """
+
+    def __init__(self, component_type: str, fields: Dict[str, Any], capacity: int = 64):
+        # Nome do tipo de componente armazenado
+        self.component_type = component_type
+        # Campos armazenados em colunas e seus dtypes
+        self.fields = dict(fields)
+        # Arrays de dados (campo -> array com 'capacity' posições)
+        self.arrays: Dict[str, np.ndarray] = {
+            field: np.zeros(capacity, dtype=dtype) for field, dtype in self.fields.items()
+        }
+        # Número de slots ocupados
+        self.count = 0
+        # Slot -> ID da entidade e slot -> objeto do componente
+        self.entity_ids: List[Any] = []
+        self.components: List[Any] = []
+        # ID da entidade -> slot
+        self.slots: Dict[Any, int] = {}
+        # Arrays auxiliares (não expostos no componente) e seus valores iniciais
+        self.extra_fills: Dict[str, Any] = {}
+        # Cache das classes de visão geradas (classe original -> classe de visão)
+        self._view_classes: Dict[type, type] = {}
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __contains__(self, entity_id: Any) -> bool:
+        return entity_id in self.slots
+
+    def column(self, field: str) -> np.ndarray:
+        """
+        Retorna a coluna de um campo limitada aos slots ocupados
+        O array retornado é uma view: escritas nele alteram os componentes
+        """
+        return self.arrays[field][:self.count]
+
+    def add_array(self, name: str, dtype: Any, fill: Any = 0) -> np.ndarray:
+        """
+        Adiciona um array auxiliar alinhado aos slots (ex: dados de índices espaciais)
+        O array acompanha as movimentações de slot, mas não vira atributo do componente
+        name: Nome do array
+        dtype: Tipo NumPy dos valores
+        fill: Valor inicial para slots existentes e novos
+        Retorna o array limitado aos slots ocupados
+        """
+        if name in self.fields:
+            raise ValueError(f"'{name}' já é um campo de {self.component_type}")
+        if name not in self.arrays:
+            capacity = len(self.arrays[next(iter(self.arrays))])
+            self.arrays[name] = np.full(capacity, fill, dtype=dtype)
+            self.extra_fills[name] = fill
+        return self.column(name)
+
+    def attach(self, entity_id: Any, component: Any) -> None:
+        """
+        Move os dados de um componente para as colunas
+        O objeto continua utilizável, mas seus campos passam a ser lidos das colunas
+        """
+        if entity_id in self.slots:
+            self.detach(entity_id)
+
+        # Garante capacidade para mais um slot
+        if self.count == len(self.arrays[next(iter(self.arrays))]):
+            self._grow()
+
+        slot = self.count
+        # Copia os valores atuais do objeto para as colunas
+        for field in self.fields:
+            self.arrays[field][slot] = component.__dict__.pop(field)
+        for name, fill in self.extra_fills.items():
+            self.arrays[name][slot] = fill
+
+        self.count += 1
+        self.entity_ids.append(entity_id)
+        self.components.append(component)
+        self.slots[entity_id] = slot
+
+        # Transforma o objeto em uma visão para o seu slot
+        component._columns = self
+        component._slot = slot
+        component.__class__ = self._view_class(type(component))
+
+    def detach(self, entity_id: Any) -> Optional[Any]:
+        """
+        Remove um componente das colunas e devolve seus dados ao objeto
+        Retorna o componente removido, ou None se a entidade não estava armazenada
+        """
+        slot = self.slots.pop(entity_id, None)
+        if slot is None:
+            return None
+
+        component = self.components[slot]
+        # Restaura os valores como atributos normais do objeto
+        values = {field: self.arrays[field][slot].item() for field in self.fields}
+        component.__class__ = component.__class__._columnar_base
+        del component._columns
+        del component._slot
+        component.__dict__.update(values)
+
+        # Move o último slot para o buraco para manter as colunas densas
+        last = self.count - 1
+        if slot != last:
+            for array in self.arrays.values():
+                array[slot] = array[last]
+            moved_id = self.entity_ids[last]
+            moved_component = self.components[last]
+            self.entity_ids[slot] = moved_id
+            self.components[slot] = moved_component
+            self.slots[moved_id] = slot
+            moved_component._slot = slot
+
+        self.entity_ids.pop()
+        self.components.pop()
+        self.count = last
+        return component
+
+    def _grow(self) -> None:
+        """Dobra a capacidade de todas as colunas"""
+        for field, array in self.arrays.items():
+            grown = np.zeros(max(1, len(array) * 2), dtype=array.dtype)
+            grown[:len(array)] = array
+            self.arrays[field] = grown
+
+    def _view_class(self, component_cls: type) -> type:
+        """
+        Obtém (ou cria) a subclasse de visão para uma classe de componente
+        A subclasse mantém o mesmo nome para não alterar a indexação por tipo
+        """
+        view_cls = self._view_classes.get(component_cls)
+        if view_cls is None:
+            namespace = {field: _column_property(field) for field in self.fields}
+            namespace["_columnar_base"] = component_cls
+            view_cls = type(component_cls.__name__, (component_cls,), namespace)
+            view_cls.__qualname__ = component_cls.__qualname__
+            view_cls.__module__ = component_cls.__module__
+            self._view_classes[component_cls] = view_cls
+        return view_cls
@@ -0,0 +1,127 @@
+"""
+Handles de entidade - IDs inteiros compactos (índice + geração) com reutilização de índices
+"""
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+# Layout do handle: bits baixos guardam o índice, bits altos guardam a geração
+# 20 + 12 bits cabem em um inteiro de 32 bits sem sinal (útil para a rede)
+INDEX_BITS = 20
+GENERATION_BITS = 12
+INDEX_MASK = (1 << INDEX_BITS) - 1
+GENERATION_MASK = (1 << GENERATION_BITS) - 1
+MAX_ENTITIES = INDEX_MASK + 1
+
+
+def make_handle(index: int, generation: int) -> int:
+    """Combina índice e geração em um único handle inteiro"""
+    return (generation << INDEX_BITS) | index
+
+
+def handle_index(handle: int) -> int:
+    """Extrai o índice de um handle"""
+    return handle & INDEX_MASK
+
+
+def handle_generation(handle: int) -> int:
+    """Extrai a geração de um handle"""
+    return handle >> INDEX_BITS
+
+
+class HandleAllocator:
+    """
+    Aloca handles inteiros para entidades
+    Índices liberados voltam para uma lista livre e são reutilizados com uma nova
+    geração, de forma que handles antigos (obsoletos) podem ser detectados
+    """
+
+    def __init__(self):
+        # Geração atual de cada índice já alocado
+        self.generations: List[int] = []
+        # Índice -> True se está em uso
+        self.alive: List[bool] = []
+        # Índices livres para reutilização (FIFO adia ao máximo a reutilização)
+        self.free_indices: deque = deque()
+        # Número de handles vivos
+        self.alive_count = 0
+
+    def allocate(self) -> int:
+        """
+        Aloca um novo handle
+        Reutiliza índices livres antes de criar novos
+        """
+        if self.free_indices:
+            index = self.free_indices.popleft()
+        else:
+            index = len(self.generations)
+            if index >= MAX_ENTITIES:
+                raise RuntimeError(f"Limite de entidades atingido ({MAX_ENTITIES})")
+            # A geração começa em 1 para que nenhum handle seja 0 (falso em testes booleanos)
+            self.generations.append(1)
+            self.alive.append(False)
+
+        self.alive[index] = True
+        self.alive_count += 1
+        return make_handle(index, self.generations[index])
+
+    def release(self, handle: int) -> bool:
+        """
+        Libera um handle, invalidando-o
+        Retorna False se o handle já estava obsoleto
+        """
+        if not self.is_alive(handle):
+            return False
+
+        index = handle & INDEX_MASK
+        self.alive[index] = False
+        self.alive_count -= 1
+        # Avança a geração (pulando 0) para invalidar handles antigos
+        generation = (self.generations[index] + 1) & GENERATION_MASK
+        self.generations[index] = generation or 1
+        self.free_indices.append(index)
+        return True
+
+    def is_alive(self, handle: int) -> bool:
+        """Verifica se um handle ainda se refere a uma entidade viva"""
+        index = handle & INDEX_MASK
+        return (
+            index < len(self.generations)
+            and self.alive[index]
+            and self.generations[index] == handle >> INDEX_BITS
+        )
+
+
+class ExternalIdMap:
+    """
+    Mapeamento bidirecional entre handles locais e IDs externos (ex: IDs de rede)
+    Permite que o servidor e o cliente usem IDs diferentes para a mesma entidade
+    """
+
+    def __init__(self):
+        # ID externo -> handle
+        self.to_handle: Dict[Any, int] = {}
+        # Handle -> ID externo
+        self.to_external: Dict[int, Any] = {}
+
+    def bind(self, handle: int, external_id: Any) -> None:
+        """Associa um ID externo a um handle (substituindo associações anteriores)"""
+        self.unbind(handle)
+        old_handle = self.to_handle.pop(external_id, None)
+        if old_handle is not None:
+            self.to_external.pop(old_handle, None)
+        self.to_handle[external_id] = handle
+        self.to_external[handle] = external_id
+
+    def unbind(self, handle: int) -> None:
+        """Remove a associação de um handle, se existir"""
+        external_id = self.to_external.pop(handle, None)
+        if external_id is not None:
+            self.to_handle.pop(external_id, None)
+
+    def get_handle(self, external_id: Any) -> Optional[int]:
+        """Retorna o handle associado a um ID externo, ou None"""
+        return self.to_handle.get(external_id)
+
+    def get_external(self, handle: int) -> Optional[Any]:
+        """Retorna o ID externo associado a um handle, ou None"""
+        return self.to_external.get(handle)
@@ -2,29 +2,61 @@
 Sistema de gerenciamento de entidades do jogo
 Implementa o padrão ECS (Entity-Component-System) para gerenciamento flexível de entidades
 """
-import uuid
-from typing import Dict, List, Set, Any, Optional
+import numpy as np
+from typing import Dict, List, Set, Any, Optional, Iterable, Tuple, Callable
+from .component_storage import ComponentColumns, DEFAULT_COLUMNAR_LAYOUTS
+from .entity_handles import HandleAllocator, ExternalIdMap
+from .spatial_hash import SpatialHashGrid, NO_CELL, pack_cell
+from .query import Query
+from .change_tracker import (ChangeTracker, ChangeSet, DEFAULT_TRACKED_COMPONENTS,
+                             track_component, untrack_component)
 
 class EntitySystem:
     """Sistema principal para gerenciar todas as entidades do jogo e seus componentes"""
     
-    def __init__(self):
+    def __init__(self, columnar: bool = False):
+        """
+        Inicializa o sistema de entidades
+        columnar: Se True, componentes "quentes" (movimento, saúde) são armazenados
+                  em arrays NumPy contíguos, permitindo sistemas vetorizados
+        """
         # Dicionário principal que armazena todas as entidades e seus componentes
-        self.entities: Dict[str, Dict[str, Any]] = {}
+        self.entities: Dict[int, Dict[str, Any]] = {}
         # Indexação rápida de componentes por tipo
-        self.components: Dict[str, Dict[str, Any]] = {}
+        self.components: Dict[str, Dict[int, Any]] = {}
         # Sistema de tags para agrupamento de entidades
-        self.tags: Dict[str, Set[str]] = {}
+        self.tags: Dict[str, Set[int]] = {}
+        # Índice reverso de tags (entidade -> tags) para remoção sem varrer todas as tags
+        self.entity_tags: Dict[int, Set[str]] = {}
+        # Alocador de handles inteiros (índice + geração) com reutilização de índices
+        self.handles = HandleAllocator()
+        # Mapeamento entre handles e IDs externos (ex: IDs de rede)
+        self.external_ids = ExternalIdMap()
+        # Armazenamento colunar opcional (tipo de componente -> colunas)
+        self.columnar: Dict[str, ComponentColumns] = {}
+        if columnar:
+            for component_type, fields in DEFAULT_COLUMNAR_LAYOUTS.items():
+                self.columnar[component_type] = ComponentColumns(component_type, fields)
+        # Consultas em cache (chave -> consulta) e índices para atualização incremental
+        self.queries: Dict[Tuple, Query] = {}
+        self.queries_by_component: Dict[str, List[Query]] = {}
+        self.queries_by_tag: Dict[str, List[Query]] = {}
+        # Índice espacial opcional das posições (ver enable_spatial_index)
+        self.spatial_index: Optional[SpatialHashGrid] = None
+        # Rastreamento opcional de mudanças (ver enable_change_tracking)
+        self.change_tracker: Optional[ChangeTracker] = None
         
-    def create_entity(self, *components) -> str:
+    def create_entity(self, *components) -> int:
         """
         Cria uma nova entidade com componentes opcionais
-        Retorna um ID único para a entidade
+        Retorna um handle inteiro (índice + geração) que identifica a entidade
         """
-        # Gera um ID único usando UUID
-        entity_id = str(uuid.uuid4())
+        # Aloca um handle, reutilizando índices de entidades removidas
+        entity_id = self.handles.allocate()
         # Inicializa a entidade com um dicionário vazio de componentes
         self.entities[entity_id] = {}
+        if self.change_tracker is not None:
+            self.change_tracker.mark_created(entity_id)
         
         # Adiciona cada componente fornecido à entidade
         for component in components:
@@ -32,7 +64,29 @@ class EntitySystem:
             
         return entity_id
         
-    def add_component(self, entity_id: str, component: Any) -> None:
+    def create_entities(self, count: int, template: Callable[[int], Iterable[Any]], tags: Iterable[str] = ()) -> List[int]:
+        """
+        Cria várias entidades de uma vez a partir de um template
+        count: Número de entidades a criar
+        template: Função que recebe o índice (0..count-1) e retorna os componentes da entidade
+        tags: Tags aplicadas a todas as entidades criadas
+        Retorna a lista de handles criados
+        """
+        tags = tuple(tags)
+        entity_ids = []
+        for index in range(count):
+            entity_id = self.handles.allocate()
+            self.entities[entity_id] = {}
+            if self.change_tracker is not None:
+                self.change_tracker.mark_created(entity_id)
+            for component in template(index):
+                self.add_component(entity_id, component)
+            for tag in tags:
+                self.add_tag(entity_id, tag)
+            entity_ids.append(entity_id)
+        return entity_ids
+        
+    def add_component(self, entity_id: int, component: Any) -> None:
         """
         Adiciona um componente a uma entidade específica
         Mantém indexação para acesso rápido por tipo de componente
@@ -44,26 +98,256 @@ class EntitySystem:
         if component_type not in self.components:
             self.components[component_type] = {}
             
+        # Um componente substituído deixa de ser rastreado
+        previous = self.entities[entity_id].get(component_type)
+        if previous is not None:
+            untrack_component(previous)
+            
+        # Componentes com armazenamento colunar têm seus dados movidos para as colunas
+        columns = self.columnar.get(component_type)
+        if columns is not None:
+            columns.attach(entity_id, component)
+            
+        # Componentes rastreados marcam a entidade como alterada a cada escrita
+        tracker = self.change_tracker
+        if tracker is not None and component_type in tracker.component_types:
+            track_component(component, tracker, entity_id, component_type)
+            tracker.mark(entity_id, component_type)
+            
         # Adiciona o componente à indexação por tipo
         self.components[component_type][entity_id] = component
         # Adiciona o componente à entidade específica
         self.entities[entity_id][component_type] = component
         
-    def get_component(self, entity_id: str, component_type: str) -> Optional[Any]:
+        # Atualiza as consultas que dependem deste tipo de componente
+        for query in self.queries_by_component.get(component_type, ()):
+            query.refresh(entity_id, self)
+            
+        # Entidades com posição entram no índice espacial já na criação
+        if component_type == "MovementComponent":
+            self.refresh_spatial_index(entity_id)
+            
+    def remove_component(self, entity_id: int, component_type: str) -> Optional[Any]:
+        """
+        Remove um componente de uma entidade
+        Retorna o componente removido, ou None se a entidade não o possuía
+        """
+        component = self.entities[entity_id].pop(component_type, None)
+        if component is None:
+            return None
+            
+        del self.components[component_type][entity_id]
+        untrack_component(component)
+        if component_type in self.columnar:
+            self.columnar[component_type].detach(entity_id)
+            
+        for query in self.queries_by_component.get(component_type, ()):
+            query.discard(entity_id)
+        if component_type == "MovementComponent" and self.spatial_index is not None:
+            self.spatial_index.remove(entity_id)
+        return component
+        
+    def get_component(self, entity_id: int, component_type: str) -> Optional[Any]:
         """
         Obtém um componente específico de uma entidade
         Retorna None se o componente não existir
         """
         return self.entities[entity_id].get(component_type)
         
-    def get_entities_with_component(self, component_type: str) -> List[str]:
+    def get_entities_with_component(self, component_type: str) -> List[int]:
         """
         Obtém todas as entidades que possuem um componente específico
         Útil para sistemas que precisam processar apenas entidades com certos componentes
         """
         return list(self.components.get(component_type, {}).keys())
         
-    def add_tag(self, entity_id: str, tag: str) -> None:
+    def query(self, *component_types: str, tags: Iterable[str] = ()) -> Query:
+        """
+        Obtém uma consulta em cache das entidades com todos os componentes (e tags) pedidos
+        A consulta é mantida incrementalmente; iterar sobre ela retorna pares
+        (entity_id, (componente1, componente2, ...)) na ordem dos tipos pedidos
+        Ex: for entity_id, (movement, health) in es.query("MovementComponent", "HealthComponent")
+        """
+        key = (component_types, frozenset(tags))
+        query = self.queries.get(key)
+        if query is not None:
+            return query
+            
+        query = Query(component_types, key[1])
+        self.queries[key] = query
+        for component_type in component_types:
+            self.queries_by_component.setdefault(component_type, []).append(query)
+        for tag in query.tags:
+            self.queries_by_tag.setdefault(tag, []).append(query)
+            
+        # Popula a consulta partindo do menor conjunto candidato
+        candidates = [self.components.get(t, {}).keys() for t in component_types]
+        candidates += [self.tags.get(tag, set()) for tag in query.tags]
+        if candidates:
+            for entity_id in min(candidates, key=len):
+                query.refresh(entity_id, self)
+        return query
+        
+    def is_alive(self, entity_id: int) -> bool:
+        """
+        Verifica se um handle ainda se refere a uma entidade existente
+        Handles de entidades removidas tornam-se obsoletos mesmo que o índice seja reutilizado
+        """
+        return self.handles.is_alive(entity_id)
+        
+    def bind_external_id(self, entity_id: int, external_id: Any) -> None:
+        """
+        Associa um ID externo (ex: ID de rede vindo do servidor) a uma entidade
+        """
+        self.external_ids.bind(entity_id, external_id)
+        
+    def get_entity_by_external_id(self, external_id: Any) -> Optional[int]:
+        """
+        Obtém o handle da entidade associada a um ID externo
+        Retorna None se nenhuma entidade estiver associada
+        """
+        return self.external_ids.get_handle(external_id)
+        
+    def get_external_id(self, entity_id: int) -> Optional[Any]:
+        """
+        Obtém o ID externo associado a uma entidade
+        Retorna None se a entidade não tiver ID externo
+        """
+        return self.external_ids.get_external(entity_id)
+        
+    def enable_spatial_index(self, cell_size: float) -> SpatialHashGrid:
+        """
+        Cria (ou recria) o índice espacial das entidades com MovementComponent
+        cell_size: Tamanho das células da grade em pixels (normalmente derivado do tile_size do mapa)
+        Retorna o índice criado
+        """
+        self.spatial_index = SpatialHashGrid(cell_size, self.get_position)
+        columns = self.columnar.get("MovementComponent")
+        if columns is not None:
+            # Guarda a célula de cada slot junto das colunas para detectar mudanças em lote
+            columns.add_array("spatial_cell", np.int64, NO_CELL)[:] = NO_CELL
+        self.sync_spatial_index()
+        return self.spatial_index
+        
+    def sync_spatial_index(self) -> None:
+        """
+        Atualiza o índice espacial com as posições atuais
+        Deve ser chamado uma vez por passo, após o movimento; apenas entidades que
+        mudaram de célula são movidas no índice
+        """
+        grid = self.spatial_index
+        if grid is None:
+            return
+            
+        columns = self.columnar.get("MovementComponent")
+        if columns is None:
+            for entity_id, (movement,) in self.query("MovementComponent"):
+                grid.update(entity_id, movement.x, movement.y)
+            return
+            
+        if columns.count == 0:
+            return
+        # Calcula a célula de todas as entidades de uma vez
+        cell_x = np.floor(columns.column("x") * grid.inverse_cell_size).astype(np.int64)
+        cell_y = np.floor(columns.column("y") * grid.inverse_cell_size).astype(np.int64)
+        keys = (cell_x << 32) | (cell_y & 0xFFFFFFFF)
+        previous = columns.column("spatial_cell")
+        changed = np.flatnonzero(keys != previous)
+        if len(changed):
+            entity_ids = columns.entity_ids
+            for slot, key in zip(changed.tolist(), keys[changed].tolist()):
+                grid.move(entity_ids[slot], key)
+            previous[changed] = keys[changed]
+            
+    def refresh_spatial_index(self, entity_id: int) -> None:
+        """
+        Atualiza a célula de uma única entidade no índice espacial
+        Para posições alteradas fora do MovementSystem (criação, teleporte, inputs aplicados
+        entre passos), que de outra forma só seriam vistas no próximo sync_spatial_index
+        """
+        grid = self.spatial_index
+        if grid is None:
+            return
+        movement = self.components.get("MovementComponent", {}).get(entity_id)
+        if movement is None:
+            return
+        key = pack_cell(*grid.cell_of(movement.x, movement.y))
+        grid.move(entity_id, key)
+        # Mantém a célula guardada nas colunas coerente com o índice
+        columns = self.columnar.get("MovementComponent")
+        if columns is not None:
+            slot = columns.slots.get(entity_id)
+            if slot is not None:
+                columns.arrays["spatial_cell"][slot] = key
+                
+    def set_position(self, entity_id: int, x: float, y: float) -> None:
+        """
+        Move uma entidade para (x, y) e atualiza sua célula no índice espacial
+        Não faz nada se a entidade não tiver MovementComponent
+        """
+        movement = self.components.get("MovementComponent", {}).get(entity_id)
+        if movement is None:
+            return
+        movement.set_position(x, y)
+        self.refresh_spatial_index(entity_id)
+        
+    def get_position(self, entity_id: int) -> Optional[Tuple[float, float]]:
+        """
+        Obtém a posição (x, y) de uma entidade a partir do seu MovementComponent
+        Retorna None se a entidade não tiver posição
+        """
+        movement = self.components.get("MovementComponent", {}).get(entity_id)
+        if movement is None:
+            return None
+        return (movement.x, movement.y)
+        
+    def enable_change_tracking(self, component_types: Iterable[str] = DEFAULT_TRACKED_COMPONENTS) -> ChangeTracker:
+        """
+        Ativa o rastreamento de mudanças para os tipos de componente informados
+        Escritas em componentes rastreados marcam a entidade como alterada por tipo;
+        use drain_changes() uma vez por tick para obter e limpar as mudanças
+        Retorna o rastreador criado
+        """
+        self.change_tracker = ChangeTracker(component_types)
+        for component_type in self.change_tracker.component_types:
+            for entity_id, component in self.components.get(component_type, {}).items():
+                untrack_component(component)
+                track_component(component, self.change_tracker, entity_id, component_type)
+        return self.change_tracker
+        
+    def mark_changed(self, entity_id: int, component_type: str) -> None:
+        """
+        Marca manualmente um componente como alterado
+        Necessário quando os dados são escritos sem passar pelo objeto (ex: colunas NumPy)
+        """
+        if self.change_tracker is not None and component_type in self.change_tracker.component_types:
+            self.change_tracker.mark(entity_id, component_type)
+            
+    def mark_changed_many(self, entity_ids: Iterable[int], component_type: str) -> None:
+        """
+        Marca o mesmo tipo de componente de várias entidades como alterado
+        """
+        if self.change_tracker is not None and component_type in self.change_tracker.component_types:
+            self.change_tracker.mark_many(entity_ids, component_type)
+            
+    def drain_changes(self) -> ChangeSet:
+        """
+        Retorna as mudanças acumuladas desde a última chamada e as limpa
+        Deve ser chamado uma vez por tick pelo consumidor (rede, saves, renderização)
+        Sem rastreamento ativo, retorna sempre um conjunto vazio
+        """
+        if self.change_tracker is None:
+            return ChangeSet()
+        return self.change_tracker.drain()
+        
+    def get_columns(self, component_type: str) -> Optional[ComponentColumns]:
+        """
+        Obtém o armazenamento colunar de um tipo de componente
+        Retorna None se o tipo não estiver armazenado em colunas
+        """
+        return self.columnar.get(component_type)
+        
+    def add_tag(self, entity_id: int, tag: str) -> None:
         """
         Adiciona uma tag a uma entidade para agrupamento e identificação
         Tags são úteis para categorizar entidades (ex: "player", "enemy", "item")
@@ -71,29 +355,78 @@ class EntitySystem:
         if tag not in self.tags:
             self.tags[tag] = set()
         self.tags[tag].add(entity_id)
+        self.entity_tags.setdefault(entity_id, set()).add(tag)
         
-    def get_entities_with_tag(self, tag: str) -> Set[str]:
+        for query in self.queries_by_tag.get(tag, ()):
+            query.refresh(entity_id, self)
+        
+    def get_entities_with_tag(self, tag: str) -> Set[int]:
         """
         Obtém todas as entidades com uma tag específica
         Retorna um conjunto vazio se a tag não existir
         """
         return self.tags.get(tag, set())
         
-    def remove_entity(self, entity_id: str) -> None:
+    def remove_tag(self, entity_id: int, tag: str) -> None:
+        """
+        Remove uma tag de uma entidade
+        Não faz nada se a entidade não possuir a tag
+        """
+        entity_tags = self.entity_tags.get(entity_id)
+        if not entity_tags or tag not in entity_tags:
+            return
+            
+        entity_tags.remove(tag)
+        self.tags[tag].discard(entity_id)
+        for query in self.queries_by_tag.get(tag, ()):
+            query.discard(entity_id)
+            
+    def get_tags(self, entity_id: int) -> Set[str]:
+        """
+        Obtém as tags de uma entidade
+        Retorna um conjunto vazio se a entidade não tiver tags
+        """
+        return self.entity_tags.get(entity_id, set())
+        
+    def remove_entity(self, entity_id: int) -> None:
         """
         Remove completamente uma entidade do sistema
         Limpa todos os componentes e referências
         """
-        if entity_id in self.entities:
-            # Remove todos os componentes da indexação
-            for component_type in self.entities[entity_id]:
-                if component_type in self.components and entity_id in self.components[component_type]:
-                    del self.components[component_type][entity_id]
+        # Remove a entidade do registro principal (custo proporcional a componentes + tags)
+        entity_components = self.entities.pop(entity_id, None)
+        if entity_components is None:
+            return
             
-            # Remove a entidade do registro principal
-            del self.entities[entity_id]
+        # Remove todos os componentes da indexação e das consultas em cache
+        for component_type, component in entity_components.items():
+            self.components[component_type].pop(entity_id, None)
+            untrack_component(component)
+            # Libera o slot colunar (o objeto volta a guardar seus próprios dados)
+            if component_type in self.columnar:
+                self.columnar[component_type].detach(entity_id)
+            for query in self.queries_by_component.get(component_type, ()):
+                query.discard(entity_id)
+        if self.spatial_index is not None:
+            self.spatial_index.remove(entity_id)
+                
+        # Remove a entidade apenas das tags que ela possui (índice reverso)
+        for tag in self.entity_tags.pop(entity_id, ()):
+            self.tags[tag].discard(entity_id)
+            for query in self.queries_by_tag.get(tag, ()):
+                query.discard(entity_id)
+                
+        if self.change_tracker is not None:
+            self.change_tracker.mark_removed(entity_id)
             
-            # Remove a entidade de todas as tags
-            for tag in self.tags:
-                if entity_id in self.tags[tag]:
-                    self.tags[tag].remove(entity_id)
\ No newline at end of file
+        # Invalida o handle e a associação com IDs externos
+        self.handles.release(entity_id)
+        self.external_ids.unbind(entity_id)
+        
+    def remove_entities(self, entity_ids: Iterable[int]) -> None:
+        """
+        Remove várias entidades de uma vez (ex: despawn de uma onda de inimigos)
+        Aceita qualquer iterável, inclusive conjuntos de tags (são copiados antes)
+        """
+        for entity_id in list(entity_ids):
+            self.remove_entity(entity_id)
\ No newline at end of file
@@ -0,0 +1,61 @@
+"""
+Passo fixo de simulação - desacopla a taxa de simulação da taxa de renderização
+"""
+from typing import Callable
+
+class FixedTimestep:
+    """
+    Acumulador de passo fixo
+    O tempo real de cada frame é acumulado e consumido em passos de tamanho fixo,
+    então a simulação recebe sempre o mesmo dt independentemente do FPS
+    O número de passos por frame é limitado para evitar a "espiral da morte"
+    quando a simulação não consegue acompanhar o tempo real
+    """
+
+    def __init__(self, simulation_hz: float = 60.0, max_steps: int = 5):
+        """
+        simulation_hz: Passos de simulação por segundo
+        max_steps: Máximo de passos executados em um único frame
+        """
+        # Duração de cada passo (segundos)
+        self.step_dt = 1.0 / simulation_hz
+        # Máximo de passos de recuperação por frame
+        self.max_steps = max_steps
+        # Tempo acumulado ainda não simulado
+        self.accumulator = 0.0
+        # Fração do próximo passo já decorrida (0.0 a 1.0), usada para interpolar a renderização
+        self.alpha = 0.0
+        # Total de tempo descartado por excesso de atraso (útil para diagnóstico)
+        self.dropped_time = 0.0
+        # Total de passos executados
+        self.total_steps = 0
+
+    def advance(self, frame_dt: float, step: Callable[[float], None]) -> int:
+        """
+        Acumula o tempo do frame e executa quantos passos fixos couberem
+        frame_dt: Tempo real decorrido desde o último frame (segundos)
+        step: Função chamada a cada passo com o dt fixo
+        Retorna o número de passos executados
+        """
+        self.accumulator += frame_dt
+        steps = 0
+
+        while self.accumulator >= self.step_dt and steps < self.max_steps:
+            step(self.step_dt)
+            self.accumulator -= self.step_dt
+            steps += 1
+
+        # Atraso maior que o limite: descarta o excesso em vez de tentar recuperá-lo
+        if self.accumulator >= self.step_dt:
+            excess = self.accumulator - (self.accumulator % self.step_dt)
+            self.dropped_time += excess
+            self.accumulator -= excess
+
+        self.total_steps += steps
+        self.alpha = self.accumulator / self.step_dt
+        return steps
+
+    def reset(self) -> None:
+        """Descarta o tempo acumulado (ex: ao trocar de cena ou após uma pausa)"""
+        self.accumulator = 0.0
+        self.alpha = 0.0
@@ -1,7 +1,7 @@
 """
 Gerenciador de estado do jogo - mantém e sincroniza o estado global do jogo
 """
-from typing import Dict, Any, Set
+from typing import Dict, Any, Set, Callable
 
 class GameState:
     """
@@ -1,8 +1,15 @@
 """
 Cliente de rede para comunicação com o servidor multiplayer
 """
+import time
 import socketio
 from typing import Callable, Dict, Any
+from ..networking.dispatcher import MESSAGE_EVENT, MessageDispatcher
+from ..networking.inbound_queue import InboundQueue, DEFAULT_DRAIN_BUDGET, allow_polling_bursts
+from ..networking.outbound_queue import OutboundQueue, DEFAULT_SEND_RATE
+from ..networking.session import (SESSION_EVENT, RECONNECT_ATTEMPTS, CONNECT_TIMEOUT, ClientSession,
+                                  connect_with_retry, reconnection_options)
+from ..networking.telemetry import NetworkTelemetry, payload_size
 
 class NetworkClient:
     """
@@ -10,15 +17,33 @@ class NetworkClient:
     Gerencia conexão, desconexão e troca de mensagens com o servidor
     """
     
-    def __init__(self, server_url: str = "http://localhost:3000"):
+    def __init__(self, server_url: str = "http://localhost:3000", send_rate: float = DEFAULT_SEND_RATE,
+                 reconnect_attempts: int = RECONNECT_ATTEMPTS, timeout: float = CONNECT_TIMEOUT):
         # URL do servidor ao qual se conectar
         self.server_url = server_url
-        # Instância do cliente Socket.IO
-        self.sio = socketio.Client()
+        # Tentativas da primeira conexão (0 = sem limite) e espera máxima por tentativa (s)
+        self.reconnect_attempts = reconnect_attempts
+        self.timeout = timeout
+        # Instância do cliente Socket.IO (aceita rajadas de estados no long-polling e
+        # reconecta sozinha, com espera exponencial, se a conexão cair)
+        allow_polling_bursts()
+        self.sio = socketio.Client(**reconnection_options())
+        # Jogador e token para retomar a sessão depois de uma queda
+        self.session = ClientSession()
         # Callbacks registrados para diferentes tipos de mensagem
         self.callbacks: Dict[str, Callable] = {}
+        # Mensagens recebidas pela thread do socket.io, processadas em poll() pelo loop principal
+        self.inbound = InboundQueue()
+        # Mensagens a enviar, agrupadas em um pacote por poll() (no máximo send_rate por segundo)
+        self.outbound = OutboundQueue(send_rate)
         # Estado de conexão
         self.connected = False
+        # RTT, jitter, banda e contadores por evento (ver telemetry)
+        self.telemetry = NetworkTelemetry()
+        # Manipuladores das mensagens do protocolo (dataclasses de messages.py), por tipo
+        self.dispatcher = MessageDispatcher()
+        # Instante de chegada (time.monotonic) da mensagem cujo callback está executando
+        self.last_received_at = None
         
         # Configura handlers padrão
         self.setup_default_handlers()
@@ -31,6 +56,29 @@ class NetworkClient:
             """Callback chamado quando conectado ao servidor"""
             print("Conectado ao servidor")
             self.connected = True
+
+        @self.sio.on(MESSAGE_EVENT)
+        def message(data=None):
+            """
+            Mensagens do protocolo: o lote inteiro é decodificado aqui, na thread de rede,
+            e as mensagens são entregues por tipo em poll()
+            """
+            try:
+                messages = self.dispatcher.protocol.decode_batch(data)
+            except (ValueError, KeyError, TypeError) as e:
+                print(f"Mensagem inválida recebida do servidor: {e}")
+                return
+            self.inbound.push(MESSAGE_EVENT, (messages, payload_size(data)), droppable=False)
+
+        @self.sio.on(SESSION_EVENT)
+        def session(data=None):
+            """Dados da sessão (registrados em poll(), antes do callback de 'session')"""
+            self.inbound.push(SESSION_EVENT, (data, payload_size(data)), droppable=False)
+
+        @self.sio.on("net_pong")
+        def net_pong(data=None):
+            """Resposta a um ping (o RTT é calculado em poll())"""
+            self.inbound.push("net_pong", (data, 0), droppable=False)
             
         @self.sio.event
         def disconnect():
@@ -41,32 +89,92 @@ class NetworkClient:
     def register_callback(self, event_name: str, callback: Callable) -> None:
         """
         Registra um callback para um tipo específico de mensagem
-        O callback será chamado quando uma mensagem com este evento for recebida
+        O callback será chamado (em poll(), na thread do jogo) quando uma mensagem com
+        este evento for recebida
         """
         self.callbacks[event_name] = callback
         
-        # Registra o handler no Socket.IO
+        # Registra o handler no Socket.IO (roda na thread de rede: apenas enfileira)
         @self.sio.on(event_name)
-        def handler(data):
-            callback(data)
-            
-    def connect(self) -> None:
-        """Estabelece conexão com o servidor"""
+        def handler(data=None):
+            # O tamanho é medido aqui, fora do loop principal
+            self.inbound.push(event_name, (data, payload_size(data)), droppable=False)
+
+    def register_message_handler(self, message_class: type, handler: Callable[[Any], None]) -> None:
+        """
+        Registra o manipulador de um tipo de mensagem do protocolo (ex: PlayerJoinMessage)
+        Chamado em poll() para cada mensagem desse tipo recebida no evento MESSAGE_EVENT
+        """
+        self.dispatcher.register(message_class, handler)
+
+    def poll(self, budget: float = DEFAULT_DRAIN_BUDGET) -> int:
+        """
+        Executa os callbacks das mensagens recebidas desde a última chamada e envia, em um
+        único pacote, as mensagens enfileiradas (incluindo o ping periódico de medição de RTT)
+        Deve ser chamado uma vez por frame pelo loop principal
+        budget: Tempo máximo gasto (s); o restante fica para o próximo frame
+        Retorna o número de mensagens processadas
+        """
+        if self.connected:
+            ping = self.telemetry.make_ping()
+            if ping is not None:
+                self.send("net_ping", ping)
+        processed = self.inbound.drain(self.dispatch, budget)
+        self.flush()
+        return processed
+
+    def flush(self) -> None:
+        """Envia as mensagens enfileiradas, se o limite de taxa permitir"""
+        if not self.connected:
+            return
+        packet = self.outbound.flush()
+        if packet is not None:
+            self.sio.emit(*packet)
+            self.telemetry.record_packet(*packet)
+
+    def dispatch(self, event_name: str, payload: Any, received_at: float = None) -> None:
+        """Chama o callback registrado para um evento, medindo o tempo gasto nele"""
+        data, size = payload
+        if event_name == "net_pong":
+            self.telemetry.record_pong(data, received_at)
+        elif event_name == SESSION_EVENT:
+            # O callback de 'session' recebe se a sessão foi retomada
+            data = dict(data, resumed=self.session.update(data)) if isinstance(data, dict) else data
+        self.last_received_at = received_at
+        start = time.perf_counter()
         try:
-            self.sio.connect(self.server_url)
+            if event_name == MESSAGE_EVENT:
+                self.dispatcher.dispatch_all(data)
+            else:
+                callback = self.callbacks.get(event_name)
+                if callback is not None:
+                    callback(data)
         except Exception as e:
-            print(f"Erro ao conectar com o servidor: {e}")
+            # Um erro no callback descarta só a mensagem (não derruba o loop do jogo)
+            print(f"Erro ao processar '{event_name}' do servidor: {e!r}")
+        self.telemetry.record_received(event_name, size, time.perf_counter() - start, received_at)
+            
+    def connect(self) -> bool:
+        """
+        Estabelece conexão com o servidor (com novas tentativas, ver connect_with_retry)
+        Retorna se conectou
+        """
+        return connect_with_retry(self.sio, self.server_url, self.session, self.reconnect_attempts, self.timeout)
             
     def disconnect(self) -> None:
-        """Desconecta do servidor"""
+        """Desconecta do servidor (a sessão é encerrada; uma nova conexão cria outro jogador)"""
         self.sio.disconnect()
+        self.inbound.clear()
+        self.outbound.clear()
+        self.session.clear()
         
     def send(self, event_name: str, data: Any = None) -> None:
         """
-        Envia uma mensagem para o servidor
+        Coloca uma mensagem na fila de envio (enviada no próximo poll() ou flush())
         Só funciona se estiver conectado
         """
         if self.connected:
-            self.sio.emit(event_name, data)
+            self.session.observe_sent(event_name, data)
+            self.outbound.push(event_name, data)
         else:
             print("Não conectado ao servidor. Não é possível enviar mensagem.")
\ No newline at end of file
@@ -0,0 +1,67 @@
+"""
+Consultas em cache do sistema de entidades - mantém incrementalmente as entidades que
+possuem um conjunto de componentes e tags
+"""
+from typing import Any, Dict, FrozenSet, Iterator, KeysView, Optional, Tuple
+
+
+class Query:
+    """
+    Visão em cache das entidades que possuem todos os componentes e tags pedidos
+    É atualizada pelo EntitySystem quando componentes e tags mudam, então iterar
+    sobre ela não reconstrói nem copia listas a cada frame
+    """
+
+    def __init__(self, component_types: Tuple[str, ...], tags: FrozenSet[str]):
+        # Tipos de componente exigidos (a ordem define a ordem da tupla retornada)
+        self.component_types = component_types
+        # Tags exigidas
+        self.tags = tags
+        # Entidades correspondentes (ID -> tupla de componentes)
+        self.matches: Dict[Any, Tuple[Any, ...]] = {}
+
+    def __iter__(self) -> Iterator[Tuple[Any, Tuple[Any, ...]]]:
+        """
+        Itera sobre pares (entity_id, componentes)
+        Não remova entidades durante a iteração; use list(query) nesse caso
+        """
+        return iter(self.matches.items())
+
+    def __len__(self) -> int:
+        return len(self.matches)
+
+    def __contains__(self, entity_id: Any) -> bool:
+        return entity_id in self.matches
+
+    def entity_ids(self) -> KeysView:
+        """Retorna uma visão (sem cópia) dos IDs das entidades correspondentes"""
+        return self.matches.keys()
+
+    def get(self, entity_id: Any) -> Optional[Tuple[Any, ...]]:
+        """Retorna a tupla de componentes de uma entidade, ou None se ela não corresponde"""
+        return self.matches.get(entity_id)
+
+    def refresh(self, entity_id: Any, entity_system) -> None:
+        """
+        Reavalia uma única entidade após uma mudança em seus componentes ou tags
+        entity_id: ID da entidade alterada
+        entity_system: Sistema de entidades dono da consulta
+        """
+        entity_components = entity_system.entities.get(entity_id)
+        if entity_components is None:
+            self.matches.pop(entity_id, None)
+            return
+
+        for tag in self.tags:
+            if entity_id not in entity_system.tags.get(tag, ()):
+                self.matches.pop(entity_id, None)
+                return
+
+        try:
+            self.matches[entity_id] = tuple(entity_components[t] for t in self.component_types)
+        except KeyError:
+            self.matches.pop(entity_id, None)
+
+    def discard(self, entity_id: Any) -> None:
+        """Remove uma entidade da consulta (usado quando a entidade é destruída)"""
+        self.matches.pop(entity_id, None)
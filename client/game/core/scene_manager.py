@@ -3,6 +3,7 @@ Gerenciador de cenas - controla a transição entre diferentes estados do jogo
 """
 from typing import Dict, Optional
 from ..scenes.scene_base import SceneBase
+from .game_loop import FixedTimestep
 
 class SceneManager:
     """
@@ -10,7 +11,14 @@ class SceneManager:
     Implementa o padrão de design State para gerenciar estados do jogo
     """
     
-    def __init__(self):
+    def __init__(self, simulation_hz: Optional[float] = None, max_steps: int = 5):
+        """
+        simulation_hz: Se informado, as cenas são atualizadas em passos fixos nessa taxa
+                       (o dt passado a update() passa a ser o tempo real do frame)
+        max_steps: Máximo de passos de simulação por frame
+        """
+        # Passo fixo de simulação (None para repassar o dt do frame diretamente)
+        self.timestep = FixedTimestep(simulation_hz, max_steps) if simulation_hz else None
         # Registro de todas as cenas disponíveis
         self.scenes: Dict[str, SceneBase] = {}
         # Cena atualmente ativa
@@ -44,12 +52,30 @@ class SceneManager:
         
         # Inicializa a nova cena
         self.current_scene.enter(*args, **kwargs)
+        # O tempo acumulado pertencia à cena anterior
+        if self.timestep:
+            self.timestep.reset()
         return True
         
     def update(self, dt: float) -> None:
-        """Atualiza a cena atual"""
+        """
+        Atualiza a cena atual
+        Com passo fixo, dt é o tempo real do frame e a cena recebe zero ou mais
+        atualizações com o dt fixo
+        """
         if self.current_scene:
-            self.current_scene.update(dt)
+            if self.timestep:
+                self.timestep.advance(dt, self.current_scene.update)
+            else:
+                self.current_scene.update(dt)
+                
+    @property
+    def interpolation_alpha(self) -> float:
+        """
+        Fração do próximo passo já decorrida (0.0 a 1.0)
+        Cenas podem usá-la para interpolar a renderização entre os dois últimos estados
+        """
+        return self.timestep.alpha if self.timestep else 1.0
             
     def render(self, surface) -> None:
         """Renderiza a cena atual"""
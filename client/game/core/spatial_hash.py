@@ -0,0 +1,186 @@
+"""
+Índice espacial em grade uniforme (spatial hash) - consultas de proximidade por células
+"""
+import math
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+# Valor que nunca corresponde a uma célula válida (usado para "ainda não indexado")
+NO_CELL = -(1 << 63)
+
+
+def pack_cell(cell_x: int, cell_y: int) -> int:
+    """
+    Combina as coordenadas de uma célula em uma única chave inteira
+    Mesma fórmula usada na versão vetorizada (int64), válida para |coordenadas| < 2^31
+    """
+    return (cell_x << 32) | (cell_y & 0xFFFFFFFF)
+
+
+class SpatialHashGrid:
+    """
+    Grade uniforme que indexa entidades pela célula em que estão
+    Consultas visitam apenas as células próximas e comparam distâncias ao quadrado,
+    então o custo depende da densidade local e não do total de entidades
+    """
+
+    def __init__(self, cell_size: float, position_of: Callable[[int], Optional[Tuple[float, float]]]):
+        """
+        cell_size: Tamanho (lado) de cada célula em pixels
+        position_of: Função que retorna a posição atual (x, y) de uma entidade, ou None
+        """
+        if cell_size <= 0:
+            raise ValueError("cell_size deve ser positivo")
+        self.cell_size = float(cell_size)
+        self.inverse_cell_size = 1.0 / self.cell_size
+        self.position_of = position_of
+        # Chave da célula -> entidades na célula
+        self.cells: Dict[int, Set[int]] = {}
+        # Entidade -> chave da célula onde está indexada
+        self.entity_cells: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.entity_cells)
+
+    def __contains__(self, entity_id: int) -> bool:
+        return entity_id in self.entity_cells
+
+    def cell_of(self, x: float, y: float) -> Tuple[int, int]:
+        """Retorna as coordenadas da célula que contém o ponto (x, y)"""
+        return (math.floor(x * self.inverse_cell_size), math.floor(y * self.inverse_cell_size))
+
+    def update(self, entity_id: int, x: float, y: float) -> None:
+        """
+        Insere ou move uma entidade para a célula correspondente à posição (x, y)
+        """
+        self.move(entity_id, pack_cell(*self.cell_of(x, y)))
+
+    def move(self, entity_id: int, key: int) -> None:
+        """
+        Move uma entidade para a célula de chave 'key' (já calculada)
+        Usado pela sincronização vetorizada do EntitySystem
+        """
+        old_key = self.entity_cells.get(entity_id)
+        if old_key == key:
+            return
+        if old_key is not None:
+            self._discard_from_cell(entity_id, old_key)
+        self.entity_cells[entity_id] = key
+        cell = self.cells.get(key)
+        if cell is None:
+            self.cells[key] = {entity_id}
+        else:
+            cell.add(entity_id)
+
+    def remove(self, entity_id: int) -> None:
+        """Remove uma entidade do índice (não faz nada se ela não estiver indexada)"""
+        key = self.entity_cells.pop(entity_id, None)
+        if key is not None:
+            self._discard_from_cell(entity_id, key)
+
+    def clear(self) -> None:
+        """Remove todas as entidades do índice"""
+        self.cells.clear()
+        self.entity_cells.clear()
+
+    def query_radius(self, x: float, y: float, radius: float, exclude: Optional[int] = None) -> List[int]:
+        """
+        Retorna as entidades a até 'radius' pixels do ponto (x, y)
+        exclude: Entidade a ignorar (normalmente quem faz a consulta)
+        """
+        radius_squared = radius * radius
+        result = []
+        for entity_id in self._entities_in_box(x - radius, y - radius, x + radius, y + radius):
+            if entity_id == exclude:
+                continue
+            position = self.position_of(entity_id)
+            if position is None:
+                continue
+            dx = position[0] - x
+            dy = position[1] - y
+            if dx * dx + dy * dy <= radius_squared:
+                result.append(entity_id)
+        return result
+
+    def query_rect(self, left: float, top: float, right: float, bottom: float) -> List[int]:
+        """
+        Retorna as entidades cuja posição está dentro do retângulo (bordas inclusas)
+        Útil para culling de renderização (retângulo da câmera)
+        """
+        result = []
+        for entity_id in self._entities_in_box(left, top, right, bottom):
+            position = self.position_of(entity_id)
+            if position is not None and left <= position[0] <= right and top <= position[1] <= bottom:
+                result.append(entity_id)
+        return result
+
+    def nearest(self, x: float, y: float, max_radius: float,
+                predicate: Optional[Callable[[int], bool]] = None,
+                exclude: Optional[int] = None) -> Optional[int]:
+        """
+        Retorna a entidade mais próxima de (x, y) a até 'max_radius' pixels
+        predicate: Filtro opcional (ex: apenas entidades com HealthComponent)
+        exclude: Entidade a ignorar
+        Percorre anéis de células a partir do centro e para assim que nenhum anel
+        restante pode conter algo mais próximo que o melhor encontrado
+        Retorna None se nenhuma entidade satisfizer os critérios
+        """
+        center_x, center_y = self.cell_of(x, y)
+        max_ring = math.ceil(max_radius * self.inverse_cell_size)
+        best_id = None
+        best_distance = max_radius * max_radius
+
+        for ring in range(max_ring + 1):
+            # Qualquer ponto do anel 'ring' está a pelo menos (ring - 1) células do ponto
+            if best_id is not None:
+                ring_distance = (ring - 1) * self.cell_size
+                if ring_distance > 0 and ring_distance * ring_distance > best_distance:
+                    break
+            for key in self._ring_keys(center_x, center_y, ring):
+                cell = self.cells.get(key)
+                if not cell:
+                    continue
+                for entity_id in cell:
+                    if entity_id == exclude or (predicate is not None and not predicate(entity_id)):
+                        continue
+                    position = self.position_of(entity_id)
+                    if position is None:
+                        continue
+                    dx = position[0] - x
+                    dy = position[1] - y
+                    distance = dx * dx + dy * dy
+                    if distance <= best_distance:
+                        best_distance = distance
+                        best_id = entity_id
+        return best_id
+
+    def _entities_in_box(self, left: float, top: float, right: float, bottom: float) -> Iterator[int]:
+        """Itera pelas entidades das células que cobrem o retângulo"""
+        min_x, min_y = self.cell_of(left, top)
+        max_x, max_y = self.cell_of(right, bottom)
+        cells = self.cells
+        for cell_x in range(min_x, max_x + 1):
+            for cell_y in range(min_y, max_y + 1):
+                cell = cells.get(pack_cell(cell_x, cell_y))
+                if cell:
+                    yield from cell
+
+    @staticmethod
+    def _ring_keys(center_x: int, center_y: int, ring: int) -> Iterator[int]:
+        """Itera pelas chaves das células no perímetro do anel 'ring' ao redor do centro"""
+        if ring == 0:
+            yield pack_cell(center_x, center_y)
+            return
+        for dx in range(-ring, ring + 1):
+            yield pack_cell(center_x + dx, center_y - ring)
+            yield pack_cell(center_x + dx, center_y + ring)
+        for dy in range(-ring + 1, ring):
+            yield pack_cell(center_x - ring, center_y + dy)
+            yield pack_cell(center_x + ring, center_y + dy)
+
+    def _discard_from_cell(self, entity_id: int, key: int) -> None:
+        """Remove uma entidade de uma célula, apagando células vazias"""
+        cell = self.cells.get(key)
+        if cell is not None:
+            cell.discard(entity_id)
+            if not cell:
+                del self.cells[key]
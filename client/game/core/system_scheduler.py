@@ -0,0 +1,233 @@
+"""
+Escalonador de sistemas - executa os sistemas do ECS em ordem, em paralelo quando possível
+"""
+import os
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+class System(ABC):
+    """
+    Classe abstrata base para sistemas do ECS
+    Cada sistema declara quais tipos de componente lê e escreve; o escalonador usa
+    essa informação para decidir quais sistemas podem rodar ao mesmo tempo
+    """
+
+    # Tipos de componente lidos pelo sistema
+    reads: Tuple[str, ...] = ()
+    # Tipos de componente escritos pelo sistema
+    writes: Tuple[str, ...] = ()
+    # Se False, o sistema sempre roda sozinho (ex: chama código que não é thread-safe)
+    parallel_safe: bool = True
+
+    def __init__(self):
+        # Sistemas desativados são ignorados pelo escalonador
+        self.enabled = True
+
+    @property
+    def name(self) -> str:
+        """Nome do sistema (usado em dependências e relatórios de tempo)"""
+        return type(self).__name__
+
+    def conflicts_with(self, other: "System") -> bool:
+        """
+        Verifica se dois sistemas não podem rodar ao mesmo tempo
+        Há conflito quando um escreve um tipo de componente que o outro lê ou escreve
+        """
+        if not self.parallel_safe or not other.parallel_safe:
+            return True
+        mine = set(self.writes)
+        theirs = set(other.writes)
+        return bool(mine & (set(other.reads) | theirs) or theirs & set(self.reads))
+
+    def prepare(self, entity_system) -> None:
+        """
+        Cria as consultas (entity_system.query) usadas pelo sistema
+        Chamado no registro: durante a fase paralela as consultas já existem e só são
+        lidas, sem inserções concorrentes nos dicionários do EntitySystem
+        """
+        pass
+
+    @abstractmethod
+    def update(self, dt: float, entity_system) -> None:
+        """
+        Executa o sistema por um passo de simulação
+        dt: Tempo decorrido (em segundos)
+        entity_system: Sistema de entidades sobre o qual o sistema opera
+        """
+        pass
+
+class SystemScheduler:
+    """
+    Registro e escalonador de sistemas sobre um EntitySystem
+    Agrupa sistemas sem conflito em estágios; os sistemas de um mesmo estágio rodam
+    em paralelo em um pool de threads (útil para sistemas NumPy, que liberam o GIL)
+    Mede o tempo de cada sistema a cada atualização
+    """
+
+    def __init__(self, entity_system, parallel: bool = True, max_workers: Optional[int] = None):
+        """
+        entity_system: Sistema de entidades passado a todos os sistemas
+        parallel: Se False, todos os sistemas rodam sequencialmente na thread atual
+        max_workers: Número máximo de threads do pool (padrão: até 4, conforme CPUs)
+        """
+        self.entity_system = entity_system
+        self.parallel = parallel
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        # Sistemas registrados, na ordem de registro
+        self.systems: List[System] = []
+        # Dependências explícitas (nome do sistema -> nomes que devem rodar antes)
+        self.dependencies: Dict[str, Tuple[str, ...]] = {}
+        # Estágios calculados (None quando precisam ser recalculados)
+        self.stages: Optional[List[List[System]]] = None
+        # Tempo da última execução de cada sistema (segundos)
+        self.timings: Dict[str, float] = {}
+        # Média móvel exponencial do tempo de cada sistema (segundos)
+        self.average_timings: Dict[str, float] = {}
+        # Tempo total da última atualização (segundos)
+        self.frame_time = 0.0
+        # Pool de threads (criado sob demanda)
+        self.executor: Optional[ThreadPoolExecutor] = None
+
+    def register(self, system: System, after: Iterable[str] = ()) -> System:
+        """
+        Registra um sistema
+        after: Nomes de sistemas que devem rodar antes deste
+        Sistemas em conflito rodam na ordem de registro
+        Retorna o próprio sistema (para encadeamento)
+        """
+        if self.get_system(system.name) is not None:
+            raise ValueError(f"Sistema '{system.name}' já registrado")
+        system.prepare(self.entity_system)
+        self.systems.append(system)
+        self.dependencies[system.name] = tuple(after)
+        self.stages = None
+        return system
+
+    def unregister(self, name: str) -> Optional[System]:
+        """
+        Remove um sistema pelo nome
+        Retorna o sistema removido, ou None se não existia
+        """
+        system = self.get_system(name)
+        if system is not None:
+            self.systems.remove(system)
+            del self.dependencies[name]
+            self.timings.pop(name, None)
+            self.average_timings.pop(name, None)
+            self.stages = None
+        return system
+
+    def get_system(self, name: str) -> Optional[System]:
+        """Obtém um sistema registrado pelo nome"""
+        for system in self.systems:
+            if system.name == name:
+                return system
+        return None
+
+    def build_stages(self) -> List[List[System]]:
+        """
+        Calcula os estágios de execução
+        Os sistemas são ordenados respeitando as dependências (e a ordem de registro)
+        e então agrupados: um sistema entra no último estágio se não conflitar com
+        nenhum sistema dele nem depender de algum deles; caso contrário abre um novo
+        """
+        ordered = self._order_systems()
+        stages: List[List[System]] = []
+        for system in ordered:
+            stage = stages[-1] if stages else None
+            if stage is not None and self.parallel and not any(
+                system.conflicts_with(other) or other.name in self.dependencies[system.name]
+                for other in stage
+            ):
+                stage.append(system)
+            else:
+                stages.append([system])
+        self.stages = stages
+        return stages
+
+    def update(self, dt: float) -> None:
+        """
+        Executa todos os sistemas ativos por um passo de simulação
+        dt: Tempo decorrido (em segundos)
+        """
+        stages = self.stages if self.stages is not None else self.build_stages()
+        frame_start = time.perf_counter()
+
+        for stage in stages:
+            active = [system for system in stage if system.enabled]
+            if len(active) == 1:
+                self._record(active[0].name, self._run_system(active[0], dt))
+            elif active:
+                if self.executor is None:
+                    self.executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                       thread_name_prefix="system")
+                futures = [(system, self.executor.submit(self._run_system, system, dt))
+                           for system in active]
+                # result() propaga exceções lançadas pelos sistemas
+                for system, future in futures:
+                    self._record(system.name, future.result())
+
+        self.frame_time = time.perf_counter() - frame_start
+
+    def get_timings(self) -> Dict[str, float]:
+        """
+        Retorna a média de tempo de cada sistema em milissegundos
+        """
+        return {name: value * 1000.0 for name, value in self.average_timings.items()}
+
+    def format_timings(self) -> str:
+        """
+        Retorna um relatório legível dos tempos por sistema
+        Útil para imprimir no console ou mostrar em um HUD de depuração
+        """
+        lines = [f"Sistemas: {self.frame_time * 1000.0:.3f} ms"]
+        for name, average in self.get_timings().items():
+            lines.append(f"  {name}: {average:.3f} ms (último {self.timings[name] * 1000.0:.3f} ms)")
+        return "\n".join(lines)
+
+    def shutdown(self) -> None:
+        """Encerra o pool de threads (é recriado na próxima atualização, se necessário)"""
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+
+    def _run_system(self, system: System, dt: float) -> float:
+        """Executa um sistema e retorna o tempo gasto (segundos)"""
+        start = time.perf_counter()
+        system.update(dt, self.entity_system)
+        return time.perf_counter() - start
+
+    def _record(self, name: str, elapsed: float) -> None:
+        """Registra o tempo de um sistema (último valor e média móvel)"""
+        self.timings[name] = elapsed
+        average = self.average_timings.get(name)
+        self.average_timings[name] = elapsed if average is None else average * 0.9 + elapsed * 0.1
+
+    def _order_systems(self) -> List[System]:
+        """
+        Ordena os sistemas respeitando as dependências declaradas em 'after'
+        Usa a ordem de registro como critério de desempate
+        """
+        by_name = {system.name: system for system in self.systems}
+        ordered: List[System] = []
+        visiting = set()
+        done = set()
+
+        def visit(system: System) -> None:
+            if system.name in done:
+                return
+            if system.name in visiting:
+                raise ValueError(f"Dependência circular envolvendo o sistema '{system.name}'")
+            visiting.add(system.name)
+            for dependency in self.dependencies[system.name]:
+                if dependency in by_name:
+                    visit(by_name[dependency])
+            visiting.discard(system.name)
+            done.add(system.name)
+            ordered.append(system)
+
+        for system in self.systems:
+            visit(system)
+        return ordered
@@ -35,7 +35,7 @@ class NPC:
         entity_system.add_tag(self.entity_id, "npc")
         entity_system.add_tag(self.entity_id, npc_type)  # Tag específica por tipo
         
-    def interact(self, player_id: str) -> dict:
+    def interact(self, player_id: int) -> dict:
         """
         Inicia interação com o jogador
         Retorna o diálogo inicial baseado na árvore de diálogo
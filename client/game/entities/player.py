@@ -91,7 +91,4 @@ class Player:
         
     def set_position(self, x: float, y: float) -> None:
         """Define a posição do jogador"""
-        movement = self.entity_system.get_component(self.entity_id, "MovementComponent")
-        if movement:
-            movement.x = x
-            movement.y = y
\ No newline at end of file
+        self.entity_system.set_position(self.entity_id, x, y)
\ No newline at end of file
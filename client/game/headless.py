@@ -0,0 +1,157 @@
+"""
+Modo headless - executa a simulação do GameWorld sem display, fontes ou sprites
+Uso: python -m game.headless --enemies 5000 --steps 600
+     python -m game.headless --check-ai (verificação da IA ao perder o alvo)
+"""
+import argparse
+import time
+from typing import Any, Dict, Optional
+from .core.game_loop import FixedTimestep
+from .core.scene_manager import SceneManager
+from .scenes.game_world import GameWorld
+
+class HeadlessGame:
+    """
+    Substitui o objeto principal do jogo quando não há display
+    Fornece apenas o que as cenas usam (o gerenciador de cenas)
+    """
+
+    def __init__(self):
+        # Gerenciador de cenas (as atualizações são feitas pelo HeadlessRunner)
+        self.scene_manager = SceneManager()
+        # Mundo do jogo em modo headless
+        self.world = GameWorld(self, headless=True)
+        self.scene_manager.register_scene("game_world", self.world)
+
+class HeadlessRunner:
+    """
+    Executa o GameWorld em passos fixos, o mais rápido possível ou em tempo real,
+    e coleta estatísticas de desempenho da simulação
+    """
+
+    def __init__(self, simulation_hz: float = 60.0, map_name: str = "forest", enemy_count: int = 5):
+        """
+        simulation_hz: Passos de simulação por segundo (define o dt de cada passo)
+        map_name: Mapa a carregar
+        enemy_count: Número de inimigos gerados
+        """
+        self.game = HeadlessGame()
+        self.timestep = FixedTimestep(simulation_hz)
+        self.game.scene_manager.switch_to("game_world", is_multiplayer=False,
+                                          map_name=map_name, enemy_count=enemy_count)
+        # Duração de cada passo simulado (segundos de tempo real)
+        self.step_times = []
+
+    @property
+    def world(self) -> GameWorld:
+        """Mundo simulado"""
+        return self.game.world
+
+    def step(self, dt: Optional[float] = None) -> None:
+        """Executa um único passo de simulação, medindo seu tempo"""
+        start = time.perf_counter()
+        self.world.update(self.timestep.step_dt if dt is None else dt)
+        self.step_times.append(time.perf_counter() - start)
+
+    def run(self, steps: int, realtime: bool = False) -> Dict[str, Any]:
+        """
+        Executa vários passos de simulação
+        steps: Número de passos
+        realtime: Se True, respeita a taxa de simulação (dorme entre passos);
+                  se False, simula o mais rápido possível
+        Retorna as estatísticas da execução (ver stats())
+        """
+        self.step_times = []
+        start = time.perf_counter()
+        if realtime:
+            last = start
+            while len(self.step_times) < steps:
+                now = time.perf_counter()
+                self.timestep.advance(now - last, self.step)
+                last = now
+                # Dorme até o próximo passo
+                remaining = self.timestep.step_dt - self.timestep.accumulator
+                if remaining > 0:
+                    time.sleep(remaining)
+        else:
+            for _ in range(steps):
+                self.step()
+        return self.stats(time.perf_counter() - start)
+
+    def stats(self, wall_time: float) -> Dict[str, Any]:
+        """
+        Resume os tempos dos passos executados
+        wall_time: Tempo real total da execução (segundos)
+        """
+        times = sorted(self.step_times)
+        count = len(times)
+        return {
+            "steps": count,
+            "entities": len(self.world.entity_system.entities),
+            "wall_time": wall_time,
+            "steps_per_second": count / wall_time if wall_time > 0 else 0.0,
+            "mean_step_ms": sum(times) / count * 1000.0 if count else 0.0,
+            "p99_step_ms": times[min(count - 1, int(count * 0.99))] * 1000.0 if count else 0.0,
+            "max_step_ms": times[-1] * 1000.0 if count else 0.0,
+            "systems_ms": self.world.scheduler.get_timings(),
+        }
+
+def check_lost_target() -> None:
+    """
+    Verificação de regressão da IA: um inimigo perseguindo o jogador deve voltar a
+    ficar ocioso/vagar quando o jogador sai do alcance de visão ou é removido
+    Lança RuntimeError se a IA falhar
+    """
+    for scenario in ("out_of_sight", "removed"):
+        runner = HeadlessRunner(enemy_count=1)
+        world = runner.world
+        entity_system = world.entity_system
+        player_id = world.local_player.entity_id
+        enemy_id = next(iter(entity_system.get_entities_with_tag("enemy")))
+        ai_controller = entity_system.get_component(enemy_id, "AIController")
+
+        # Inimigo a 50px do jogador: passa a persegui-lo
+        x, y = entity_system.get_position(player_id)
+        entity_system.set_position(enemy_id, x + 50, y)
+        runner.run(3)
+        if ai_controller.current_state != "chase":
+            raise RuntimeError(f"{scenario}: inimigo perto do jogador em '{ai_controller.current_state}'")
+
+        if scenario == "out_of_sight":
+            entity_system.set_position(player_id, x + 5000, y)
+        else:
+            entity_system.remove_entity(player_id)
+            world.local_player = None
+        runner.run(3)
+        if ai_controller.current_state not in ("idle", "wander"):
+            raise RuntimeError(f"{scenario}: inimigo sem alvo em '{ai_controller.current_state}'")
+    print("IA: perda de alvo OK")
+
+def main() -> None:
+    """Ponto de entrada da linha de comando"""
+    parser = argparse.ArgumentParser(description="Executa a simulação do jogo sem display")
+    parser.add_argument("--enemies", type=int, default=1000, help="número de inimigos")
+    parser.add_argument("--steps", type=int, default=600, help="número de passos de simulação")
+    parser.add_argument("--hz", type=float, default=60.0, help="passos de simulação por segundo")
+    parser.add_argument("--map", default="forest", help="mapa a carregar")
+    parser.add_argument("--realtime", action="store_true", help="respeita a taxa de simulação")
+    parser.add_argument("--check-ai", action="store_true",
+                        help="verifica a IA quando o jogador sai de vista ou é removido")
+    args = parser.parse_args()
+
+    if args.check_ai:
+        check_lost_target()
+        return
+
+    runner = HeadlessRunner(args.hz, args.map, args.enemies)
+    stats = runner.run(args.steps, realtime=args.realtime)
+
+    print(f"Passos: {stats['steps']}  Entidades: {stats['entities']}")
+    print(f"Tempo total: {stats['wall_time']:.3f} s ({stats['steps_per_second']:.1f} passos/s)")
+    print(f"Passo: média {stats['mean_step_ms']:.3f} ms, p99 {stats['p99_step_ms']:.3f} ms, "
+          f"máx {stats['max_step_ms']:.3f} ms")
+    for name, value in stats["systems_ms"].items():
+        print(f"  {name}: {value:.3f} ms")
+
+if __name__ == "__main__":
+    main()
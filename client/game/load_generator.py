@@ -0,0 +1,419 @@
+"""
+Gerador de carga - conecta clientes simulados (bots) a um servidor multiplayer e mede até
+quantos jogadores ele aguenta
+Uso: python -m game.load_generator --clients 10,25,50,100 --duration 15 --spawn-server
+
+Cada bot é um NetworkClient completo (uma conexão socket.io própria) que pede o estado por
+delta, confirma os snapshots, envia entrada agrupada pelo InputBatcher e ataca de vez em
+quando, como o cliente do jogo (com a mesma fila de envio). Todos os bots são atualizados pelo mesmo loop em passos
+fixos; as mensagens de cada um são processadas por poll(), na thread do loop
+
+Com várias quantidades de clientes (--clients 10,25,50), a carga é aplicada em etapas: cada
+etapa conecta os bots que faltam, mede durante --duration segundos e imprime um relatório.
+A execução para na primeira etapa em que o p99 do tick do servidor passa do orçamento do
+tick (1 / taxa de simulação) - o limite de jogadores está entre ela e a anterior
+
+Medições por etapa:
+- Tick do servidor (média, p99, máx), pedido com 'server_stats' aos dois servidores
+- RTT ('net_ping' / 'net_pong') e idade dos estados recebidos (instante de chegada menos o
+  instante do snapshot no servidor; só faz sentido com o servidor na mesma máquina)
+- Custo de decodificação no cliente (aplicar cada delta no DeltaStateReceiver)
+- Banda e mensagens por cliente, resyncs e bots desconectados
+"""
+import argparse
+import random
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .core.game_loop import FixedTimestep
+from .core.network_client import NetworkClient
+from .networking.delta_state import DeltaStateReceiver
+from .networking.input_batcher import INPUT_KEYS, InputBatcher
+from .networking.messages import PlayerActionMessage, PlayerInputMessage
+from .networking.telemetry import percentile_summary
+
+# Comportamentos disponíveis para os bots
+BEHAVIORS = ("random", "scripted", "idle")
+# Passos de simulação dos bots por segundo (como o cliente do jogo)
+BOT_HZ = 60.0
+# Intervalo entre pedidos de 'server_stats' (s)
+STATS_INTERVAL = 1.0
+# Ataques por segundo de cada bot (em média, no comportamento aleatório)
+ATTACK_RATE = 0.5
+# Duração de cada trecho do percurso do comportamento roteirizado (s)
+SCRIPT_LEG = 1.0
+# Percurso do comportamento roteirizado (um quadrado)
+SCRIPT_DIRECTIONS = ("right", "down", "left", "up")
+
+
+class Bot:
+    """
+    Cliente simulado: um NetworkClient dirigido por um comportamento, sem display
+    """
+
+    def __init__(self, index: int, server_url: str, behavior: str = "random",
+                 rng: Optional[random.Random] = None):
+        """
+        index: Número do bot (desloca o percurso roteirizado)
+        server_url: URL do servidor
+        behavior: Um de BEHAVIORS
+        rng: Gerador de números aleatórios (para execuções reproduzíveis)
+        """
+        if behavior not in BEHAVIORS:
+            raise ValueError(f"Comportamento desconhecido: {behavior}")
+        self.index = index
+        self.behavior = behavior
+        self.rng = rng or random.Random()
+        self.client = NetworkClient(server_url)
+        self.receiver = DeltaStateReceiver()
+        self.batcher = InputBatcher()
+        # Entrada atual do bot (mesma estrutura que a mensagem de entrada do jogador)
+        self.input = PlayerInputMessage(player_id="", inputs={key: False for key in INPUT_KEYS})
+        self.next_change = 0.0
+        self.started_at = 0.0
+        # Relógio de parede equivalente a time.monotonic() (idade dos estados)
+        self.wall_offset = time.time() - time.monotonic()
+        # Instante (ms, relógio do servidor) do último estado aplicado: é o que o bot "vê",
+        # e o servidor resolve os ataques nas posições desse instante (lag_compensation)
+        self.state_time: Optional[float] = None
+        self.reset_stats()
+
+        self.client.register_callback("game_state", self.on_full_state)
+        self.client.register_callback("game_state_update", self.on_full_state)
+        self.client.register_callback("game_state_delta", self.on_state_delta)
+        self.client.register_callback("net_pong", self.on_pong)
+
+    def reset_stats(self) -> None:
+        """Começa uma nova medição"""
+        # Amostras (s): RTT, idade dos estados e custo de aplicar cada delta
+        self.rtts: List[float] = []
+        self.state_ages: List[float] = []
+        self.decode_times: List[float] = []
+        self.states = 0
+        self.resyncs = 0
+        self.attacks = 0
+        self.client.telemetry.reset()
+        self.client.outbound.queued = 0
+        self.client.outbound.packets = 0
+
+    @property
+    def connected(self) -> bool:
+        return self.client.connected
+
+    def connect(self, now: float) -> bool:
+        """Conecta ao servidor e pede o estado por delta; retorna se conectou"""
+        self.client.connect()
+        if not self.client.connected:
+            return False
+        try:
+            self.input.player_id = self.client.sio.get_sid()
+        except Exception:
+            pass
+        self.receiver.reset()
+        self.batcher.reset()
+        self.state_time = None
+        self.started_at = now
+        self.next_change = now
+        self.client.send("state_mode", {"mode": "delta"})
+        return True
+
+    def disconnect(self) -> None:
+        if self.client.connected:
+            self.client.disconnect()
+
+    def update(self, now: float, dt: float) -> None:
+        """Um passo do bot: mensagens recebidas, decisão, entrada e ataques"""
+        self.client.poll(None)
+        if not self.client.connected:
+            return
+        self.choose_input(now)
+        self.batcher.sample(self.input.inputs, now, dt)
+        packet = self.batcher.flush(now)
+        if packet is not None:
+            self.client.send("player_input", packet)
+        if self.behavior != "idle" and self.rng.random() < ATTACK_RATE * dt:
+            self.attack(now)
+        # Envia a entrada deste passo junto com as confirmações do poll()
+        self.client.flush()
+
+    def choose_input(self, now: float) -> None:
+        """Atualiza as teclas pressionadas de acordo com o comportamento"""
+        inputs = self.input.inputs
+        if self.behavior == "scripted":
+            leg = int((now - self.started_at) / SCRIPT_LEG + self.index) % len(SCRIPT_DIRECTIONS)
+            for key in INPUT_KEYS:
+                inputs[key] = key == SCRIPT_DIRECTIONS[leg]
+        elif self.behavior == "random" and now >= self.next_change:
+            # Uma direção (ou diagonal, ou parado) por um intervalo aleatório
+            horizontal = self.rng.choice((None, "left", "right"))
+            vertical = self.rng.choice((None, "up", "down"))
+            for key in INPUT_KEYS:
+                inputs[key] = key in (horizontal, vertical)
+            self.next_change = now + self.rng.uniform(0.3, 2.0)
+
+    def attack(self, now: float) -> None:
+        """Ataca um ponto perto da posição conhecida do próprio jogador"""
+        fields = self.receiver.state["players"].get(self.input.player_id, {})
+        action = PlayerActionMessage(
+            player_id=self.input.player_id,
+            action_type="attack",
+            action_data={
+                "target_x": fields.get("x", 0) + self.rng.uniform(-60, 60),
+                "target_y": fields.get("y", 0) + self.rng.uniform(-60, 60),
+                "timestamp": self.state_time,
+            },
+        )
+        self.client.send("player_action", dict(action.action_data, type=action.action_type))
+        self.attacks += 1
+
+    def on_full_state(self, data: Any) -> None:
+        """Estado completo (ao conectar, ou de servidores sem delta)"""
+        self.states += 1
+        if isinstance(data, dict):
+            self.record_age(data.get("lastUpdate"))
+            self.observe_state_time(data.get("lastUpdate"))
+
+    def on_state_delta(self, data: Any) -> None:
+        """Aplica um delta como o cliente do jogo e confirma o snapshot"""
+        if not isinstance(data, dict):
+            return
+        start = time.perf_counter()
+        changes = self.receiver.apply(data)
+        self.decode_times.append(time.perf_counter() - start)
+        self.states += 1
+        if changes is None:
+            if self.receiver.last_seq is None or data.get("seq", 0) > self.receiver.last_seq:
+                self.resyncs += 1
+                self.client.send("state_resync")
+            return
+        self.client.send("state_ack", {"seq": data["seq"]})
+        self.record_age(data.get("timestamp"))
+        self.observe_state_time(data.get("timestamp"))
+
+    def on_pong(self, data: Any) -> None:
+        """Amostra de RTT (o ping leva o instante de envio em ms, no mesmo relógio)"""
+        received_at = self.client.last_received_at
+        if isinstance(data, dict) and isinstance(data.get("t"), (int, float)) and received_at is not None:
+            self.rtts.append(max(0.0, received_at - data["t"] / 1000.0))
+
+    def observe_state_time(self, timestamp: Any) -> None:
+        """Guarda o instante do estado aplicado (enviado nos ataques)"""
+        if isinstance(timestamp, (int, float)):
+            self.state_time = timestamp
+
+    def record_age(self, timestamp: Any) -> None:
+        """Guarda há quanto tempo (s) o servidor gerou o estado recebido"""
+        received_at = self.client.last_received_at
+        if isinstance(timestamp, (int, float)) and received_at is not None:
+            self.state_ages.append(max(0.0, received_at + self.wall_offset - timestamp / 1000.0))
+
+
+class LoadGenerator:
+    """
+    Conecta bots em etapas e mede o servidor e os clientes em cada uma
+    """
+
+    def __init__(self, server_url: str, behavior: str = "random", connect_interval: float = 0.05,
+                 seed: Optional[int] = None):
+        """
+        server_url: URL do servidor
+        behavior: Comportamento dos bots (ver BEHAVIORS)
+        connect_interval: Intervalo entre duas conexões novas (s)
+        seed: Semente dos comportamentos aleatórios (None = aleatória)
+        """
+        self.server_url = server_url
+        self.behavior = behavior
+        self.connect_interval = connect_interval
+        self.rng = random.Random(seed)
+        self.bots: List[Bot] = []
+        self.failed = 0
+        self.timestep = FixedTimestep(BOT_HZ)
+        # Tempo gasto (s) em cada passo do loop dos bots: se ficar perto de 1 / BOT_HZ,
+        # o gerador é o gargalo e as medições de latência não valem
+        self.step_times: List[float] = []
+        # Respostas de 'server_stats' da etapa atual
+        self.server_stats: List[Dict[str, Any]] = []
+        self.last_stats_request: Optional[float] = None
+
+    def add_bot(self, now: float) -> None:
+        """Cria e conecta mais um bot"""
+        bot = Bot(len(self.bots), self.server_url, self.behavior, random.Random(self.rng.random()))
+        if not self.bots:
+            # O primeiro bot também pergunta ao servidor a duração dos ticks
+            bot.client.register_callback("server_stats", self.server_stats.append)
+        if bot.connect(now):
+            self.bots.append(bot)
+        else:
+            self.failed += 1
+
+    def step(self, dt: float) -> None:
+        """Um passo de todos os bots"""
+        start = time.perf_counter()
+        now = time.monotonic()
+        for bot in self.bots:
+            bot.update(now, dt)
+        if self.bots and self.bots[0].connected and (
+                self.last_stats_request is None or now - self.last_stats_request >= STATS_INTERVAL):
+            self.last_stats_request = now
+            self.bots[0].client.send("server_stats")
+        self.step_times.append(time.perf_counter() - start)
+
+    def run_stage(self, clients: int, duration: float) -> Dict[str, Any]:
+        """
+        Conecta bots até haver 'clients' e mede por 'duration' segundos
+        Retorna o relatório da etapa (ver report())
+        """
+        last = time.perf_counter()
+        next_connect = 0.0
+        # Conexão gradual: várias conexões simultâneas medem o handshake, não o jogo
+        while len(self.bots) + self.failed < clients:
+            now = time.perf_counter()
+            if now >= next_connect:
+                self.add_bot(time.monotonic())
+                next_connect = time.perf_counter() + self.connect_interval
+            self.timestep.advance(now - last, self.step)
+            last = now
+            time.sleep(max(0.0, self.timestep.step_dt - self.timestep.accumulator))
+
+        for bot in self.bots:
+            bot.reset_stats()
+        self.step_times = []
+        self.server_stats.clear()
+        start = last = time.perf_counter()
+        while last - start < duration:
+            now = time.perf_counter()
+            self.timestep.advance(now - last, self.step)
+            last = now
+            remaining = self.timestep.step_dt - self.timestep.accumulator
+            if remaining > 0:
+                time.sleep(remaining)
+        return self.report(time.perf_counter() - start)
+
+    def report(self, elapsed: float) -> Dict[str, Any]:
+        """Resume as medições da etapa atual"""
+        bots = self.bots
+        connected = [bot for bot in bots if bot.connected]
+        summaries = [bot.client.telemetry.summary() for bot in connected]
+        server = self.server_stats[-1] if self.server_stats else None
+        count = max(1, len(connected))
+        return {
+            "clients": len(bots),
+            "connected": len(connected),
+            "failed": self.failed,
+            "elapsed": elapsed,
+            "server": server,
+            # Pior p99 do tick entre as respostas da etapa
+            "server_tick_p99_ms": max((stats["tick_ms"]["p99"] for stats in self.server_stats), default=None),
+            "rtt_ms": percentile_summary(sample for bot in bots for sample in bot.rtts),
+            "state_age_ms": percentile_summary(sample for bot in bots for sample in bot.state_ages),
+            "decode_ms": percentile_summary(sample for bot in bots for sample in bot.decode_times),
+            "states_per_client_per_second": sum(bot.states for bot in connected) / count / elapsed,
+            "received_bytes_per_client_per_second":
+                sum(s["received_bytes_per_second"] for s in summaries) / count,
+            "sent_bytes_per_client_per_second": sum(s["sent_bytes_per_second"] for s in summaries) / count,
+            "sent_packets_per_client_per_second": sum(s["sent_packets_per_second"] for s in summaries) / count,
+            # Mensagens enfileiradas por pacote enviado (ver outbound_queue)
+            "messages_per_packet": (sum(bot.client.outbound.queued for bot in connected)
+                                    / max(1, sum(bot.client.outbound.packets for bot in connected))),
+            "resyncs": sum(bot.resyncs for bot in bots),
+            "attacks": sum(bot.attacks for bot in bots),
+            "generator_step_ms": percentile_summary(self.step_times),
+        }
+
+    def shutdown(self) -> None:
+        """Desconecta todos os bots"""
+        for bot in self.bots:
+            bot.disconnect()
+        self.bots = []
+
+
+def spawn_server(port: int, enemies: int, timeout: float = 10.0) -> subprocess.Popen:
+    """Inicia o servidor Python (game.server) em outro processo e espera a porta abrir"""
+    client_dir = Path(__file__).resolve().parent.parent
+    process = subprocess.Popen([sys.executable, "-m", "game.server", "--host", "127.0.0.1",
+                                "--port", str(port), "--enemies", str(enemies)], cwd=client_dir)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"O servidor encerrou com código {process.returncode}")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return process
+        except OSError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError(f"O servidor não abriu a porta {port} em {timeout:.0f} s")
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    """Imprime o relatório de uma etapa"""
+    def line(name, stats):
+        return (f"  {name}: média {stats['mean']:.2f} ms, p50 {stats['p50']:.2f} ms, "
+                f"p99 {stats['p99']:.2f} ms, máx {stats['max']:.2f} ms ({stats['count']} amostras)")
+
+    print(f"Clientes: {report['connected']}/{report['clients']} conectados "
+          f"({report['failed']} falhas) em {report['elapsed']:.1f} s")
+    server = report["server"]
+    if server is None:
+        print("  tick do servidor: sem resposta a 'server_stats'")
+    else:
+        print(f"  tick do servidor ({server['server']}, {server['players']} jogadores): "
+              f"média {server['tick_ms']['mean']:.2f} ms, p99 {server['tick_ms']['p99']:.2f} ms, "
+              f"máx {server['tick_ms']['max']:.2f} ms (orçamento {1000.0 / server['tick_rate']:.2f} ms)")
+    print(line("RTT", report["rtt_ms"]))
+    print(line("idade dos estados", report["state_age_ms"]))
+    print(line("decodificação (delta)", report["decode_ms"]))
+    print(f"  por cliente: {report['states_per_client_per_second']:.1f} estados/s, "
+          f"{report['received_bytes_per_client_per_second'] / 1024:.1f} KB/s recebidos, "
+          f"{report['sent_bytes_per_client_per_second'] / 1024:.2f} KB/s enviados em "
+          f"{report['sent_packets_per_client_per_second']:.1f} pacotes/s "
+          f"({report['messages_per_packet']:.1f} mensagens por pacote)")
+    print(f"  resyncs: {report['resyncs']}  ataques: {report['attacks']}")
+    print(line("passo do gerador", report["generator_step_ms"]))
+
+
+def main() -> None:
+    """Ponto de entrada da linha de comando"""
+    parser = argparse.ArgumentParser(description="Teste de carga com clientes simulados")
+    parser.add_argument("--url", default="http://127.0.0.1:3000", help="URL do servidor")
+    parser.add_argument("--clients", default="10",
+                        help="quantidade de clientes, ou etapas separadas por vírgula (ex: 10,25,50)")
+    parser.add_argument("--duration", type=float, default=10.0, help="duração de cada etapa (s)")
+    parser.add_argument("--behavior", choices=BEHAVIORS, default="random", help="comportamento dos bots")
+    parser.add_argument("--connect-interval", type=float, default=0.05, help="intervalo entre conexões (s)")
+    parser.add_argument("--seed", type=int, default=None, help="semente dos comportamentos aleatórios")
+    parser.add_argument("--spawn-server", action="store_true",
+                        help="inicia o servidor Python local (game.server) na porta da URL")
+    parser.add_argument("--enemies", type=int, default=5, help="inimigos do servidor iniciado")
+    args = parser.parse_args()
+
+    stages = sorted(int(value) for value in args.clients.split(",") if value.strip())
+    server = None
+    if args.spawn_server:
+        port = int(args.url.rsplit(":", 1)[-1].split("/")[0])
+        server = spawn_server(port, args.enemies)
+
+    generator = LoadGenerator(args.url, args.behavior, args.connect_interval, args.seed)
+    try:
+        for clients in stages:
+            report = generator.run_stage(clients, args.duration)
+            print_report(report)
+            stats = report["server"]
+            if stats is not None and report["server_tick_p99_ms"] > 1000.0 / stats["tick_rate"]:
+                print(f"O tick do servidor passou do orçamento com {report['connected']} clientes")
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        generator.shutdown()
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,4 +3,14 @@ Módulo de rede - comunicação multiplayer e sincronização
 """
 # Expõe as classes de rede principais
 from .messages import *
-from .protocol import NetworkProtocol
\ No newline at end of file
+from .protocol import NetworkProtocol
+from .dispatcher import MessageDispatcher
+from .delta_state import DeltaStateReceiver, diff_collection, encode_delta
+from .input_batcher import InputBatcher
+from .prediction import ClientPrediction
+from .interpolation import InterpolationBuffer, ServerClock
+from .entity_mirror import EntityMirror
+from .inbound_queue import InboundQueue
+from .telemetry import NetworkTelemetry
+from .outbound_queue import OutboundQueue
+from .session import ClientSession
@@ -0,0 +1,475 @@
+"""
+Codec binário - serializa as mensagens de messages.py em um formato compacto
+
+Layout de uma mensagem:
+    cabeçalho   B magic, B versão, B tipo (índice em MESSAGE_TYPES)
+    strings     I quantidade, I[] tamanhos (em caracteres), I tamanho do bloco, bloco UTF-8
+    campos      na ordem declarada na dataclass
+
+Layout de um lote (várias mensagens em um único payload):
+    cabeçalho   B magic, B versão, B BATCH_TYPE
+    índice      I quantidade, I[] tamanhos (em bytes) de cada mensagem
+    mensagens   uma após a outra, cada uma no layout acima
+
+Campos str/int/float/bool são empacotados diretamente (str como índice na tabela de
+strings, que é compartilhada por toda a mensagem). Os demais (Dict, List, Any) usam
+valores com tag; dicionários de registros com as mesmas chaves (ex: entidades de um
+GameStateUpdateMessage) são gravados em colunas, cada uma com o menor tipo numérico
+que não perde informação
+"""
+import struct
+from dataclasses import fields
+from itertools import accumulate, chain, count as counter, filterfalse, repeat
+from operator import itemgetter
+from typing import Any, Dict, List, Tuple, get_type_hints
+import numpy as np
+from .messages import MESSAGE_TYPES
+
+# Primeiro byte de toda mensagem binária (nunca é o início de um JSON)
+MAGIC = 0xB7
+# Versão atual do formato binário
+BINARY_VERSION = 1
+# Tipo reservado no cabeçalho para lotes de mensagens
+BATCH_TYPE = 0xFF
+
+# Tags de valores dinâmicos
+_NONE, _FALSE, _TRUE, _INT, _FLOAT, _STR, _LIST, _DICT, _RECORD_MAP, _RECORD_LIST = range(10)
+
+# Tipos de coluna
+# Números e booleanos empacotados (código de struct -> dtype little-endian)
+_NUMERIC_DTYPES = {
+    "b": np.dtype("<i1"), "h": np.dtype("<i2"), "i": np.dtype("<i4"), "q": np.dtype("<i8"),
+    "B": np.dtype("<u1"), "H": np.dtype("<u2"), "I": np.dtype("<u4"),
+    "f": np.dtype("<f4"), "d": np.dtype("<f8"), "?": np.dtype("?")
+}
+# Strings repetidas, gravadas como índices na tabela de strings
+_COL_STR = ord("S")
+# Strings (quase) todas distintas, como ids, gravadas em um bloco próprio
+_COL_UNIQUE_STR = ord("U")
+# Listas de mesmo tamanho (ex: cores), gravadas como uma única coluna achatada
+_COL_LIST = ord("L")
+# Decimais com poucas casas (ex: posições arredondadas), gravados como inteiros escalados
+_COL_DECIMAL = ord("D")
+# Valores heterogêneos, gravados um a um com tag
+_COL_ANY = ord("A")
+# Casas decimais testadas para colunas decimais
+_DECIMAL_PLACES = (1, 2, 3)
+
+_HEADER = struct.Struct("<BBB")
+_U32 = struct.Struct("<I")
+_TAG = struct.Struct("<B")
+_TAG_U32 = struct.Struct("<BI")
+_TAG_INT = struct.Struct("<Bq")
+_TAG_FLOAT = struct.Struct("<Bd")
+_INT64 = struct.Struct("<q")
+_FLOAT64 = struct.Struct("<d")
+_COLUMN = struct.Struct("<IB")
+_FIELD_PACKERS = {"q": _INT64, "d": _FLOAT64, "?": struct.Struct("<?"), "S": _U32}
+# Tipos aceitos em cada código de campo (validados ao codificar)
+_FIELD_TYPES = {"q": int, "d": (int, float), "?": bool, "S": str}
+# Blocos com até esta quantidade de valores são lidos com struct (mais rápido que numpy
+# para poucos valores, o caso das mensagens pequenas)
+_SMALL_BLOCK = 32
+
+# Classe de mensagem -> índice do tipo
+_TYPE_IDS = {cls: type_id for type_id, cls in enumerate(MESSAGE_TYPES)}
+# Cache do esquema de cada classe: lista de (nome do campo, código)
+_schemas: Dict[type, List[Tuple[str, str]]] = {}
+# Cache dos leitores de campo de cada classe (ver _field_readers)
+_readers: Dict[type, List[Tuple[str, str, Any]]] = {}
+
+
+def _schema(cls: type) -> List[Tuple[str, str]]:
+    """Obtém (ou monta) o esquema de campos de uma dataclass de mensagem"""
+    schema = _schemas.get(cls)
+    if schema is None:
+        hints = get_type_hints(cls)
+        codes = {str: "S", int: "q", float: "d", bool: "?"}
+        schema = [(f.name, codes.get(hints.get(f.name), "A")) for f in fields(cls)]
+        _schemas[cls] = schema
+    return schema
+
+
+def _field_readers(cls: type) -> List[Tuple[str, str, Any]]:
+    """Esquema de uma classe com o struct de cada campo já resolvido (para decodificar)"""
+    readers = _readers.get(cls)
+    if readers is None:
+        readers = _readers[cls] = [(name, code, _FIELD_PACKERS.get(code)) for name, code in _schema(cls)]
+    return readers
+
+
+def _int_code(low: int, high: int) -> str:
+    """Menor código de struct inteiro que comporta o intervalo [low, high]"""
+    if low >= 0:
+        if high < 0x100:
+            return "B"
+        if high < 0x10000:
+            return "H"
+        if high < 0x100000000:
+            return "I"
+    if -0x80 <= low and high < 0x80:
+        return "b"
+    if -0x8000 <= low and high < 0x8000:
+        return "h"
+    if -0x80000000 <= low and high < 0x80000000:
+        return "i"
+    return "q"
+
+
+class _Writer:
+    """Acumula as partes de uma mensagem e sua tabela de strings"""
+
+    def __init__(self):
+        self.parts: List[bytes] = []
+        self.strings: Dict[str, int] = {}
+
+    def intern(self, text: str) -> int:
+        """Índice de uma string na tabela (adicionando-a se necessário)"""
+        index = self.strings.get(text)
+        if index is None:
+            index = self.strings[text] = len(self.strings)
+        return index
+
+    def intern_many(self, texts) -> List[int]:
+        """Índices de várias strings (adicionando à tabela as que faltarem)"""
+        strings = self.strings
+        missing = list(filterfalse(strings.__contains__, dict.fromkeys(texts)))
+        if missing:
+            strings.update(zip(missing, counter(len(strings))))
+        return list(map(strings.__getitem__, texts))
+
+    def value(self, value: Any) -> None:
+        """Grava um valor dinâmico com tag"""
+        kind = type(value)
+        if value is None:
+            self.parts.append(_TAG.pack(_NONE))
+        elif kind is bool:
+            self.parts.append(_TAG.pack(_TRUE if value else _FALSE))
+        elif kind is int:
+            if not -0x8000000000000000 <= value < 0x8000000000000000:
+                raise ValueError(f"Inteiro fora do intervalo de 64 bits: {value}")
+            self.parts.append(_TAG_INT.pack(_INT, value))
+        elif kind is float:
+            self.parts.append(_TAG_FLOAT.pack(_FLOAT, value))
+        elif kind is str:
+            self.parts.append(_TAG_U32.pack(_STR, self.intern(value)))
+        elif isinstance(value, dict):
+            if self.records(_RECORD_MAP, list(value.values())):
+                self.column(list(value.keys()), unique=True)
+                return
+            self.parts.append(_TAG_U32.pack(_DICT, len(value)))
+            for key, item in value.items():
+                if type(key) is not str:
+                    raise ValueError(f"Chave de dicionário não suportada: {key!r}")
+                self.parts.append(_U32.pack(self.intern(key)))
+                self.value(item)
+        elif isinstance(value, (list, tuple)):
+            if not self.records(_RECORD_LIST, value):
+                self.parts.append(_TAG_U32.pack(_LIST, len(value)))
+                for item in value:
+                    self.value(item)
+        else:
+            raise ValueError(f"Tipo não suportado pelo codec binário: {kind.__name__}")
+
+    def records(self, tag: int, values) -> bool:
+        """
+        Grava uma sequência de dicionários com as mesmas chaves em colunas
+        Retorna False (sem gravar nada) se os valores não forem registros uniformes
+        """
+        if len(values) < 2 or set(map(type, values)) != {dict}:
+            return False
+        keys = list(values[0])
+        if not keys or set(map(type, keys)) != {str} or set(map(len, values)) != {len(keys)}:
+            return False
+        # Mesmo número de chaves e todas presentes: mesmo conjunto de chaves
+        try:
+            rows = list(map(itemgetter(*keys), values))
+        except KeyError:
+            return False
+
+        self.parts.append(_TAG_U32.pack(tag, len(values)))
+        self.parts.append(_U32.pack(len(keys)))
+        self.parts.append(struct.pack(f"<{len(keys)}I", *self.intern_many(keys)))
+        if len(keys) == 1:
+            self.column(rows)
+        else:
+            for column in zip(*rows):
+                self.column(list(column))
+        return True
+
+    def column(self, values: list, unique: bool = False) -> None:
+        """
+        Grava uma coluna de valores, empacotada com o menor tipo que não perde informação
+        unique: Indica strings (quase) todas distintas, que não compensam ir para a tabela
+        """
+        count = len(values)
+        types = set(map(type, values))
+        if len(types) == 1:
+            kind = types.pop()
+            if kind is float:
+                self.float_column(np.array(values, dtype=np.float64))
+                return
+            if kind is int:
+                try:
+                    data = np.array(values, dtype=np.int64)
+                except OverflowError:
+                    data = None
+                if data is not None:
+                    self.numeric_column(data, _int_code(int(data.min()), int(data.max())))
+                    return
+            elif kind is bool:
+                self.numeric_column(np.array(values, dtype=np.bool_), "?")
+                return
+            elif kind is str:
+                if unique:
+                    self.parts.append(_COLUMN.pack(count, _COL_UNIQUE_STR))
+                    self.parts.append(np.fromiter(map(len, values), dtype="<u4", count=count).tobytes())
+                    blob = "".join(values).encode("utf-8")
+                    self.parts.append(_U32.pack(len(blob)))
+                    self.parts.append(blob)
+                else:
+                    indexes = np.array(self.intern_many(values), dtype=np.int64)
+                    self.parts.append(_COLUMN.pack(count, _COL_STR))
+                    self.numeric_column(indexes, _int_code(0, int(indexes.max())), header=False)
+                return
+            elif kind is list or kind is tuple:
+                lengths = set(map(len, values))
+                if len(lengths) == 1:
+                    self.parts.append(_COLUMN.pack(count, _COL_LIST))
+                    self.parts.append(_TAG.pack(kind is tuple))
+                    self.parts.append(_U32.pack(lengths.pop()))
+                    self.column(list(chain.from_iterable(values)))
+                    return
+
+        self.parts.append(_COLUMN.pack(count, _COL_ANY))
+        for value in values:
+            self.value(value)
+
+    def numeric_column(self, data: np.ndarray, code: str, header: bool = True) -> None:
+        """Grava uma coluna numérica com o código de struct informado"""
+        if header:
+            self.parts.append(_COLUMN.pack(len(data), ord(code)))
+        else:
+            self.parts.append(code.encode())
+        self.parts.append(data.astype(_NUMERIC_DTYPES[code], copy=False).tobytes())
+
+    def float_column(self, data: np.ndarray) -> None:
+        """
+        Grava uma coluna de floats como float32 ou decimal escalado quando isso
+        reconstrói exatamente os valores; caso contrário, como float64
+        """
+        if np.array_equal(data.astype(np.float32).astype(np.float64), data):
+            self.numeric_column(data, "f")
+            return
+        for places in _DECIMAL_PLACES:
+            scale = 10 ** places
+            scaled = np.round(data * scale)
+            if np.array_equal(scaled / scale, data) and np.abs(scaled).max() < 2 ** 63:
+                self.parts.append(_COLUMN.pack(len(data), _COL_DECIMAL))
+                self.parts.append(_TAG.pack(places))
+                self.numeric_column(scaled.astype(np.int64),
+                                    _int_code(int(scaled.min()), int(scaled.max())), header=False)
+                return
+        self.numeric_column(data, "d")
+
+    def finish(self, header: bytes) -> bytes:
+        """Monta a mensagem final (cabeçalho, tabela de strings e corpo)"""
+        strings = list(self.strings)
+        table = [header, _U32.pack(len(strings))]
+        if strings:
+            table.append(np.fromiter(map(len, strings), dtype="<u4", count=len(strings)).tobytes())
+            blob = "".join(strings).encode("utf-8")
+            table.append(_U32.pack(len(blob)))
+            table.append(blob)
+        return b"".join(table + self.parts)
+
+
+class _Reader:
+    """Lê valores de uma mensagem binária"""
+
+    def __init__(self, data: bytes, offset: int):
+        self.data = data
+        self.offset = offset
+        self.strings: List[str] = []
+
+    def unpack(self, packer: struct.Struct):
+        values = packer.unpack_from(self.data, self.offset)
+        self.offset += packer.size
+        return values
+
+    def byte(self) -> int:
+        value = self.data[self.offset]
+        self.offset += 1
+        return value
+
+    def array(self, dtype: np.dtype, count: int) -> np.ndarray:
+        """Lê um bloco de 'count' valores do tipo informado"""
+        data = np.frombuffer(self.data, dtype=dtype, count=count, offset=self.offset)
+        self.offset += dtype.itemsize * count
+        return data
+
+    def string_block(self, count: int) -> List[str]:
+        """Lê 'count' strings gravadas como tamanhos seguidos de um bloco UTF-8"""
+        if count <= _SMALL_BLOCK:
+            lengths = struct.unpack_from(f"<{count}I", self.data, self.offset)
+            self.offset += 4 * count
+        else:
+            lengths = self.array(_NUMERIC_DTYPES["I"], count).tolist()
+        (size,) = self.unpack(_U32)
+        blob = self.data[self.offset:self.offset + size].decode("utf-8")
+        self.offset += size
+        return [blob[end - length:end] for end, length in zip(accumulate(lengths), lengths)]
+
+    def read_strings(self) -> None:
+        """Lê a tabela de strings"""
+        (count,) = self.unpack(_U32)
+        if count:
+            self.strings = self.string_block(count)
+
+    def value(self) -> Any:
+        """Lê um valor dinâmico com tag"""
+        tag = self.byte()
+        if tag == _NONE:
+            return None
+        if tag == _FALSE:
+            return False
+        if tag == _TRUE:
+            return True
+        if tag == _INT:
+            return self.unpack(_INT64)[0]
+        if tag == _FLOAT:
+            return self.unpack(_FLOAT64)[0]
+        (count,) = self.unpack(_U32)
+        if tag == _STR:
+            return self.strings[count]
+        if tag == _LIST:
+            return [self.value() for _ in range(count)]
+        if tag == _DICT:
+            result = {}
+            for _ in range(count):
+                (key,) = self.unpack(_U32)
+                result[self.strings[key]] = self.value()
+            return result
+        if tag in (_RECORD_MAP, _RECORD_LIST):
+            (key_count,) = self.unpack(_U32)
+            keys = list(map(self.strings.__getitem__, self.array(_NUMERIC_DTYPES["I"], key_count).tolist()))
+            columns = [self.column() for _ in range(key_count)]
+            records = list(map(dict, map(zip, repeat(keys), zip(*columns))))
+            if tag == _RECORD_LIST:
+                return records
+            return dict(zip(self.column(), records))
+        raise ValueError(f"Tag desconhecida na mensagem binária: {tag}")
+
+    def column(self) -> list:
+        """Lê uma coluna de valores"""
+        count, code = self.unpack(_COLUMN)
+        if code == _COL_ANY:
+            return [self.value() for _ in range(count)]
+        if code == _COL_STR:
+            indexes = self.array(_NUMERIC_DTYPES[chr(self.byte())], count).tolist()
+            return list(map(self.strings.__getitem__, indexes))
+        if code == _COL_UNIQUE_STR:
+            return self.string_block(count)
+        if code == _COL_LIST:
+            as_tuple = self.byte()
+            (length,) = self.unpack(_U32)
+            flat = iter(self.column())
+            rows = zip(*[flat] * length) if length else ((),) * count
+            return list(rows) if as_tuple else list(map(list, rows))
+        if code == _COL_DECIMAL:
+            scale = 10 ** self.byte()
+            scaled = self.array(_NUMERIC_DTYPES[chr(self.byte())], count)
+            return (scaled / scale).tolist()
+        return self.array(_NUMERIC_DTYPES[chr(code)], count).tolist()
+
+
+def encode_message(message: Any) -> bytes:
+    """
+    Serializa uma mensagem (instância de uma classe de MESSAGE_TYPES) no formato binário
+    """
+    cls = type(message)
+    type_id = _TYPE_IDS.get(cls)
+    if type_id is None:
+        raise ValueError(f"Tipo de mensagem desconhecido: {cls.__name__}")
+
+    writer = _Writer()
+    for name, code in _schema(cls):
+        value = getattr(message, name)
+        if code == "A":
+            writer.value(value)
+            continue
+        if not isinstance(value, _FIELD_TYPES[code]):
+            raise ValueError(f"Campo '{name}' de {cls.__name__} com tipo inválido: {type(value).__name__}")
+        if code == "S":
+            writer.parts.append(_U32.pack(writer.intern(value)))
+        else:
+            try:
+                writer.parts.append(_FIELD_PACKERS[code].pack(value))
+            except struct.error:
+                raise ValueError(f"Campo '{name}' de {cls.__name__} fora do intervalo: {value!r}") from None
+    return writer.finish(_HEADER.pack(MAGIC, BINARY_VERSION, type_id))
+
+
+def _read_header(data: bytes, offset: int) -> int:
+    """Valida o cabeçalho em 'offset' e retorna o tipo"""
+    magic, version, type_id = _HEADER.unpack_from(data, offset)
+    if magic != MAGIC:
+        raise ValueError("Mensagem não está no formato binário")
+    if version != BINARY_VERSION:
+        raise ValueError(f"Versão do formato binário não suportada: {version}")
+    return type_id
+
+
+def decode_message(data: bytes, offset: int = 0) -> Any:
+    """
+    Desserializa uma mensagem no formato binário
+    offset: Posição da mensagem em 'data' (ex: dentro de um lote), evitando copiar o trecho
+    """
+    type_id = _read_header(data, offset)
+    if type_id >= len(MESSAGE_TYPES):
+        raise ValueError(f"Tipo de mensagem desconhecido: {type_id}")
+
+    cls = MESSAGE_TYPES[type_id]
+    reader = _Reader(data, offset + _HEADER.size)
+    reader.read_strings()
+    values = {}
+    for name, code, packer in _field_readers(cls):
+        if code == "A":
+            values[name] = reader.value()
+        elif code == "S":
+            values[name] = reader.strings[reader.unpack(packer)[0]]
+        else:
+            values[name] = reader.unpack(packer)[0]
+    return cls(**values)
+
+
+def encode_batch(messages: List[Any]) -> bytes:
+    """Serializa várias mensagens em um único lote binário"""
+    encoded = [encode_message(message) for message in messages]
+    sizes = np.fromiter(map(len, encoded), dtype="<u4", count=len(encoded)).tobytes()
+    return b"".join([_HEADER.pack(MAGIC, BINARY_VERSION, BATCH_TYPE), _U32.pack(len(encoded)), sizes] + encoded)
+
+
+def is_batch(data: bytes) -> bool:
+    """Se os dados são um lote binário (e não uma única mensagem)"""
+    return len(data) >= _HEADER.size and data[0] == MAGIC and data[2] == BATCH_TYPE
+
+
+def decode_batch(data: bytes) -> List[Any]:
+    """
+    Desserializa um lote binário
+    Cada mensagem é lida diretamente do buffer recebido, sem cópias intermediárias
+    """
+    if _read_header(data, 0) != BATCH_TYPE:
+        raise ValueError("Mensagem binária não é um lote")
+    (count,) = _U32.unpack_from(data, _HEADER.size)
+    offset = _HEADER.size + _U32.size
+    sizes = np.frombuffer(data, dtype=_NUMERIC_DTYPES["I"], count=count, offset=offset).tolist()
+    offset += 4 * count
+    messages = []
+    for size in sizes:
+        messages.append(decode_message(data, offset))
+        offset += size
+    if offset != len(data):
+        raise ValueError("Lote binário com tamanho inconsistente")
+    return messages
@@ -0,0 +1,217 @@
+"""
+Sincronização por delta - aplica no cliente apenas o que mudou no estado do servidor
+
+Formato de uma mensagem 'game_state_delta':
+    {
+        "seq": 120,          # Sequência do snapshot do servidor
+        "baseline": 118,     # Snapshot (já confirmado pelo cliente) usado como base; None = estado completo
+        "players":  {"created": {id: campos}, "changed": {id: campos alterados}, "removed": [ids]},
+        "entities": {"created": {...}, "changed": {...}, "removed": [...]}
+    }
+Listas/dicionários vazios podem ser omitidos. O cliente confirma cada snapshot aplicado
+(evento 'state_ack'), e o servidor passa a usá-lo como base dos próximos deltas
+"""
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+# Coleções sincronizadas por delta
+DELTA_COLLECTIONS = ("players", "entities")
+# Número de snapshots guardados como possíveis bases (o servidor guarda a mesma quantidade)
+SNAPSHOT_HISTORY = 64
+
+# Estado de uma coleção: id -> campos
+Snapshot = Dict[str, Dict[str, Any]]
+
+
+@dataclass
+class CollectionDelta:
+    """Diferença entre dois estados de uma coleção"""
+    # Entidades novas (id -> todos os campos)
+    created: Snapshot = field(default_factory=dict)
+    # Entidades existentes (id -> apenas os campos alterados)
+    changed: Snapshot = field(default_factory=dict)
+    # Entidades removidas
+    removed: List[str] = field(default_factory=list)
+
+    def is_empty(self) -> bool:
+        """Retorna True se nada mudou"""
+        return not (self.created or self.changed or self.removed)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Converte para o formato de rede, omitindo partes vazias"""
+        data = {}
+        if self.created:
+            data["created"] = self.created
+        if self.changed:
+            data["changed"] = self.changed
+        if self.removed:
+            data["removed"] = self.removed
+        return data
+
+
+def diff_collection(baseline: Optional[Snapshot], current: Snapshot) -> CollectionDelta:
+    """
+    Calcula a diferença de uma coleção entre a base e o estado atual
+    baseline: Estado confirmado pelo cliente (None = cliente sem base, tudo é criado)
+    current: Estado atual
+    """
+    delta = CollectionDelta()
+    if not baseline:
+        delta.created = dict(current)
+        return delta
+
+    for entity_id, fields in current.items():
+        previous = baseline.get(entity_id)
+        if previous is None:
+            delta.created[entity_id] = fields
+        elif previous is not fields:
+            changed = {key: value for key, value in fields.items() if previous.get(key) != value}
+            if changed:
+                delta.changed[entity_id] = changed
+
+    if len(baseline) > len(current) - len(delta.created):
+        delta.removed = [entity_id for entity_id in baseline if entity_id not in current]
+    return delta
+
+
+def encode_delta(seq: int, baseline_seq: Optional[int], baseline: Optional[Dict[str, Snapshot]],
+                 current: Dict[str, Snapshot]) -> Dict[str, Any]:
+    """
+    Monta uma mensagem 'game_state_delta'
+    baseline: Estado do snapshot baseline_seq (None envia o estado completo)
+    current: Estado atual (coleção -> id -> campos)
+    """
+    message = {"seq": seq, "baseline": baseline_seq if baseline is not None else None}
+    for name in DELTA_COLLECTIONS:
+        delta = diff_collection(baseline.get(name) if baseline else None, current.get(name, {}))
+        if not delta.is_empty():
+            message[name] = delta.to_dict()
+    return message
+
+
+class DeltaStateReceiver:
+    """
+    Reconstrói o estado do servidor a partir de deltas
+    Guarda os últimos snapshots (cada delta é relativo a um deles) e a sequência em que
+    cada entidade foi alterada pela última vez
+    """
+
+    def __init__(self, history: int = SNAPSHOT_HISTORY):
+        # Snapshots recentes (seq -> coleção -> id -> campos), do mais antigo ao mais novo
+        self.snapshots: "OrderedDict[int, Dict[str, Snapshot]]" = OrderedDict()
+        # Quantidade máxima de snapshots guardados
+        self.history = history
+        # Sequência do último snapshot aplicado (None = ainda sem estado)
+        self.last_seq: Optional[int] = None
+        # Coleção -> id -> sequência da última alteração
+        self.updated_at: Dict[str, Dict[str, int]] = {name: {} for name in DELTA_COLLECTIONS}
+
+    @property
+    def state(self) -> Dict[str, Snapshot]:
+        """Estado mais recente (coleção -> id -> campos)"""
+        if self.last_seq is None:
+            return {name: {} for name in DELTA_COLLECTIONS}
+        return self.snapshots[self.last_seq]
+
+    def reset(self) -> None:
+        """Descarta todo o estado (ex: ao desconectar)"""
+        self.snapshots.clear()
+        self.last_seq = None
+        for updated in self.updated_at.values():
+            updated.clear()
+
+    def apply(self, message: Dict[str, Any]) -> Optional[Dict[str, CollectionDelta]]:
+        """
+        Aplica uma mensagem de delta
+        Retorna, por coleção, o que mudou em relação ao último estado aplicado,
+        ou None se a mensagem for antiga ou sua base não for conhecida (é preciso
+        pedir o estado completo ao servidor)
+        """
+        seq = message.get("seq")
+        if seq is None or (self.last_seq is not None and seq <= self.last_seq):
+            return None
+
+        baseline_seq = message.get("baseline")
+        if baseline_seq is None:
+            baseline = None
+        else:
+            baseline = self.snapshots.get(baseline_seq)
+            if baseline is None:
+                return None
+
+        previous = self.state
+        new_state = {}
+        changes = {}
+        for name in DELTA_COLLECTIONS:
+            data = message.get(name, {})
+            collection, delta = self._apply_collection(
+                baseline.get(name, {}) if baseline is not None else {},
+                previous.get(name, {}),
+                data,
+                # Com base mais antiga que o último estado, remoções também são deduzidas
+                # (entidades criadas e removidas depois da base não aparecem no delta)
+                full_diff=baseline_seq != self.last_seq
+            )
+            new_state[name] = collection
+            changes[name] = delta
+            updated = self.updated_at[name]
+            for entity_id in delta.created:
+                updated[entity_id] = seq
+            for entity_id in delta.changed:
+                updated[entity_id] = seq
+            for entity_id in delta.removed:
+                updated.pop(entity_id, None)
+
+        self.snapshots[seq] = new_state
+        self.last_seq = seq
+        while len(self.snapshots) > self.history:
+            self.snapshots.popitem(last=False)
+        return changes
+
+    @staticmethod
+    def _apply_collection(baseline: Snapshot, previous: Snapshot, data: Dict[str, Any],
+                          full_diff: bool):
+        """
+        Aplica o delta de uma coleção sobre a base
+        Os snapshots compartilham os dicionários de campos que não mudaram (cópia na escrita)
+        Retorna o novo estado e o que mudou em relação ao estado anterior
+        """
+        collection = dict(baseline)
+        delta = CollectionDelta()
+
+        for entity_id, fields in data.get("created", {}).items():
+            collection[entity_id] = fields
+            if entity_id in previous:
+                delta.changed[entity_id] = fields
+            else:
+                delta.created[entity_id] = fields
+
+        for entity_id, fields in data.get("changed", {}).items():
+            base_fields = collection.get(entity_id)
+            if base_fields is None:
+                continue
+            merged = dict(base_fields)
+            merged.update(fields)
+            collection[entity_id] = merged
+            if entity_id in previous:
+                delta.changed[entity_id] = fields
+            else:
+                delta.created[entity_id] = merged
+
+        for entity_id in data.get("removed", ()):
+            collection.pop(entity_id, None)
+
+        if full_diff:
+            delta.removed = [entity_id for entity_id in previous if entity_id not in collection]
+            # Entidades que voltaram ao estado da base desde o último snapshot aplicado
+            for entity_id, fields in collection.items():
+                if entity_id not in delta.created and entity_id not in delta.changed:
+                    previous_fields = previous.get(entity_id)
+                    if previous_fields is None:
+                        delta.created[entity_id] = fields
+                    elif previous_fields is not fields:
+                        delta.changed[entity_id] = fields
+        else:
+            delta.removed = [entity_id for entity_id in data.get("removed", ()) if entity_id in previous]
+        return collection, delta
@@ -0,0 +1,90 @@
+"""
+Despacho de mensagens - tabela tipo de mensagem -> manipulador
+
+Os manipuladores são registrados uma vez por classe (qualquer classe de MESSAGE_TYPES) e
+cada mensagem decodificada é entregue com uma única consulta ao dicionário, sem comparar
+nomes de tipo. dispatch_batch() decodifica um payload inteiro (ver
+NetworkProtocol.decode_batch) e entrega as mensagens na ordem em que chegaram
+"""
+from typing import Any, Callable, Dict, Iterable, Optional
+from .messages import MESSAGE_TYPES
+from .protocol import NetworkProtocol
+
+# Evento socket.io que leva mensagens do protocolo (uma ou um lote, ver decode_batch)
+MESSAGE_EVENT = "message"
+
+
+class MessageDispatcher:
+    """
+    Entrega mensagens decodificadas aos manipuladores registrados para o seu tipo
+    """
+
+    def __init__(self, protocol: Optional[NetworkProtocol] = None):
+        """
+        protocol: Protocolo usado para decodificar payloads (padrão: JSON)
+        """
+        self.protocol = protocol or NetworkProtocol()
+        # Classe de mensagem -> manipulador
+        self.handlers: Dict[type, Callable[[Any], None]] = {}
+        # Estatísticas: mensagens entregues e sem manipulador
+        self.dispatched = 0
+        self.unhandled = 0
+
+    def register(self, message_class: type, handler: Optional[Callable[[Any], None]] = None):
+        """
+        Registra o manipulador de um tipo de mensagem (substitui o anterior)
+        Sem handler, funciona como decorador:
+            @dispatcher.register(PlayerJoinMessage)
+            def on_join(message): ...
+        """
+        if message_class not in MESSAGE_TYPES:
+            raise ValueError(f"Tipo de mensagem desconhecido: {message_class.__name__}")
+        if handler is None:
+            def decorator(function):
+                self.handlers[message_class] = function
+                return function
+            return decorator
+        self.handlers[message_class] = handler
+        return handler
+
+    def unregister(self, message_class: type) -> None:
+        """Remove o manipulador de um tipo de mensagem"""
+        self.handlers.pop(message_class, None)
+
+    def dispatch(self, message: Any) -> bool:
+        """
+        Entrega uma mensagem ao seu manipulador
+        Retorna False se não há manipulador para o tipo
+        """
+        handler = self.handlers.get(type(message))
+        if handler is None:
+            self.unhandled += 1
+            return False
+        handler(message)
+        self.dispatched += 1
+        return True
+
+    def dispatch_all(self, messages: Iterable[Any]) -> int:
+        """
+        Entrega várias mensagens, na ordem
+        Retorna quantas tinham manipulador
+        """
+        handlers = self.handlers
+        delivered = 0
+        total = 0
+        for message in messages:
+            total += 1
+            handler = handlers.get(type(message))
+            if handler is not None:
+                handler(message)
+                delivered += 1
+        self.dispatched += delivered
+        self.unhandled += total - delivered
+        return delivered
+
+    def dispatch_batch(self, payload: Any) -> int:
+        """
+        Decodifica um payload (lote ou mensagem única) e entrega suas mensagens
+        Retorna quantas tinham manipulador
+        """
+        return self.dispatch_all(self.protocol.decode_batch(payload))
@@ -0,0 +1,92 @@
+"""
+Espelho de entidades - mantém os objetos do cliente que representam o estado do servidor
+
+Os objetos são atualizados no lugar a cada estado recebido; só há alocação quando uma
+entidade aparece pela primeira vez, e objetos de entidades removidas voltam para um pool
+e são reaproveitados pelas próximas criações
+"""
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Tuple
+
+# Máximo de objetos guardados no pool
+DEFAULT_POOL_SIZE = 256
+
+
+class EntityMirror:
+    """
+    Objetos do cliente (por id) espelhando uma coleção do servidor
+    Os objetos devem implementar apply_fields(campos), que aplica apenas os campos
+    presentes, e reset(campos), que os reinicializa para reuso
+    """
+
+    def __init__(self, factory: Callable[[Dict[str, Any]], Any], pool_size: int = DEFAULT_POOL_SIZE):
+        """
+        factory: Cria um objeto a partir dos campos iniciais
+        pool_size: Máximo de objetos removidos guardados para reuso
+        """
+        self.factory = factory
+        self.pool_size = pool_size
+        # Id -> objeto
+        self.objects: Dict[Hashable, Any] = {}
+        # Lista de objetos para renderização (refeita só quando entidades entram ou saem)
+        self.items: List[Any] = []
+        # Objetos removidos disponíveis para reuso
+        self.pool: List[Any] = []
+        # Estatísticas de alocação
+        self.allocated = 0
+        self.reused = 0
+        self._items_dirty = False
+
+    def apply(self, entity_id: Hashable, fields: Dict[str, Any]) -> Any:
+        """Cria ou atualiza (no lugar) o objeto de uma entidade"""
+        obj = self.objects.get(entity_id)
+        if obj is not None:
+            obj.apply_fields(fields)
+            return obj
+        if self.pool:
+            obj = self.pool.pop()
+            obj.reset(fields)
+            self.reused += 1
+        else:
+            obj = self.factory(fields)
+            self.allocated += 1
+        self.objects[entity_id] = obj
+        self._items_dirty = True
+        return obj
+
+    def remove(self, entity_id: Hashable) -> None:
+        """Remove o objeto de uma entidade, devolvendo-o ao pool"""
+        obj = self.objects.pop(entity_id, None)
+        if obj is None:
+            return
+        if len(self.pool) < self.pool_size:
+            self.pool.append(obj)
+        self._items_dirty = True
+
+    def sync(self, entries: Iterable[Tuple[Hashable, Dict[str, Any]]]) -> None:
+        """
+        Aplica um estado completo: atualiza as entidades presentes e remove as ausentes
+        entries: Pares (id, campos) de todas as entidades do estado
+        """
+        seen = set()
+        for entity_id, fields in entries:
+            seen.add(entity_id)
+            self.apply(entity_id, fields)
+        if len(seen) != len(self.objects):
+            for entity_id in [entity_id for entity_id in self.objects if entity_id not in seen]:
+                self.remove(entity_id)
+
+    def clear(self) -> None:
+        """Remove todos os objetos (devolvendo-os ao pool)"""
+        for entity_id in list(self.objects):
+            self.remove(entity_id)
+
+    def get(self, entity_id: Hashable) -> Any:
+        """Objeto de uma entidade (ou None)"""
+        return self.objects.get(entity_id)
+
+    def values(self) -> List[Any]:
+        """Objetos atuais, na lista reaproveitada entre frames"""
+        if self._items_dirty:
+            self.items = list(self.objects.values())
+            self._items_dirty = False
+        return self.items
@@ -0,0 +1,106 @@
+"""
+Fila de mensagens recebidas - separa a thread de rede do loop principal do jogo
+
+A thread do socket.io (que já lê e decodifica as mensagens) apenas enfileira cada evento;
+o loop principal esvazia a fila uma vez por frame, com um limite de tempo, e é o único a
+alterar o estado do jogo. Assim não há disputa entre a rede e a renderização, e uma rajada
+de mensagens não consome o frame inteiro (o restante fica para o próximo)
+
+A fila é um deque: append e popleft são atômicos no CPython, então produtor (thread de
+rede) e consumidor (loop principal) não precisam de lock
+"""
+import time
+from collections import deque
+from typing import Any, Callable, Optional, Tuple
+
+import engineio.payload
+
+# Máximo de mensagens descartáveis (estado) à espera de processamento
+DEFAULT_CAPACITY = 256
+# Tempo máximo por frame gasto processando mensagens (s)
+DEFAULT_DRAIN_BUDGET = 0.004
+# Pacotes aceitos em uma resposta de long-polling; o padrão do engine.io (16) é pouco para
+# quem recebe um estado por tick (a conexão é derrubada com "Unexpected packet from server")
+MAX_POLLING_PACKETS = 256
+
+
+def allow_polling_bursts(limit: int = MAX_POLLING_PACKETS) -> None:
+    """
+    Aumenta o limite de pacotes por requisição de long-polling do engine.io (vale para o
+    processo inteiro, nas duas direções: cliente e servidor)
+    """
+    payload = engineio.payload.Payload
+    payload.max_decode_packets = max(payload.max_decode_packets, limit)
+
+
+class InboundQueue:
+    """
+    Fila limitada de eventos (nome, dados, instante de recebimento) recebidos do servidor
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, clock: Callable[[], float] = time.monotonic):
+        """
+        capacity: Máximo de mensagens descartáveis na fila; acima dele, novas mensagens
+                  descartáveis são recusadas (eventos de controle sempre entram)
+        clock: Relógio usado para registrar o instante de recebimento de cada mensagem
+        """
+        self.capacity = capacity
+        self.clock = clock
+        self.messages = deque()
+        # Estatísticas
+        self.received = 0
+        self.dropped = 0
+        self.processed = 0
+        # Mensagens que ficaram para o próximo frame no último drain()
+        self.backlog = 0
+
+    def __len__(self) -> int:
+        return len(self.messages)
+
+    def push(self, event: str, data: Any = None, droppable: bool = True) -> bool:
+        """
+        Enfileira um evento (chamado pela thread de rede)
+        droppable: Se a mensagem pode ser descartada com a fila cheia - estados completos
+                   e deltas podem (um delta perdido pede o estado completo de novo);
+                   eventos de conexão e entrada/saída de jogadores não
+        Retorna False se a mensagem foi descartada
+        """
+        self.received += 1
+        if droppable and len(self.messages) >= self.capacity:
+            self.dropped += 1
+            return False
+        self.messages.append((event, data, self.clock()))
+        return True
+
+    def pop(self) -> Optional[Tuple[str, Any, float]]:
+        """Próximo evento (nome, dados, instante de recebimento), ou None se a fila estiver vazia"""
+        try:
+            return self.messages.popleft()
+        except IndexError:
+            return None
+
+    def clear(self) -> None:
+        """Descarta as mensagens pendentes"""
+        self.messages.clear()
+        self.backlog = 0
+
+    def drain(self, handler: Callable[[str, Any, float], None], budget: float = DEFAULT_DRAIN_BUDGET) -> int:
+        """
+        Processa mensagens em ordem até esvaziar a fila ou esgotar o tempo (chamado pelo
+        loop principal); ao menos uma mensagem é processada por chamada
+        handler: Função chamada com (evento, dados, instante de recebimento) de cada mensagem
+        budget: Tempo máximo (s); None processa tudo
+        Retorna o número de mensagens processadas
+        """
+        messages = self.messages
+        deadline = None if budget is None else time.perf_counter() + budget
+        count = 0
+        while messages:
+            event, data, received_at = messages.popleft()
+            handler(event, data, received_at)
+            count += 1
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+        self.processed += count
+        self.backlog = len(messages)
+        return count
@@ -0,0 +1,120 @@
+"""
+Agrupamento de entradas - envia a entrada do jogador apenas quando ela muda
+
+Formato de um pacote 'player_input':
+    {
+        "samples": [{"seq": 12, "t": 53120, "up": True, "down": False, "left": False, "right": False,
+                     "dt": 0.0166, "steps": 2}, ...],
+        "heartbeat": False
+    }
+Cada amostra é um novo estado das teclas, com número de sequência crescente e o instante
+(ms) em que foi capturado. Sem mudanças, um pacote de heartbeat com a última amostra é
+enviado em intervalo longo, para o servidor saber que o cliente continua ativo e corrigir
+o estado caso algo tenha se perdido
+
+Quando a entrada é amostrada por passo de simulação (com dt), cada amostra também leva a
+duração do passo e quantos passos as teclas ficaram iguais; o servidor aplica exatamente
+esses passos (e a predição no cliente consegue reproduzi-los). Enquanto há movimento, uma
+nova amostra é aberta após cada envio; parado, nada é enviado além do heartbeat
+"""
+from typing import Any, Dict, List, Optional
+
+# Teclas de movimento que compõem o estado de entrada
+INPUT_KEYS = ("up", "down", "left", "right")
+# Intervalo mínimo entre pacotes (s) - mudanças dentro dele vão no mesmo pacote
+SEND_INTERVAL = 1.0 / 30.0
+# Intervalo do heartbeat sem mudanças (s)
+HEARTBEAT_INTERVAL = 0.5
+# Máximo de amostras guardadas à espera de envio
+MAX_PENDING_SAMPLES = 32
+
+
+class InputBatcher:
+    """
+    Detecta mudanças na entrada do jogador e agrupa as amostras em pacotes
+    """
+
+    def __init__(self, send_interval: float = SEND_INTERVAL, heartbeat_interval: float = HEARTBEAT_INTERVAL):
+        """
+        send_interval: Intervalo mínimo entre pacotes (s)
+        heartbeat_interval: Intervalo do heartbeat quando a entrada não muda (s)
+        """
+        self.send_interval = send_interval
+        self.heartbeat_interval = heartbeat_interval
+        # Sequência da última amostra criada
+        self.seq = 0
+        # Última amostra (estado atual das teclas)
+        self.last_sample: Optional[Dict[str, Any]] = None
+        # Amostras ainda não enviadas
+        self.pending: List[Dict[str, Any]] = []
+        # Instante do último pacote enviado (s)
+        self.last_sent: Optional[float] = None
+        # Estatísticas: amostras e pacotes enviados
+        self.samples_sent = 0
+        self.packets_sent = 0
+
+    def reset(self) -> None:
+        """Descarta o estado (ex: ao conectar novamente)"""
+        self.seq = 0
+        self.last_sample = None
+        self.pending.clear()
+        self.last_sent = None
+
+    def sample(self, input_state: Dict[str, bool], now: float,
+               dt: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Registra o estado atual das teclas
+        input_state: Estado das teclas (INPUT_KEYS -> bool)
+        now: Instante atual (s)
+        dt: Duração do passo de simulação, quando a entrada é amostrada por passo
+        Retorna a amostra à qual o estado pertence, ou None se nada precisa ser enviado
+        """
+        keys = {key: bool(input_state[key]) for key in INPUT_KEYS}
+        last = self.last_sample
+        if last is not None and all(last[key] == keys[key] for key in INPUT_KEYS):
+            if dt is None:
+                return None
+            # Mais um passo da amostra ainda não enviada
+            if self.pending and self.pending[-1] is last:
+                last["steps"] += 1
+                return last
+            # Parado: não há o que enviar além do heartbeat
+            if not any(keys.values()):
+                return None
+
+        self.seq += 1
+        sample = {"seq": self.seq, "t": int(now * 1000)}
+        sample.update(keys)
+        if dt is not None:
+            sample["dt"] = dt
+            sample["steps"] = 1
+        self.last_sample = sample
+        self.pending.append(sample)
+        if len(self.pending) > MAX_PENDING_SAMPLES:
+            del self.pending[0]
+        return sample
+
+    def flush(self, now: float) -> Optional[Dict[str, Any]]:
+        """
+        Monta o próximo pacote, se houver algo a enviar
+        now: Instante atual (s)
+        Retorna o pacote ou None (nada mudou e o heartbeat ainda não venceu)
+        """
+        if self.last_sample is None:
+            return None
+        elapsed = None if self.last_sent is None else now - self.last_sent
+
+        if self.pending:
+            if elapsed is not None and elapsed < self.send_interval:
+                return None
+            packet = {"samples": self.pending, "heartbeat": False}
+            self.pending = []
+        elif elapsed is not None and elapsed >= self.heartbeat_interval:
+            packet = {"samples": [self.last_sample], "heartbeat": True}
+        else:
+            return None
+
+        self.last_sent = now
+        self.samples_sent += len(packet["samples"])
+        self.packets_sent += 1
+        return packet
@@ -0,0 +1,175 @@
+"""
+Interpolação de snapshots - desenha jogadores remotos e entidades levemente no passado,
+interpolando entre as posições recebidas do servidor
+
+Cada entidade guarda suas últimas posições com o instante do servidor em que valiam.
+A renderização usa o instante "agora no servidor" menos um atraso fixo, de modo que quase
+sempre há dois snapshots em volta dele; variações no tempo de chegada dos pacotes (jitter)
+deixam de aparecer como saltos. Sem dados novos, a posição é extrapolada por um tempo
+limitado e depois mantida
+"""
+from collections import deque
+from typing import Dict, Hashable, Optional, Tuple
+
+# Atraso da renderização em relação ao servidor (s) - deve cobrir ~2 intervalos de envio
+INTERPOLATION_DELAY = 0.1
+# Tempo máximo de extrapolação além do último dado recebido (s)
+MAX_EXTRAPOLATION = 0.15
+# Snapshots guardados por entidade
+SNAPSHOTS_PER_ENTITY = 32
+# Amostras usadas para estimar a diferença entre o relógio local e o do servidor
+CLOCK_SAMPLES = 60
+
+
+class ServerClock:
+    """
+    Estima o instante atual no relógio do servidor
+    A diferença entre os relógios (incluindo a latência de ida) é a maior observada nas
+    últimas mensagens: pacotes atrasados por jitter dão diferenças menores e são ignorados
+    """
+
+    def __init__(self, samples: int = CLOCK_SAMPLES):
+        # Últimas diferenças observadas (servidor - local)
+        self.offsets = deque(maxlen=samples)
+        # Diferença atual estimada (None até a primeira mensagem)
+        self.offset: Optional[float] = None
+
+    def reset(self) -> None:
+        """Descarta a estimativa (ex: ao reconectar)"""
+        self.offsets.clear()
+        self.offset = None
+
+    def observe(self, server_time: float, local_time: float) -> None:
+        """
+        Registra uma mensagem do servidor
+        server_time: Instante da mensagem no servidor (s)
+        local_time: Instante local do recebimento (s)
+        """
+        self.offsets.append(server_time - local_time)
+        self.offset = max(self.offsets)
+
+    def server_time(self, local_time: float) -> Optional[float]:
+        """Instante estimado no servidor correspondente a um instante local"""
+        if self.offset is None:
+            return None
+        return local_time + self.offset
+
+
+class SnapshotBuffer:
+    """Últimas posições de uma entidade, ordenadas pelo instante do servidor"""
+
+    __slots__ = ("snapshots",)
+
+    def __init__(self, size: int = SNAPSHOTS_PER_ENTITY):
+        # (instante no servidor, x, y)
+        self.snapshots = deque(maxlen=size)
+
+    def push(self, server_time: float, x: float, y: float, known_until: float) -> None:
+        """
+        Adiciona uma posição (um snapshot no mesmo instante substitui o último; mais antigos
+        são ignorados)
+        known_until: Instante do último estado recebido antes deste
+        """
+        snapshots = self.snapshots
+        if snapshots:
+            last_time, last_x, last_y = snapshots[-1]
+            if server_time <= last_time:
+                if server_time < last_time:
+                    return
+                snapshots.pop()
+            elif last_time < known_until < server_time:
+                # A entidade ficou parada até o estado anterior; o movimento começa depois dele
+                snapshots.append((known_until, last_x, last_y))
+        snapshots.append((server_time, x, y))
+
+    def sample(self, render_time: float, known_until: float,
+               max_extrapolation: float = MAX_EXTRAPOLATION) -> Optional[Tuple[float, float]]:
+        """
+        Posição da entidade em um instante do servidor
+        render_time: Instante desejado
+        known_until: Instante do último estado recebido; como as atualizações só trazem o
+                     que mudou, a entidade está parada entre o último snapshot e ele
+        max_extrapolation: Tempo máximo de extrapolação além de known_until
+        """
+        snapshots = self.snapshots
+        if not snapshots:
+            return None
+        last_time, last_x, last_y = snapshots[-1]
+
+        if render_time >= last_time:
+            # Parada desde o último snapshot (ou sem velocidade conhecida): mantém a posição
+            if known_until > last_time or len(snapshots) < 2:
+                return last_x, last_y
+            # Sem dados novos: continua na última velocidade conhecida por tempo limitado
+            previous_time, previous_x, previous_y = snapshots[-2]
+            span = last_time - previous_time
+            ahead = min(render_time - last_time, max_extrapolation)
+            return (last_x + (last_x - previous_x) * ahead / span,
+                    last_y + (last_y - previous_y) * ahead / span)
+
+        # Procura (do mais novo para o mais antigo) o par de snapshots em volta do instante
+        newer = snapshots[-1]
+        for index in range(len(snapshots) - 2, -1, -1):
+            older = snapshots[index]
+            if older[0] <= render_time:
+                fraction = (render_time - older[0]) / (newer[0] - older[0])
+                return (older[1] + (newer[1] - older[1]) * fraction,
+                        older[2] + (newer[2] - older[2]) * fraction)
+            newer = older
+        # Antes do snapshot mais antigo
+        return newer[1], newer[2]
+
+
+class InterpolationBuffer:
+    """
+    Buffers de snapshots de um conjunto de entidades (por id)
+    """
+
+    def __init__(self, delay: float = INTERPOLATION_DELAY, max_extrapolation: float = MAX_EXTRAPOLATION):
+        """
+        delay: Atraso da renderização em relação ao servidor (s)
+        max_extrapolation: Tempo máximo de extrapolação sem dados novos (s)
+        """
+        self.delay = delay
+        self.max_extrapolation = max_extrapolation
+        # Id -> snapshots
+        self.buffers: Dict[Hashable, SnapshotBuffer] = {}
+        # Instante do último estado recebido (todas as entidades são conhecidas até ele)
+        self.known_until = float("-inf")
+
+    def clear(self) -> None:
+        """Descarta todos os snapshots"""
+        self.buffers.clear()
+        self.known_until = float("-inf")
+
+    def push(self, entity_id: Hashable, server_time: float, x: float, y: float) -> None:
+        """
+        Registra a posição de uma entidade em um instante do servidor
+        Todas as posições de um estado devem ser registradas antes de advance()
+        """
+        buffer = self.buffers.get(entity_id)
+        if buffer is None:
+            buffer = self.buffers[entity_id] = SnapshotBuffer()
+        buffer.push(server_time, x, y, self.known_until)
+
+    def advance(self, server_time: float) -> None:
+        """
+        Marca que um estado do servidor foi aplicado por completo: entidades sem snapshot
+        novo não mudaram até este instante
+        """
+        if server_time > self.known_until:
+            self.known_until = server_time
+
+    def remove(self, entity_id: Hashable) -> None:
+        """Descarta os snapshots de uma entidade removida"""
+        self.buffers.pop(entity_id, None)
+
+    def sample(self, entity_id: Hashable, server_now: float) -> Optional[Tuple[float, float]]:
+        """
+        Posição a renderizar para uma entidade
+        server_now: Instante atual estimado no servidor (o atraso é descontado aqui)
+        """
+        buffer = self.buffers.get(entity_id)
+        if buffer is None:
+            return None
+        return buffer.sample(server_now - self.delay, self.known_until, self.max_extrapolation)
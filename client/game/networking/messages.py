@@ -1,7 +1,7 @@
 """
 Definição de mensagens de rede - estruturas de dados para comunicação
 """
-from dataclasses import dataclass
+from dataclasses import dataclass, is_dataclass
 from typing import Dict, Any, List
 
 @dataclass
@@ -47,4 +47,12 @@ class EntityCreateMessage:
 @dataclass
 class EntityDestroyMessage:
     """Mensagem enviada quando uma entidade é destruída"""
-    entity_id: str
\ No newline at end of file
+    entity_id: str
+
+# Tipos de mensagem: toda dataclass deste módulo, na ordem em que foi declarada, que também é
+# a ordem dos seus identificadores no formato binário (novos tipos devem ser declarados
+# sempre no final do arquivo)
+MESSAGE_TYPES = tuple(
+    value for value in list(globals().values())
+    if isinstance(value, type) and is_dataclass(value) and value.__module__ == __name__
+)
\ No newline at end of file
@@ -0,0 +1,160 @@
+"""
+Fila de mensagens enviadas - junta as mensagens de um frame em um único envio
+
+Em vez de emitir cada mensagem na hora (entrada, ataques, confirmações, pings), o jogo as
+coloca na fila e a esvazia uma vez por frame com flush(), respeitando uma taxa máxima de
+envios por segundo. Uma única mensagem segue com o próprio evento; várias vão juntas em um
+pacote 'batch', que os servidores desfazem e tratam como se tivessem chegado separadas:
+    {"messages": [["player_action", {...}], ["player_input", {...}], ["state_ack", {"seq": 12}]]}
+
+Na fila:
+- Mensagens de eventos com combinação (ver MERGERS) substituem ou absorvem a anterior do
+  mesmo evento: só a confirmação mais recente importa, e pacotes de entrada seguidos viram
+  um só com todas as amostras
+- Eventos confiáveis (ações, modo de estado, resync) vão na frente do pacote e nunca são
+  descartados; os demais são recusados quando a fila está cheia
+"""
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Evento que leva várias mensagens
+BATCH_EVENT = "batch"
+# Máximo de pacotes enviados por segundo (a entrada já é agrupada a 30 Hz, ver input_batcher)
+DEFAULT_SEND_RATE = 30.0
+# Máximo de mensagens não confiáveis à espera de envio
+DEFAULT_CAPACITY = 64
+# Eventos que sempre são enviados (na frente das demais mensagens do pacote)
+RELIABLE_EVENTS = frozenset(("join", "state_mode", "state_resync", "player_action"))
+
+
+def merge_input_packets(queued: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """Junta dois pacotes 'player_input' (amostras do primeiro seguidas das novas)"""
+    samples = list(queued.get("samples", ()))
+    last_seq = samples[-1].get("seq", 0) if samples else 0
+    samples.extend(sample for sample in new.get("samples", ()) if sample.get("seq", 0) > last_seq)
+    return {"samples": samples, "heartbeat": bool(queued.get("heartbeat")) and bool(new.get("heartbeat"))}
+
+
+def latest_ack(queued: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """Mantém apenas a confirmação do snapshot mais recente"""
+    return new if new.get("seq", 0) >= queued.get("seq", 0) else queued
+
+
+def replace(queued: Any, new: Any) -> Any:
+    """A mensagem nova substitui a que está na fila"""
+    return new
+
+
+# Evento -> função que combina a mensagem na fila com uma nova do mesmo evento
+MERGERS: Dict[str, Callable[[Any, Any], Any]] = {
+    "player_input": merge_input_packets,
+    "state_ack": latest_ack,
+    "state_mode": replace,
+}
+
+
+def unpack_batch(data: Any) -> Iterator[Tuple[str, Any]]:
+    """
+    Mensagens (evento, dados) de um pacote 'batch'
+    Entradas mal formadas e pacotes dentro de pacotes são ignorados
+    """
+    messages = data.get("messages") if isinstance(data, dict) else None
+    if not isinstance(messages, list):
+        return
+    for entry in messages:
+        if (isinstance(entry, (list, tuple)) and len(entry) == 2 and isinstance(entry[0], str)
+                and entry[0] != BATCH_EVENT):
+            yield entry[0], entry[1]
+
+
+class OutboundQueue:
+    """
+    Mensagens à espera do próximo envio, com combinação, prioridade e limite de taxa
+    Deve ser usada por uma única thread (o loop principal do jogo)
+    """
+
+    def __init__(self, send_rate: Optional[float] = DEFAULT_SEND_RATE, capacity: int = DEFAULT_CAPACITY,
+                 reliable: Iterable[str] = RELIABLE_EVENTS,
+                 mergers: Optional[Dict[str, Callable[[Any, Any], Any]]] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        send_rate: Máximo de pacotes por segundo (None = um por flush)
+        capacity: Máximo de mensagens não confiáveis na fila
+        reliable: Eventos que nunca são descartados e vão na frente
+        mergers: Evento -> combinação com a mensagem anterior do mesmo evento (padrão: MERGERS)
+        clock: Relógio usado no limite de taxa (s)
+        """
+        self.interval = 1.0 / send_rate if send_rate else 0.0
+        self.capacity = capacity
+        self.reliable_events = frozenset(reliable)
+        self.mergers = MERGERS if mergers is None else mergers
+        self.clock = clock
+        # Mensagens [evento, dados] confiáveis e demais, na ordem em que foram enfileiradas
+        self.reliable: List[List[Any]] = []
+        self.normal: List[List[Any]] = []
+        # Evento com combinação -> sua mensagem na fila
+        self.pending: Dict[str, List[Any]] = {}
+        # Instante a partir do qual o próximo pacote pode ser enviado
+        self.next_send = 0.0
+        # Estatísticas
+        self.queued = 0
+        self.merged = 0
+        self.dropped = 0
+        self.packets = 0
+        self.messages_sent = 0
+
+    def __len__(self) -> int:
+        return len(self.reliable) + len(self.normal)
+
+    def push(self, event: str, data: Any = None) -> bool:
+        """
+        Coloca uma mensagem na fila
+        Retorna False se ela foi descartada (fila cheia)
+        """
+        self.queued += 1
+        entry = self.pending.get(event)
+        if entry is not None:
+            entry[1] = self.mergers[event](entry[1], data)
+            self.merged += 1
+            return True
+        entry = [event, data]
+        if event in self.reliable_events:
+            self.reliable.append(entry)
+        elif len(self.normal) >= self.capacity:
+            self.dropped += 1
+            return False
+        else:
+            self.normal.append(entry)
+        if event in self.mergers:
+            self.pending[event] = entry
+        return True
+
+    def flush(self, now: Optional[float] = None) -> Optional[Tuple[str, Any]]:
+        """
+        Monta o próximo pacote, se há mensagens e o limite de taxa permite
+        Retorna (evento, dados) a emitir, ou None
+        """
+        if not self.reliable and not self.normal:
+            return None
+        now = self.clock() if now is None else now
+        if now < self.next_send:
+            return None
+        # Mantém a cadência sem acumular envios depois de um período parado
+        self.next_send = max(self.next_send, now - self.interval) + self.interval
+
+        messages = self.reliable + self.normal if self.reliable else self.normal
+        self.reliable = []
+        self.normal = []
+        self.pending.clear()
+        self.packets += 1
+        self.messages_sent += len(messages)
+        if len(messages) == 1:
+            return messages[0][0], messages[0][1]
+        return BATCH_EVENT, {"messages": messages}
+
+    def clear(self) -> None:
+        """Descarta as mensagens na fila (ex: ao desconectar)"""
+        self.reliable = []
+        self.normal = []
+        self.pending.clear()
+        self.next_send = 0.0
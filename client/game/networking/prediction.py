@@ -0,0 +1,112 @@
+"""
+Predição no cliente - aplica a entrada do jogador local imediatamente e reconcilia com o servidor
+
+Cada amostra de entrada (ver input_batcher) é aplicada localmente a um MovementComponent
+e guardada até o servidor confirmá-la (campo lastInputSeq do jogador no estado). A cada
+estado autoritativo, a posição volta à do servidor e as amostras ainda não confirmadas
+são reaplicadas, então o movimento próprio não espera a ida e volta da rede
+"""
+from collections import deque
+from typing import Any, Dict, Optional, Tuple
+from ..components.movement import MovementComponent
+
+# Máximo de amostras não confirmadas guardadas (as mais antigas são descartadas)
+PREDICTION_BUFFER_SIZE = 256
+
+
+def apply_input(movement: MovementComponent, sample: Dict[str, Any],
+                bounds: Optional[Tuple[float, float]] = None) -> None:
+    """
+    Aplica uma amostra de entrada (todos os seus passos) a um componente de movimento
+    Deve ser idêntico à simulação do servidor para que a reconciliação não gere correções
+    sample: Amostra com as teclas, 'dt' (duração de um passo) e 'steps' (número de passos)
+    bounds: Posição máxima (x, y); a mínima é (0, 0)
+    """
+    direction_x = int(sample["right"]) - int(sample["left"])
+    direction_y = int(sample["down"]) - int(sample["up"])
+    dt = sample["dt"]
+    for _ in range(sample["steps"]):
+        movement.move(direction_x, direction_y)
+        movement.update(dt)
+        if bounds is not None:
+            movement.x = max(0, min(bounds[0], movement.x))
+            movement.y = max(0, min(bounds[1], movement.y))
+
+
+class ClientPrediction:
+    """
+    Predição e reconciliação do movimento do jogador local
+    """
+
+    def __init__(self, speed: float, bounds: Optional[Tuple[float, float]] = None,
+                 buffer_size: int = PREDICTION_BUFFER_SIZE):
+        """
+        speed: Velocidade do jogador (pixels por segundo, igual à do servidor)
+        bounds: Posição máxima (x, y) do jogador
+        buffer_size: Máximo de amostras não confirmadas guardadas
+        """
+        # Estado previsto do jogador local (None até a primeira posição do servidor)
+        self.movement: Optional[MovementComponent] = None
+        self.speed = speed
+        self.bounds = bounds
+        # Amostras enviadas (ou a enviar) ainda não confirmadas, em ordem de sequência
+        self.pending = deque(maxlen=buffer_size)
+        # Sequência da última amostra confirmada pelo servidor
+        self.acked_seq = 0
+        # Tamanho da última correção aplicada na reconciliação (pixels)
+        self.last_correction = 0.0
+
+    def reset(self) -> None:
+        """Descarta o estado previsto (ex: ao desconectar)"""
+        self.movement = None
+        self.pending.clear()
+        self.acked_seq = 0
+        self.last_correction = 0.0
+
+    @property
+    def position(self) -> Optional[Tuple[float, float]]:
+        """Posição prevista do jogador local"""
+        if self.movement is None:
+            return None
+        return self.movement.x, self.movement.y
+
+    def predict(self, sample: Optional[Dict[str, Any]], dt: float) -> None:
+        """
+        Aplica um passo de simulação da amostra atual
+        sample: Amostra à qual o passo pertence (a mesma amostra recebe vários passos
+                enquanto as teclas não mudam); None se o passo não precisa ser enviado
+        dt: Duração do passo
+        """
+        if sample is None:
+            return
+        if self.movement is None:
+            return
+        if not self.pending or self.pending[-1] is not sample:
+            self.pending.append(sample)
+        apply_input(self.movement, dict(sample, steps=1, dt=dt), self.bounds)
+
+    def reconcile(self, server_x: float, server_y: float, acked_seq: int) -> None:
+        """
+        Corrige a predição com o estado autoritativo do servidor
+        server_x, server_y: Posição do jogador no servidor
+        acked_seq: Sequência da última amostra que o servidor já aplicou
+        """
+        if self.movement is None:
+            self.movement = MovementComponent(server_x, server_y, self.speed)
+        predicted = (self.movement.x, self.movement.y)
+
+        # Descarta as amostras já aplicadas pelo servidor
+        if acked_seq > self.acked_seq:
+            self.acked_seq = acked_seq
+        while self.pending and self.pending[0]["seq"] <= self.acked_seq:
+            self.pending.popleft()
+
+        # Volta à posição do servidor e reaplica o que ele ainda não recebeu
+        self.movement.set_position(server_x, server_y)
+        self.movement.stop()
+        for sample in self.pending:
+            apply_input(self.movement, sample, self.bounds)
+
+        dx = self.movement.x - predicted[0]
+        dy = self.movement.y - predicted[1]
+        self.last_correction = (dx * dx + dy * dy) ** 0.5
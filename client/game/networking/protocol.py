@@ -1,14 +1,123 @@
 """
 Protocolo de comunicação - define como as mensagens são serializadas e desserializadas
+
+Além de mensagens individuais, o protocolo codifica lotes: várias mensagens em um único
+payload (um array JSON de {"type", "data"} ou um lote binário), decodificados de uma vez
+por decode_batch() - ex: a rajada de mensagens acumulada depois de um travamento
 """
 import json
+from typing import Dict, List, Optional, Tuple, Union
 from .messages import *
+from . import binary_codec
+
+# Registro montado uma única vez: nome do tipo -> classe de mensagem (todas as dataclasses
+# de messages.py, ver MESSAGE_TYPES)
+MESSAGE_CLASSES = {cls.__name__: cls for cls in MESSAGE_TYPES}
+
+# Formatos de transmissão suportados (formato -> versões), em ordem de preferência
+SUPPORTED_FORMATS: Dict[str, List[int]] = {
+    "binary": [binary_codec.BINARY_VERSION],
+    "json": [1]
+}
 
 class NetworkProtocol:
     """
     Define o protocolo de comunicação entre cliente e servidor
     Responsável por serializar e desserializar mensagens
+    Cada conexão usa uma instância com o formato combinado na negociação
+    (os métodos estáticos continuam usando JSON)
     """
+
+    def __init__(self, wire_format: str = "json", version: int = 1):
+        """
+        wire_format: 'json' ou 'binary'
+        version: Versão do formato
+        """
+        if version not in SUPPORTED_FORMATS.get(wire_format, ()):
+            raise ValueError(f"Formato não suportado: {wire_format} v{version}")
+        self.wire_format = wire_format
+        self.version = version
+
+    @staticmethod
+    def offer() -> Dict[str, List[int]]:
+        """Formatos e versões oferecidos ao outro lado no início da conexão"""
+        return {name: list(versions) for name, versions in SUPPORTED_FORMATS.items()}
+
+    @staticmethod
+    def negotiate(offered: Dict[str, List[int]]) -> Optional[Tuple[str, int]]:
+        """
+        Escolhe o formato preferido (e sua maior versão) em comum com uma oferta
+        Retorna (formato, versão) ou None se não houver nenhum em comum
+        """
+        for name, versions in SUPPORTED_FORMATS.items():
+            common = set(versions).intersection(offered.get(name, ()))
+            if common:
+                return name, max(common)
+        return None
+
+    @classmethod
+    def from_offer(cls, offered: Dict[str, List[int]]) -> "NetworkProtocol":
+        """Cria o protocolo de uma conexão a partir da oferta do outro lado"""
+        chosen = cls.negotiate(offered)
+        if chosen is None:
+            raise ValueError(f"Nenhum formato em comum: {offered}")
+        return cls(*chosen)
+
+    def encode(self, message: Any) -> Union[str, bytes]:
+        """Serializa uma mensagem no formato desta conexão"""
+        if self.wire_format == "binary":
+            return binary_codec.encode_message(message)
+        return self.serialize_message(message)
+
+    def decode(self, data: Union[str, bytes]) -> Any:
+        """
+        Desserializa uma mensagem
+        O formato é detectado pelo conteúdo (mensagens binárias começam com binary_codec.MAGIC)
+        """
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            if data[:1] == bytes((binary_codec.MAGIC,)):
+                return binary_codec.decode_message(bytes(data))
+            data = bytes(data).decode("utf-8")
+        return self.deserialize_message(data)
+
+    def encode_batch(self, messages: List[Any]) -> Union[str, bytes]:
+        """Serializa várias mensagens em um único payload no formato desta conexão"""
+        if self.wire_format == "binary":
+            return binary_codec.encode_batch(messages)
+        return json.dumps([{'type': message.__class__.__name__, 'data': message.__dict__}
+                           for message in messages])
+
+    @staticmethod
+    def decode_batch(payload: Any) -> List[Any]:
+        """
+        Desserializa todas as mensagens de um payload
+        payload: Lote binário, array JSON (texto ou já decodificado pelo socket.io) de
+                 {"type", "data"}, ou uma única mensagem em qualquer desses formatos
+        Retorna as mensagens na ordem do lote
+        """
+        if isinstance(payload, (bytes, bytearray, memoryview)):
+            # O lote binário é lido no próprio buffer (sem copiar cada mensagem)
+            if payload[:1] == bytes((binary_codec.MAGIC,)):
+                if not isinstance(payload, bytes):
+                    payload = bytes(payload)
+                if binary_codec.is_batch(payload):
+                    return binary_codec.decode_batch(payload)
+                return [binary_codec.decode_message(payload)]
+            payload = bytes(payload).decode("utf-8")
+        if isinstance(payload, str):
+            payload = json.loads(payload)
+        if isinstance(payload, dict):
+            payload = (payload,)
+        elif not isinstance(payload, (list, tuple)):
+            raise ValueError(f"Lote de mensagens inválido: {type(payload).__name__}")
+        classes = MESSAGE_CLASSES
+        messages = []
+        for message_dict in payload:
+            message_class = classes.get(message_dict['type'])
+            if message_class is None:
+                raise ValueError(f"Tipo de mensagem desconhecido: {message_dict['type']}")
+            messages.append(message_class(**message_dict['data']))
+        return messages
     
     @staticmethod
     def serialize_message(message: Any) -> str:
@@ -35,18 +144,8 @@ class NetworkProtocol:
         message_type = message_dict['type']
         message_data = message_dict['data']
         
-        # Mapeia nomes de tipos para classes de mensagem
-        message_classes = {
-            'PlayerJoinMessage': PlayerJoinMessage,
-            'PlayerLeaveMessage': PlayerLeaveMessage,
-            'PlayerInputMessage': PlayerInputMessage,
-            'PlayerActionMessage': PlayerActionMessage,
-            'GameStateUpdateMessage': GameStateUpdateMessage,
-            'EntityCreateMessage': EntityCreateMessage,
-            'EntityDestroyMessage': EntityDestroyMessage
-        }
-        
-        if message_type in message_classes:
-            return message_classes[message_type](**message_data)
+        message_class = MESSAGE_CLASSES.get(message_type)
+        if message_class is not None:
+            return message_class(**message_data)
         else:
             raise ValueError(f"Tipo de mensagem desconhecido: {message_type}")
\ No newline at end of file
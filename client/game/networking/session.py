@@ -0,0 +1,146 @@
+"""
+Sessão do cliente - reconexão automática retomando o mesmo jogador
+
+Ao conectar, o servidor envia 'session' {"player_id", "token", "resumed"}. Se a conexão
+cair, o socket.io tenta reconectar com espera exponencial (ver RECONNECT_* e
+reconnect_delays) e o cliente apresenta no handshake (auth do socket.io) o id do jogador,
+o token e o último snapshot confirmado. Enquanto o servidor guarda o jogador (até
+RESUME_TIMEOUT depois da queda) a sessão é retomada: o jogador continua o mesmo e o
+próximo delta é calculado a partir do snapshot confirmado, então o cliente mantém o seu
+estado e recebe apenas o que mudou durante a queda. Se o jogador já foi descartado, o
+servidor responde resumed=False e o cliente recomeça como um jogador novo
+"""
+import random
+import time
+from typing import Any, Dict, Iterator, Optional
+
+# Evento com os dados da sessão (enviado pelo servidor a cada conexão)
+SESSION_EVENT = "session"
+# Tempo que o servidor guarda o jogador de uma conexão que caiu (s)
+RESUME_TIMEOUT = 10.0
+# Tentativas da primeira conexão (network.reconnect_attempts do config.yaml; 0 = sem limite)
+RECONNECT_ATTEMPTS = 3
+# Espera antes da primeira tentativa (s); dobra a cada tentativa, até RECONNECT_DELAY_MAX
+RECONNECT_DELAY = 0.1
+RECONNECT_DELAY_MAX = 2.0
+# Variação aleatória da espera (fração), para os clientes de uma LAN não voltarem juntos
+RECONNECT_JITTER = 0.5
+# Tempo máximo de espera pela resposta do servidor a cada tentativa (network.timeout, s)
+CONNECT_TIMEOUT = 5.0
+
+
+def reconnect_delays(attempts: int = RECONNECT_ATTEMPTS, delay: float = RECONNECT_DELAY,
+                     delay_max: float = RECONNECT_DELAY_MAX, jitter: float = RECONNECT_JITTER,
+                     rng: Optional[random.Random] = None) -> Iterator[float]:
+    """
+    Esperas (s) antes de cada tentativa de conexão: exponencial, limitada e com variação
+    attempts: Número de tentativas (0 = sem limite)
+    """
+    rng = rng or random
+    attempt = 0
+    while not attempts or attempt < attempts:
+        wait = min(delay * (2 ** attempt), delay_max)
+        yield wait * (1.0 + rng.uniform(-jitter, jitter))
+        attempt += 1
+
+
+def reconnection_options(attempts: int = 0) -> Dict[str, Any]:
+    """
+    Opções de reconexão automática do socketio.Client (mesma espera de reconnect_delays)
+    attempts: Tentativas depois de uma queda (0 = sem limite: passado RESUME_TIMEOUT, a
+    reconexão ainda vale, mas como um jogador novo)
+    """
+    return {
+        "reconnection": True,
+        "reconnection_attempts": attempts,
+        "reconnection_delay": RECONNECT_DELAY,
+        "reconnection_delay_max": RECONNECT_DELAY_MAX,
+        "randomization_factor": RECONNECT_JITTER,
+    }
+
+
+def connect_with_retry(sio: Any, url: str, session: "ClientSession", attempts: int = RECONNECT_ATTEMPTS,
+                       timeout: float = CONNECT_TIMEOUT) -> bool:
+    """
+    Primeira conexão de um socketio.Client, com novas tentativas (a reconexão automática do
+    socket.io só vale depois que uma conexão foi estabelecida)
+    Retorna se conectou
+    """
+    delays = reconnect_delays(attempts)
+    while True:
+        try:
+            # auth é chamado a cada tentativa, inclusive nas reconexões automáticas
+            sio.connect(url, auth=session.auth, wait_timeout=timeout)
+            return True
+        except Exception as e:
+            wait = next(delays, None)
+            if wait is None:
+                print(f"Erro ao conectar com o servidor: {e}")
+                return False
+            print(f"Erro ao conectar com o servidor ({e}); nova tentativa em {wait:.2f} s")
+            time.sleep(wait)
+
+
+class ClientSession:
+    """
+    Dados para retomar a sessão depois de uma queda
+    """
+
+    def __init__(self):
+        # Id do jogador e token recebidos do servidor (None = ainda sem sessão)
+        self.player_id: Optional[str] = None
+        self.token: Optional[str] = None
+        # Último snapshot confirmado ao servidor e se o cliente recebe deltas
+        self.last_seq: Optional[int] = None
+        self.delta = False
+        # Estatísticas: sessões retomadas e perdidas (o servidor já tinha descartado o jogador)
+        self.resumed = 0
+        self.lost = 0
+
+    def auth(self) -> Dict[str, Any]:
+        """Dados do handshake (vazio na primeira conexão); chamado a cada tentativa"""
+        if self.token is None:
+            return {}
+        return {
+            "player_id": self.player_id,
+            "token": self.token,
+            "seq": self.last_seq,
+            "mode": "delta" if self.delta else "full",
+        }
+
+    def update(self, data: Any) -> bool:
+        """
+        Registra a mensagem 'session' do servidor
+        Retorna True se a sessão anterior foi retomada (o estado local continua válido)
+        """
+        if not isinstance(data, dict):
+            return False
+        resumed = bool(data.get("resumed")) and self.token is not None and data.get("player_id") == self.player_id
+        if resumed:
+            self.resumed += 1
+        else:
+            if self.token is not None:
+                self.lost += 1
+            self.last_seq = None
+        self.player_id = data.get("player_id")
+        self.token = data.get("token")
+        return resumed
+
+    def acknowledge(self, seq: int) -> None:
+        """Registra o último snapshot confirmado ao servidor"""
+        self.last_seq = seq
+
+    def observe_sent(self, event: str, data: Any) -> None:
+        """Acompanha as mensagens enviadas (confirmações e modo de estado) para retomar a sessão"""
+        if event == "state_ack" and isinstance(data, dict):
+            self.acknowledge(data.get("seq"))
+        elif event == "state_mode":
+            self.delta = isinstance(data, dict) and data.get("mode") == "delta"
+            self.last_seq = None
+
+    def clear(self) -> None:
+        """Esquece a sessão (a próxima conexão cria um jogador novo)"""
+        self.player_id = None
+        self.token = None
+        self.last_seq = None
+        self.delta = False
@@ -0,0 +1,270 @@
+"""
+Telemetria de rede - latência (RTT), jitter, banda e contadores por evento
+
+O RTT é medido com 'net_ping' / 'net_pong': o cliente envia {"id", "t"} e o servidor
+devolve a mesma mensagem. O RTT suavizado e o jitter seguem o TCP (RFC 6298) e o RTP
+(RFC 3550): médias móveis exponenciais da amostra e da variação entre amostras seguidas
+
+Mensagens e bytes são contados por nome de evento nas duas direções, com totais e taxas
+por segundo (recalculadas a cada janela). O tamanho de uma mensagem é o do seu JSON
+compacto, uma boa aproximação do que o socket.io envia; para mensagens recebidas também
+é registrado o tempo gasto no manipulador (ex: aplicar um delta de estado). Pacotes
+enviados (um por frame, ver outbound_queue) são contados à parte, e as mensagens de um
+pacote 'batch' contam cada uma no seu próprio evento
+"""
+import json
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+from .outbound_queue import BATCH_EVENT, unpack_batch
+
+# Duração da janela usada para calcular as taxas por segundo (s)
+RATE_WINDOW = 1.0
+# Intervalo entre pings (s)
+PING_INTERVAL = 1.0
+# Pings sem resposta por mais que isto são considerados perdidos (s)
+PING_TIMEOUT = 10.0
+# Pesos das médias móveis do RTT e do jitter
+RTT_GAIN = 1.0 / 8.0
+JITTER_GAIN = 1.0 / 16.0
+
+
+def payload_size(data: Any) -> int:
+    """Tamanho aproximado (bytes) de uma mensagem na rede"""
+    if data is None:
+        return 0
+    if isinstance(data, (bytes, bytearray)):
+        return len(data)
+    if isinstance(data, str):
+        return len(data.encode("utf-8"))
+    try:
+        return len(json.dumps(data, separators=(",", ":"), default=str))
+    except (TypeError, ValueError):
+        return 0
+
+
+def percentile_summary(samples: Iterable[float], scale: float = 1000.0) -> Dict[str, float]:
+    """
+    Resumo de uma série de medições: quantidade, média, percentis 50/95/99 e máximo
+    scale: Fator aplicado aos valores (padrão: s -> ms)
+    """
+    values = sorted(samples)
+    count = len(values)
+    if not count:
+        return {"count": 0, "mean": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+
+    def at(fraction):
+        return values[min(count - 1, int(count * fraction))] * scale
+
+    return {
+        "count": count,
+        "mean": sum(values) / count * scale,
+        "p50": at(0.50),
+        "p95": at(0.95),
+        "p99": at(0.99),
+        "max": values[-1] * scale,
+    }
+
+
+class EventStats:
+    """Contadores de um evento em uma direção"""
+
+    __slots__ = ("messages", "bytes", "handle_time", "max_handle_time",
+                 "window_messages", "window_bytes", "window_handle_time",
+                 "messages_per_second", "bytes_per_second", "mean_handle_time")
+
+    def __init__(self):
+        # Totais desde o início
+        self.messages = 0
+        self.bytes = 0
+        self.handle_time = 0.0
+        self.max_handle_time = 0.0
+        # Acumulado da janela atual
+        self.window_messages = 0
+        self.window_bytes = 0
+        self.window_handle_time = 0.0
+        # Resultado da última janela completa
+        self.messages_per_second = 0.0
+        self.bytes_per_second = 0.0
+        self.mean_handle_time = 0.0
+
+    def close_window(self, elapsed: float) -> None:
+        """Calcula as taxas da janela que terminou e começa outra"""
+        self.messages_per_second = self.window_messages / elapsed
+        self.bytes_per_second = self.window_bytes / elapsed
+        self.mean_handle_time = (self.window_handle_time / self.window_messages
+                                 if self.window_messages else 0.0)
+        self.window_messages = 0
+        self.window_bytes = 0
+        self.window_handle_time = 0.0
+
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            "messages": self.messages,
+            "bytes": self.bytes,
+            "messages_per_second": self.messages_per_second,
+            "bytes_per_second": self.bytes_per_second,
+            "mean_handle_ms": self.mean_handle_time * 1000.0,
+            "max_handle_ms": self.max_handle_time * 1000.0,
+        }
+
+
+class NetworkTelemetry:
+    """
+    Medições de rede de uma conexão
+    Deve ser usada por uma única thread (o loop principal do jogo)
+    """
+
+    def __init__(self, window: float = RATE_WINDOW, ping_interval: float = PING_INTERVAL,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        window: Duração da janela das taxas por segundo (s)
+        ping_interval: Intervalo entre pings (s)
+        clock: Relógio usado nas medições (s)
+        """
+        self.window = window
+        self.ping_interval = ping_interval
+        self.clock = clock
+        self.received: Dict[str, EventStats] = {}
+        self.sent: Dict[str, EventStats] = {}
+        # Pacotes enviados (cada um com uma ou várias mensagens)
+        self.packets = EventStats()
+        self.window_start = clock()
+        # Pings enviados sem resposta (id -> instante de envio)
+        self.pending_pings: Dict[int, float] = {}
+        self.ping_seq = 0
+        self.last_ping: Optional[float] = None
+        # Última amostra, RTT suavizado, menor RTT e jitter (s; None até o primeiro pong)
+        self.rtt: Optional[float] = None
+        self.smoothed_rtt: Optional[float] = None
+        self.min_rtt: Optional[float] = None
+        self.jitter = 0.0
+        self.pings_lost = 0
+
+    def reset(self) -> None:
+        """Descarta todas as medições (ex: ao conectar novamente)"""
+        self.__init__(self.window, self.ping_interval, self.clock)
+
+    def record_received(self, event: str, size: int, handle_time: float = 0.0,
+                        now: Optional[float] = None) -> None:
+        """
+        Registra uma mensagem recebida
+        size: Tamanho (bytes, ver payload_size)
+        handle_time: Tempo gasto processando a mensagem (s)
+        """
+        self._roll(self.clock() if now is None else now)
+        stats = self.received.get(event)
+        if stats is None:
+            stats = self.received[event] = EventStats()
+        stats.messages += 1
+        stats.bytes += size
+        stats.handle_time += handle_time
+        if handle_time > stats.max_handle_time:
+            stats.max_handle_time = handle_time
+        stats.window_messages += 1
+        stats.window_bytes += size
+        stats.window_handle_time += handle_time
+
+    def record_sent(self, event: str, size: int, now: Optional[float] = None) -> None:
+        """Registra uma mensagem enviada"""
+        self._roll(self.clock() if now is None else now)
+        stats = self.sent.get(event)
+        if stats is None:
+            stats = self.sent[event] = EventStats()
+        stats.messages += 1
+        stats.bytes += size
+        stats.window_messages += 1
+        stats.window_bytes += size
+
+    def record_packet(self, event: str, data: Any, now: Optional[float] = None) -> None:
+        """
+        Registra um pacote enviado (ver OutboundQueue.flush): conta o pacote e cada mensagem
+        nele no seu próprio evento
+        """
+        now = self.clock() if now is None else now
+        self._roll(now)
+        size = payload_size(data)
+        packets = self.packets
+        packets.messages += 1
+        packets.bytes += size
+        packets.window_messages += 1
+        packets.window_bytes += size
+        if event != BATCH_EVENT:
+            self.record_sent(event, size, now)
+            return
+        for inner_event, inner_data in unpack_batch(data):
+            self.record_sent(inner_event, payload_size(inner_data), now)
+
+    def make_ping(self, now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Cria o próximo ping se o intervalo já passou
+        Retorna a mensagem 'net_ping' a enviar, ou None
+        """
+        now = self.clock() if now is None else now
+        if self.last_ping is not None and now - self.last_ping < self.ping_interval:
+            return None
+        self.last_ping = now
+        # Pings antigos sem resposta foram perdidos
+        for ping_id in [ping_id for ping_id, sent in self.pending_pings.items() if now - sent > PING_TIMEOUT]:
+            del self.pending_pings[ping_id]
+            self.pings_lost += 1
+        self.ping_seq += 1
+        self.pending_pings[self.ping_seq] = now
+        return {"id": self.ping_seq, "t": int(now * 1000)}
+
+    def record_pong(self, data: Any, now: Optional[float] = None) -> Optional[float]:
+        """
+        Registra a resposta a um ping
+        now: Instante de chegada da resposta (s, no mesmo relógio)
+        Retorna a amostra de RTT (s), ou None se a resposta não corresponde a um ping pendente
+        """
+        if not isinstance(data, dict):
+            return None
+        sent = self.pending_pings.pop(data.get("id"), None)
+        if sent is None:
+            return None
+        sample = (self.clock() if now is None else now) - sent
+        if self.rtt is not None:
+            self.jitter += (abs(sample - self.rtt) - self.jitter) * JITTER_GAIN
+        self.rtt = sample
+        if self.smoothed_rtt is None:
+            self.smoothed_rtt = sample
+        else:
+            self.smoothed_rtt += (sample - self.smoothed_rtt) * RTT_GAIN
+        if self.min_rtt is None or sample < self.min_rtt:
+            self.min_rtt = sample
+        return sample
+
+    def summary(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """Resumo das medições (tempos em ms, taxas por segundo da última janela)"""
+        self._roll(self.clock() if now is None else now)
+
+        def to_ms(value):
+            return None if value is None else value * 1000.0
+
+        return {
+            "rtt_ms": to_ms(self.rtt),
+            "smoothed_rtt_ms": to_ms(self.smoothed_rtt),
+            "min_rtt_ms": to_ms(self.min_rtt),
+            "jitter_ms": self.jitter * 1000.0,
+            "pings_lost": self.pings_lost,
+            "received_bytes_per_second": sum(s.bytes_per_second for s in self.received.values()),
+            "received_messages_per_second": sum(s.messages_per_second for s in self.received.values()),
+            # Bytes dos pacotes (o que vai pela rede); mensagens contadas uma a uma
+            "sent_bytes_per_second": self.packets.bytes_per_second,
+            "sent_messages_per_second": sum(s.messages_per_second for s in self.sent.values()),
+            "sent_packets_per_second": self.packets.messages_per_second,
+            "received": {event: stats.to_dict() for event, stats in self.received.items()},
+            "sent": {event: stats.to_dict() for event, stats in self.sent.items()},
+        }
+
+    def _roll(self, now: float) -> None:
+        """Fecha a janela atual das taxas se ela já terminou"""
+        elapsed = now - self.window_start
+        if elapsed < self.window:
+            return
+        for stats in self.received.values():
+            stats.close_window(elapsed)
+        for stats in self.sent.values():
+            stats.close_window(elapsed)
+        self.packets.close_window(elapsed)
+        self.window_start = now
@@ -5,7 +5,12 @@ import pygame
 import random
 from .scene_base import SceneBase
 from ..core.entity_system import EntitySystem
+from ..core.system_scheduler import SystemScheduler
 from ..entities.entity_factory import EntityFactory
+from ..systems import MovementSystem, CombatSystem, AISystem
+
+# Tamanho das células do índice espacial, em tiles do mapa
+SPATIAL_CELL_TILES = 2
 
 class GameWorld(SceneBase):
     """
@@ -13,12 +18,28 @@ class GameWorld(SceneBase):
     Pode ser singleplayer ou multiplayer
     """
     
-    def __init__(self, game):
+    def __init__(self, game, headless: bool = False):
+        """
+        game: Referência ao objeto principal do jogo
+        headless: Se True, o mundo roda sem display (sem renderização, fontes ou sprites),
+                  útil para benchmarks e simulação no servidor
+        """
         super().__init__(game)
+        # Flag indicando se o mundo roda sem display (RenderComponents criados para este
+        # mundo devem usar load_sprite=not headless)
+        self.headless = headless
+        # Fonte do HUD (carregada apenas na primeira renderização)
+        self.hud_font = None
         # Sistema de entidades para gerenciar todas as entidades do jogo
-        self.entity_system = EntitySystem()
+        # Armazenamento colunar mantém movimento e saúde em arrays NumPy contíguos
+        self.entity_system = EntitySystem(columnar=True)
         # Fábrica para criar entidades
         self.entity_factory = EntityFactory(self.entity_system)
+        # Escalonador dos sistemas de simulação (ordem, paralelismo e tempos por sistema)
+        self.scheduler = SystemScheduler(self.entity_system)
+        self.scheduler.register(MovementSystem())
+        self.scheduler.register(CombatSystem())
+        self.ai_system = self.scheduler.register(AISystem(tags=("enemy",)))
         # Flag indicando se é multiplayer
         self.is_multiplayer = False
         # Mapa atual
@@ -26,17 +47,22 @@ class GameWorld(SceneBase):
         # Jogador local (se singleplayer)
         self.local_player = None
         
-    def enter(self, is_multiplayer: bool = False, map_name: str = "forest"):
+    def enter(self, is_multiplayer: bool = False, map_name: str = "forest", enemy_count: int = 5):
         """
         Inicializa o mundo do jogo
         is_multiplayer: Se True, configura para modo multiplayer
         map_name: Nome do mapa a ser carregado
+        enemy_count: Número de inimigos gerados em singleplayer
         """
         self.is_multiplayer = is_multiplayer
+        # Em multiplayer o servidor é a autoridade sobre a IA
+        self.ai_system.enabled = not is_multiplayer
         print(f"Iniciando jogo no modo {'multiplayer' if is_multiplayer else 'singleplayer'}")
         
         # Carrega o mapa
         self.current_map = self.load_map(map_name)
+        # Índice espacial para alcance de ataques e percepção da IA
+        self.entity_system.enable_spatial_index(self.current_map.get("tile_size", 32) * SPATIAL_CELL_TILES)
         
         if not is_multiplayer:
             # Modo singleplayer - cria jogador local
@@ -44,7 +70,7 @@ class GameWorld(SceneBase):
             self.local_player = self.entity_factory.create_player(spawn_x, spawn_y, True)
             
             # Gera alguns inimigos
-            self.spawn_enemies(5)
+            self.spawn_enemies(enemy_count)
         else:
             # Modo multiplayer - o jogador será criado pelo servidor
             print("Aguardando criação do jogador pelo servidor...")
@@ -52,59 +78,48 @@ class GameWorld(SceneBase):
     def exit(self):
         """Limpa recursos do mundo do jogo"""
         print("Saindo do mundo do jogo")
-        # Limpa todas as entidades
-        self.entity_system = EntitySystem()
+        # Limpa todas as entidades (mantém o mesmo sistema, que a fábrica referencia)
+        self.entity_system.remove_entities(self.entity_system.entities)
+        self.scheduler.shutdown()
         self.local_player = None
         
     def update(self, dt: float):
         """Atualiza a lógica do jogo"""
-        # Atualiza todas as entidades
-        for entity_id in list(self.entity_system.entities.keys()):
-            # Atualiza componentes de movimento
-            movement = self.entity_system.get_component(entity_id, "MovementComponent")
-            if movement:
-                movement.update(dt)
-                
-            # Atualiza componentes de combate
-            combat = self.entity_system.get_component(entity_id, "CombatComponent")
-            if combat:
-                combat.update(dt)
-                
-        # Em singleplayer, atualiza a IA dos inimigos
-        if not self.is_multiplayer:
-            enemy_ids = self.entity_system.get_entities_with_tag("enemy")
-            for enemy_id in enemy_ids:
-                ai_controller = self.entity_system.get_component(enemy_id, "AIController")
-                if ai_controller:
-                    ai_controller.update(dt, self.entity_system)
+        # Executa movimento, combate e IA (a IA só fica ativa em singleplayer)
+        self.scheduler.update(dt)
                     
     def render(self, surface: pygame.Surface):
         """Renderiza o jogo na tela"""
+        if self.headless:
+            return  # Sem display não há o que renderizar
+            
         # Renderiza o fundo (em um jogo real, isso seria um tileset)
         surface.fill((0, 100, 50))  # Cor verde para grama
         
         # Renderiza todas as entidades
-        for entity_id in self.entity_system.entities:
-            # Obtém componente de renderização se existir
+        enemies = self.entity_system.get_entities_with_tag("enemy")
+        for entity_id, (movement,) in self.entity_system.query("MovementComponent"):
             # Em um jogo real, teríamos um componente específico para renderização
-            movement = self.entity_system.get_component(entity_id, "MovementComponent")
-            if movement:
-                # Desenha um retângulo representando a entidade
-                color = (255, 0, 0) if "enemy" in self.entity_system.tags and entity_id in self.entity_system.tags["enemy"] else (0, 0, 255)
-                pygame.draw.rect(surface, color, (movement.x - 15, movement.y - 15, 30, 30))
+            # Desenha um retângulo representando a entidade
+            color = (255, 0, 0) if entity_id in enemies else (0, 0, 255)
+            pygame.draw.rect(surface, color, (movement.x - 15, movement.y - 15, 30, 30))
                 
         # Renderiza HUD (interface do usuário)
         self.render_hud(surface)
         
     def render_hud(self, surface: pygame.Surface):
         """Renderiza a interface do usuário"""
+        # Carrega a fonte uma única vez (SysFont é caro para chamar a cada frame)
+        if self.hud_font is None:
+            self.hud_font = pygame.font.SysFont("Arial", 18)
+        font = self.hud_font
+        
         # Renderiza informações do jogador
-        font = pygame.font.SysFont("Arial", 18)
         
         if self.local_player:
             health = self.entity_system.get_component(self.local_player.entity_id, "HealthComponent")
             if health:
-                health_text = font.render(f"Vida: {health.current_health}/{health.max_health}", True, (255, 255, 255))
+                health_text = font.render(f"Vida: {health.current_health:.0f}/{health.max_health:.0f}", True, (255, 255, 255))
                 surface.blit(health_text, (10, 10))
                 
         # Renderiza modo atual
@@ -136,12 +151,14 @@ class GameWorld(SceneBase):
                 "name": "Floresta",
                 "width": 1000,
                 "height": 1000,
+                "tile_size": 32,
                 "spawn_points": [(100, 100), (200, 200), (300, 300)]
             },
             "cave": {
                 "name": "Caverna",
                 "width": 800,
                 "height": 800,
+                "tile_size": 32,
                 "spawn_points": [(400, 400), (300, 300), (200, 200)]
             }
         }
@@ -40,9 +40,9 @@ class MultiplayerLobby(SceneBase):
         
     def update(self, dt: float):
         """Atualiza a lógica do lobby"""
-        # Lobby não precisa de atualizações complexas
-        # A maior parte da lógica é baseada em eventos de rede
-        pass
+        # A maior parte da lógica é baseada em eventos de rede, processados aqui
+        # (os callbacks rodam na thread do jogo, não na thread do socket.io)
+        self.game.network_client.poll()
         
     def render(self, surface: pygame.Surface):
         """Renderiza o lobby na tela"""
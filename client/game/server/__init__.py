@@ -0,0 +1,9 @@
+"""
+Servidor headless autoritativo - a simulação do jogo (EntitySystem, componentes e IA)
+servindo clientes pela rede
+"""
+# Expõe as classes principais do servidor
+from .simulation import ServerSimulation
+from .interest import InterestManager
+from .lag_compensation import PositionHistory
+from .app import GameServer
@@ -0,0 +1,6 @@
+"""
+Uso: python -m game.server [--host HOST] [--port PORTA] [--enemies N]
+"""
+from .app import main
+
+main()
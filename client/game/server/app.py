@@ -0,0 +1,413 @@
+"""
+Servidor headless autoritativo em Python - alternativa ao server/index.js
+
+Fala os mesmos eventos socket.io do servidor Node (game_state, game_state_update,
+game_state_delta, state_mode/state_ack/state_resync, player_input, player_action,
+player_joined/player_left, net_ping/net_pong, server_stats, session e os pacotes 'batch'
+do outbound_queue), mas a simulação é a do próprio jogo (ver simulation)
+
+Jogadores são identificados pelo id da sua primeira conexão; depois de uma queda, uma nova
+conexão retoma o mesmo jogador e recebe apenas o que mudou desde o último snapshot que
+confirmou (ver sessions)
+
+Uso: python -m game.server --host 0.0.0.0 --port 3000 --enemies 5
+
+Os manipuladores do socket.io apenas enfileiram os eventos; o loop de simulação os aplica
+no início de cada tick, então o mundo só é alterado por uma thread. Com eventlet instalado
+(requirements.txt) o servidor aceita websockets; sem ele, roda com threads e os clientes
+usam long-polling
+"""
+import argparse
+import os
+import time
+import traceback
+from collections import deque
+from typing import Any, Dict, Optional
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+from socketserver import ThreadingMixIn
+
+import socketio
+
+from ..core.game_loop import FixedTimestep
+from ..networking.delta_state import SNAPSHOT_HISTORY, encode_delta
+from ..networking.inbound_queue import InboundQueue, allow_polling_bursts
+from ..networking.outbound_queue import BATCH_EVENT, unpack_batch
+from ..networking.telemetry import percentile_summary
+from .interest import INTEREST_RADIUS, InterestManager
+from .sessions import SessionManager
+from .simulation import ServerSimulation
+
+try:
+    import eventlet
+    import eventlet.wsgi
+except ImportError:
+    eventlet = None
+
+# Modo assíncrono do socket.io (eventlet quando disponível)
+ASYNC_MODE = "eventlet" if eventlet is not None else "threading"
+# Frequência da simulação (ticks por segundo)
+TICK_RATE = 60
+# Sala dos clientes que recebem o estado completo (sem delta)
+FULL_STATE_ROOM = "full"
+# Número de ticks recentes cuja duração é guardada para 'server_stats' (~10 s a 60 Hz)
+TICK_HISTORY = 600
+
+
+class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    """Servidor WSGI com uma thread por requisição (long-polling mantém requisições abertas)"""
+    daemon_threads = True
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    """Não registra cada requisição de polling no console"""
+
+    def log_message(self, format, *args):
+        pass
+
+
+class GameServer:
+    """
+    Servidor socket.io que roda a simulação em passos fixos e envia o estado aos clientes
+    """
+
+    def __init__(self, tick_rate: float = TICK_RATE, send_rate: Optional[float] = None, enemy_count: int = 5,
+                 interest_radius: Optional[float] = INTEREST_RADIUS):
+        """
+        tick_rate: Passos de simulação por segundo
+        send_rate: Envios de estado por segundo (None = a cada tick); os clientes
+                   interpolam entre estados, então pode ser menor que a simulação
+        enemy_count: Número de inimigos gerados
+        interest_radius: Cada cliente recebe apenas o que está a até esta distância do seu
+                         jogador (ver interest); None ou 0 envia o mundo inteiro
+        """
+        # Sem eventlet o servidor WSGI da biblioteca padrão não entrega o socket para
+        # websockets: os clientes ficam no long-polling, com vários pacotes por requisição
+        if eventlet is None:
+            allow_polling_bursts()
+        self.sio = socketio.Server(async_mode=ASYNC_MODE, cors_allowed_origins="*",
+                                   allow_upgrades=eventlet is not None)
+        self.simulation = ServerSimulation(enemy_count)
+        self.interest: Optional[InterestManager] = None
+        if interest_radius:
+            self.interest = InterestManager(self.simulation.entity_system, interest_radius)
+        self.timestep = FixedTimestep(tick_rate)
+        # Número de ticks entre dois envios
+        send_rate = min(tick_rate, send_rate or tick_rate)
+        self.send_every = max(1, round(tick_rate / send_rate))
+        self.tick_count = 0
+        # Duração (s) dos ticks recentes, incluindo eventos e envio
+        self.tick_times = deque(maxlen=TICK_HISTORY)
+        # Eventos recebidos pela thread do socket.io, aplicados no início de cada tick
+        self.inbound = InboundQueue()
+        # Jogador de cada conexão e jogadores guardados para serem retomados
+        self.sessions = SessionManager()
+        # Sincronização por delta: sequência atual, jogadores em modo delta (id do jogador ->
+        # último snapshot confirmado, ou None) e o que cada um recebeu nos snapshots recentes
+        # (id do jogador -> seq -> estado visível), base dos próximos deltas
+        self.state_seq = 0
+        self.delta_clients: Dict[str, Optional[int]] = {}
+        self.client_views: Dict[str, Dict[int, Dict[str, Any]]] = {}
+        # Instante do último estado (ms)
+        self.last_update = int(time.time() * 1000)
+        self.running = False
+        self.register_handlers()
+
+    def register_handlers(self) -> None:
+        """Registra os eventos do socket.io (todos apenas enfileiram)"""
+        sio = self.sio
+        inbound = self.inbound
+
+        @sio.event
+        def connect(sid, environ, auth=None):
+            # auth traz os dados para retomar uma sessão (ver networking/session)
+            inbound.push("connect", (sid, auth), droppable=False)
+
+        @sio.event
+        def disconnect(sid, reason=None):
+            inbound.push("disconnect", (sid, None), droppable=False)
+
+        # Eventos dos clientes (também podem chegar dentro de um pacote 'batch')
+        handlers = {event: self.make_enqueue(event)
+                    for event in ("state_mode", "state_ack", "state_resync", "player_input", "player_action")}
+
+        def net_ping(sid, data=None):
+            # Medição de RTT: devolve o ping imediatamente, sem passar pela fila do tick
+            sio.emit("net_pong", data, to=sid)
+
+        def server_stats(sid, data=None):
+            # Usado pelo gerador de carga (game.load_generator); lê apenas contadores
+            sio.emit("server_stats", self.stats(), to=sid)
+
+        handlers["net_ping"] = net_ping
+        handlers["server_stats"] = server_stats
+        for event, handler in handlers.items():
+            sio.on(event, handler)
+
+        @sio.on(BATCH_EVENT)
+        def batch(sid, data=None):
+            # Várias mensagens de um frame do cliente, tratadas na ordem em que foram enviadas
+            for event, payload in unpack_batch(data):
+                handler = handlers.get(event)
+                if handler is not None:
+                    handler(sid, payload)
+
+    def make_enqueue(self, event: str):
+        """Cria o manipulador socket.io que enfileira um evento com o id da conexão"""
+        def enqueue(sid, data=None):
+            self.inbound.push(event, (sid, data), droppable=False)
+        return enqueue
+
+    def handle_event(self, event: str, payload: Any, received_at: float) -> None:
+        """
+        Aplica um evento recebido (na thread da simulação)
+        Um evento mal formado é descartado: uma exceção aqui pararia o loop de simulação
+        para todos os jogadores
+        """
+        try:
+            self.apply_event(event, payload, received_at)
+        except Exception as e:
+            print(f"Evento '{event}' inválido descartado: {e!r}")
+
+    def apply_event(self, event: str, payload: Any, received_at: float) -> None:
+        """Aplica um evento recebido"""
+        sid, data = payload
+        if event == "connect":
+            self.handle_connect(sid, data, received_at)
+            return
+        # Eventos de uma conexão já substituída (ou encerrada) são ignorados
+        player_id = self.sessions.player_of(sid)
+        if player_id is None:
+            return
+        simulation = self.simulation
+        if event == "player_input":
+            simulation.handle_input(player_id, data, received_at)
+        elif event == "state_ack":
+            # O snapshot confirmado passa a ser a base dos próximos deltas
+            if (player_id in self.delta_clients and isinstance(data, dict)
+                    and data.get("seq") in self.client_views.get(player_id, ())):
+                acked = self.delta_clients[player_id]
+                if acked is None or data["seq"] > acked:
+                    self.delta_clients[player_id] = data["seq"]
+        elif event == "state_resync":
+            # Cliente perdeu a base: o próximo delta leva o estado completo
+            if player_id in self.delta_clients:
+                self.delta_clients[player_id] = None
+        elif event == "state_mode":
+            self.set_state_mode(player_id, sid, isinstance(data, dict) and data.get("mode") == "delta")
+        elif event == "player_action":
+            simulation.attack(player_id, data)
+        elif event == "disconnect":
+            # O jogador fica no mundo até a sessão expirar (ver expire_sessions)
+            print(f"Cliente desconectado: {sid}")
+            self.sessions.hold(sid, received_at)
+
+    def handle_connect(self, sid: str, auth: Any, now: float) -> None:
+        """Nova conexão: retoma a sessão apresentada no handshake ou cria um jogador"""
+        simulation = self.simulation
+        player_id = auth.get("player_id") if isinstance(auth, dict) else None
+        replaced = self.sessions.sid_of(player_id) if player_id is not None else None
+        session = self.sessions.resume(sid, auth) if auth else None
+        if session is not None and session.player_id in simulation.players:
+            player_id = session.player_id
+            print(f"Cliente retomou a sessão {player_id}: {sid}")
+            if replaced is not None:
+                self.sio.disconnect(replaced)
+            delta = auth.get("mode") == "delta"
+            self.sio.emit("session", {"player_id": player_id, "token": session.token, "resumed": True}, to=sid)
+            if delta:
+                # O próximo delta parte do último snapshot que o cliente confirmou (ou do
+                # estado completo, se ele já saiu do histórico); os demais não servem mais
+                views = self.client_views.get(player_id, {})
+                seq = auth.get("seq") if isinstance(auth.get("seq"), int) else None
+                self.client_views[player_id] = {seq: views[seq]} if seq in views else {}
+                self.delta_clients[player_id] = seq if seq in views else None
+            else:
+                self.set_state_mode(player_id, sid, False)
+                view = self.client_view(player_id, simulation.snapshot())
+                self.sio.emit("game_state", simulation.full_state(self.last_update, view), to=sid)
+            return
+
+        print(f"Novo cliente conectado: {sid}")
+        session = self.sessions.open(sid)
+        connected = simulation.add_player(sid, now)
+        self.set_full_state(sid, True)
+        self.sio.emit("session", {"player_id": sid, "token": session.token, "resumed": False}, to=sid)
+        view = self.client_view(sid, simulation.snapshot())
+        self.sio.emit("game_state", simulation.full_state(self.last_update, view), to=sid)
+        # Com gerenciamento de interesse, os outros clientes só ficam sabendo do jogador quando
+        # ele entra na área de cada um (como criado no próximo estado); avisar todos criaria
+        # objetos que nunca mais seriam atualizados
+        if self.interest is None:
+            self.sio.emit("player_joined", {"id": sid, "player": simulation.player_fields(connected)},
+                          skip_sid=sid)
+
+    def set_state_mode(self, player_id: str, sid: str, delta: bool) -> None:
+        """Passa um jogador para o modo delta ou para o estado completo a cada envio"""
+        if delta:
+            self.delta_clients[player_id] = None
+            self.set_full_state(sid, False)
+        else:
+            self.delta_clients.pop(player_id, None)
+            self.client_views.pop(player_id, None)
+            self.set_full_state(sid, True)
+
+    def expire_sessions(self, now: float) -> None:
+        """Remove os jogadores cujas conexões caíram e não foram retomadas a tempo"""
+        for player_id in self.sessions.expire(now):
+            print(f"Jogador removido (sessão expirada): {player_id}")
+            self.simulation.remove_player(player_id)
+            self.delta_clients.pop(player_id, None)
+            self.client_views.pop(player_id, None)
+            if self.interest is not None:
+                self.interest.remove(player_id)
+            self.sio.emit("player_left", {"id": player_id})
+
+    def set_full_state(self, sid: str, enabled: bool) -> None:
+        """Coloca ou tira um cliente da sala que recebe o estado completo"""
+        try:
+            if enabled:
+                self.sio.enter_room(sid, FULL_STATE_ROOM)
+            else:
+                self.sio.leave_room(sid, FULL_STATE_ROOM)
+        except ValueError:
+            # A conexão já foi encerrada (o evento de desconexão está na fila)
+            pass
+
+    def tick(self, dt: float) -> None:
+        """Um passo do servidor: eventos recebidos, simulação e (a cada send_every) envio"""
+        start = time.perf_counter()
+        self.inbound.drain(self.handle_event, None)
+        now = time.monotonic()
+        self.expire_sessions(now)
+        self.last_update = int(time.time() * 1000)
+        self.simulation.step(dt, now)
+        # Posições deste estado, para resolver os ataques dos próximos ticks no passado
+        self.simulation.record_positions(self.last_update / 1000.0)
+        self.tick_count += 1
+        if self.tick_count % self.send_every == 0:
+            self.broadcast()
+        self.tick_times.append(time.perf_counter() - start)
+
+    def safe_tick(self, dt: float) -> None:
+        """
+        Executa um tick registrando (em vez de propagar) exceções
+        Uma exceção escapando de run_loop mataria a tarefa de fundo: o servidor continuaria
+        aceitando conexões sem simular nem enviar estados
+        """
+        try:
+            self.tick(dt)
+        except Exception as e:
+            print(f"Erro no tick {self.tick_count}: {e!r}")
+            traceback.print_exc()
+
+    def stats(self) -> Dict[str, Any]:
+        """Duração dos ticks recentes (ms) e número de jogadores"""
+        return {
+            "server": "python",
+            "tick_rate": 1.0 / self.timestep.step_dt,
+            "tick_count": self.tick_count,
+            "players": len(self.simulation.players),
+            "tick_ms": percentile_summary(list(self.tick_times)),
+        }
+
+    def client_view(self, player_id: str, snapshot: Dict[str, Any]) -> Dict[str, Any]:
+        """Parte de um snapshot que um jogador deve receber (tudo, sem gerenciamento de interesse)"""
+        if self.interest is None:
+            return snapshot
+        connected = self.simulation.players.get(player_id)
+        if connected is None:
+            return {"players": {}, "entities": {}}
+        self.interest.update(player_id, connected.entity_id)
+        return self.simulation.view(snapshot, self.interest.visible[player_id])
+
+    def broadcast(self) -> None:
+        """Envia o estado: completo aos clientes sem delta, deltas aos demais"""
+        simulation = self.simulation
+        snapshot = simulation.snapshot()
+        if len(simulation.players) > len(self.delta_clients):
+            if self.interest is None:
+                self.sio.emit("game_state_update", simulation.full_state(self.last_update, snapshot),
+                              room=FULL_STATE_ROOM)
+            else:
+                for player_id in simulation.players:
+                    sid = self.sessions.sid_of(player_id)
+                    if sid is not None and player_id not in self.delta_clients:
+                        view = self.client_view(player_id, snapshot)
+                        self.sio.emit("game_state_update", simulation.full_state(self.last_update, view), to=sid)
+        if not self.delta_clients:
+            return
+
+        self.state_seq += 1
+        # Sem gerenciamento de interesse, clientes com a mesma base compartilham a mesma mensagem
+        messages: Dict[Optional[int], Dict[str, Any]] = {}
+        for player_id, baseline_seq in list(self.delta_clients.items()):
+            sid = self.sessions.sid_of(player_id)
+            if sid is None:
+                # Conexão caiu: o histórico fica parado até a sessão ser retomada
+                continue
+            views = self.client_views.setdefault(player_id, {})
+            view = views[self.state_seq] = self.client_view(player_id, snapshot)
+            # Os mais antigos primeiro (inclusive a base guardada durante uma queda)
+            while len(views) > SNAPSHOT_HISTORY:
+                del views[next(iter(views))]
+            baseline = None if baseline_seq is None else views.get(baseline_seq)
+            if baseline is None:
+                # Sem base ou base antiga demais: volta ao estado completo
+                baseline_seq = self.delta_clients[player_id] = None
+            message = messages.get(baseline_seq) if self.interest is None else None
+            if message is None:
+                message = encode_delta(self.state_seq, baseline_seq, baseline, view)
+                # Instante do snapshot no servidor (ms), usado pelos clientes para interpolar
+                message["timestamp"] = self.last_update
+                messages[baseline_seq] = message
+            self.sio.emit("game_state_delta", message, to=sid)
+
+    def run_loop(self) -> None:
+        """Loop de simulação em tempo real (roda em uma tarefa de fundo do socket.io)"""
+        last = time.perf_counter()
+        while self.running:
+            now = time.perf_counter()
+            self.timestep.advance(now - last, self.safe_tick)
+            last = now
+            # Dorme até o próximo passo
+            remaining = self.timestep.step_dt - self.timestep.accumulator
+            if remaining > 0:
+                self.sio.sleep(remaining)
+
+    def serve(self, host: str, port: int) -> None:
+        """Inicia a simulação e atende conexões até ser interrompido"""
+        app = socketio.WSGIApp(self.sio)
+        self.running = True
+        self.sio.start_background_task(self.run_loop)
+        print(f"Servidor Python executando em http://{host}:{port} (modo {ASYNC_MODE})")
+        try:
+            if eventlet is not None:
+                eventlet.wsgi.server(eventlet.listen((host, port)), app, log_output=False)
+            else:
+                server = make_server(host, port, app, server_class=ThreadingWSGIServer,
+                                     handler_class=QuietRequestHandler)
+                server.serve_forever()
+        finally:
+            self.running = False
+            self.simulation.shutdown()
+
+
+def main() -> None:
+    """Ponto de entrada da linha de comando"""
+    parser = argparse.ArgumentParser(description="Servidor multiplayer headless (simulação do jogo em Python)")
+    parser.add_argument("--host", default=os.environ.get("HOST", "0.0.0.0"),
+                        help="'127.0.0.1' para localhost, '0.0.0.0' para aceitar a LAN")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", 3000)), help="porta")
+    parser.add_argument("--tick-rate", type=float, default=TICK_RATE, help="passos de simulação por segundo")
+    parser.add_argument("--send-rate", type=float, default=float(os.environ.get("SEND_RATE", 0)) or None,
+                        help="envios de estado por segundo (padrão: a cada tick)")
+    parser.add_argument("--enemies", type=int, default=5, help="número de inimigos")
+    parser.add_argument("--interest-radius", type=float, default=INTEREST_RADIUS,
+                        help="distância (px) do que cada cliente recebe; 0 envia o mundo inteiro")
+    args = parser.parse_args()
+
+    server = GameServer(args.tick_rate, args.send_rate, args.enemies, args.interest_radius)
+    try:
+        server.serve(args.host, args.port)
+    except KeyboardInterrupt:
+        print("Servidor encerrado")
@@ -0,0 +1,76 @@
+"""
+Gerenciamento de interesse (area of interest) - cada cliente recebe apenas o que está perto
+do seu jogador
+
+O conjunto visível de cada cliente é recalculado a cada envio a partir do índice espacial
+do EntitySystem, então o custo depende de quantas entidades estão em volta do jogador e não
+do tamanho do mundo. Entidades entram no conjunto a até 'radius' pixels e só saem além de
+'radius * leave_factor', para que algo parado na borda não entre e saia a cada envio
+
+Entradas e saídas chegam aos clientes em modo delta como 'created' e 'removed' (o delta de
+cada cliente é calculado sobre o que ele via no snapshot base)
+"""
+from typing import Dict, Set, Tuple
+from ..core.entity_system import EntitySystem
+
+# Raio de interesse padrão (px)
+INTEREST_RADIUS = 500.0
+# Fator do raio a partir do qual uma entidade visível deixa de ser enviada
+LEAVE_FACTOR = 1.2
+
+
+class InterestManager:
+    """
+    Conjuntos de entidades visíveis por cliente
+    """
+
+    def __init__(self, entity_system: EntitySystem, radius: float = INTEREST_RADIUS,
+                 leave_factor: float = LEAVE_FACTOR):
+        """
+        entity_system: Sistema de entidades (com índice espacial habilitado)
+        radius: Distância máxima para uma entidade entrar no conjunto visível
+        leave_factor: Uma entidade visível só sai além de radius * leave_factor
+        """
+        if entity_system.spatial_index is None:
+            raise ValueError("O gerenciamento de interesse requer o índice espacial do EntitySystem")
+        if leave_factor < 1.0:
+            raise ValueError("leave_factor deve ser >= 1")
+        self.entity_system = entity_system
+        self.radius = radius
+        self.leave_radius = radius * leave_factor
+        # Cliente -> handles visíveis
+        self.visible: Dict[str, Set[int]] = {}
+
+    def update(self, client_id: str, entity_id: int) -> Tuple[Set[int], Set[int]]:
+        """
+        Recalcula o conjunto visível de um cliente
+        entity_id: Handle do jogador do cliente (sempre visível para ele mesmo)
+        Retorna (entraram, saíram) desde a última atualização
+        """
+        previous = self.visible.get(client_id, set())
+        position = self.entity_system.get_position(entity_id)
+        if position is None:
+            current = set()
+        else:
+            x, y = position
+            radius_squared = self.radius * self.radius
+            get_position = self.entity_system.get_position
+            current = set()
+            # Uma única consulta no raio de saída: quem já era visível fica; os demais
+            # precisam estar dentro do raio de entrada
+            for other in self.entity_system.spatial_index.query_radius(x, y, self.leave_radius):
+                if other in previous:
+                    current.add(other)
+                    continue
+                other_x, other_y = get_position(other)
+                dx = other_x - x
+                dy = other_y - y
+                if dx * dx + dy * dy <= radius_squared:
+                    current.add(other)
+        current.add(entity_id)
+        self.visible[client_id] = current
+        return current - previous, previous - current
+
+    def remove(self, client_id: str) -> None:
+        """Descarta o conjunto de um cliente desconectado"""
+        self.visible.pop(client_id, None)
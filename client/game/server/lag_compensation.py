@@ -0,0 +1,114 @@
+"""
+Compensação de latência - resolve ataques contra as posições que o cliente estava vendo
+
+O cliente desenha inimigos e outros jogadores no passado (ver interpolation): quando o
+jogador clica em um alvo, o servidor já o moveu por RTT/2 + o atraso da interpolação. Para
+o acerto valer contra o que estava na tela, o servidor guarda as posições de cada tick em
+um buffer circular de tamanho fixo e o ataque, que traz o instante (relógio do servidor)
+desenhado pelo cliente, é testado no tick mais próximo desse instante
+
+A memória é limitada: size ticks x entidades com posição, em arrays NumPy preenchidos no
+lugar (só crescem quando o número de entidades passa da capacidade). O quanto um cliente
+pode voltar no tempo também: instantes fora do histórico usam o tick mais antigo (ou o mais
+recente)
+"""
+import math
+from typing import Any, List, Optional, Sequence
+
+import numpy as np
+
+# Ticks guardados (~0.5 s a 60 Hz): cobre RTT/2 + INTERPOLATION_DELAY de clientes de LAN
+# e de conexões mais lentas
+REWIND_HISTORY = 32
+# Entidades por tick reservadas inicialmente
+DEFAULT_CAPACITY = 64
+
+
+class PositionHistory:
+    """
+    Posições das entidades nos últimos ticks (buffer circular)
+    """
+
+    def __init__(self, size: int = REWIND_HISTORY, capacity: int = DEFAULT_CAPACITY):
+        """
+        size: Número de ticks guardados
+        capacity: Entidades por tick reservadas inicialmente
+        """
+        if size < 1:
+            raise ValueError("O histórico deve guardar pelo menos um tick")
+        self.size = size
+        # Instante de cada tick (s, relógio do servidor); -inf = posição ainda não usada
+        self.times = np.full(size, -math.inf)
+        # Número de entidades, ids e posições de cada tick
+        self.counts = np.zeros(size, dtype=np.int64)
+        self.entity_ids: List[Optional[List[Any]]] = [None] * size
+        self.x = np.zeros((size, capacity))
+        self.y = np.zeros((size, capacity))
+        # Próxima posição a gravar e ticks gravados
+        self.head = 0
+        self.frames = 0
+
+    def __len__(self) -> int:
+        return self.frames
+
+    def clear(self) -> None:
+        """Descarta o histórico"""
+        self.times[:] = -math.inf
+        self.counts[:] = 0
+        self.entity_ids = [None] * self.size
+        self.head = 0
+        self.frames = 0
+
+    def record(self, server_time: float, entity_ids: Sequence[Any], x: np.ndarray, y: np.ndarray) -> None:
+        """
+        Grava as posições de um tick (sobrescreve o mais antigo quando o buffer está cheio)
+        server_time: Instante do tick no relógio enviado aos clientes (s)
+        entity_ids: Id da entidade de cada posição
+        x, y: Posições, na mesma ordem de entity_ids
+        """
+        count = len(entity_ids)
+        if count > self.x.shape[1]:
+            self._grow(count)
+        slot = self.head
+        self.times[slot] = server_time
+        self.counts[slot] = count
+        self.x[slot, :count] = x
+        self.y[slot, :count] = y
+        self.entity_ids[slot] = list(entity_ids)
+        self.head = (slot + 1) % self.size
+        self.frames = min(self.frames + 1, self.size)
+
+    def frame_at(self, server_time: float) -> Optional[int]:
+        """
+        Posição no buffer do tick mais próximo de um instante (s)
+        Retorna None se nada foi gravado
+        """
+        if not self.frames:
+            return None
+        # Posições não usadas (-inf) ficam a uma distância infinita
+        return int(np.abs(self.times - server_time).argmin())
+
+    def query_radius(self, server_time: float, x: float, y: float, radius: float) -> List[Any]:
+        """
+        Entidades que estavam a menos de radius de (x, y) no tick mais próximo de server_time
+        """
+        slot = self.frame_at(server_time)
+        if slot is None:
+            return []
+        count = int(self.counts[slot])
+        dx = self.x[slot, :count] - x
+        dy = self.y[slot, :count] - y
+        hits = np.flatnonzero(dx * dx + dy * dy <= radius * radius)
+        entity_ids = self.entity_ids[slot]
+        return [entity_ids[index] for index in hits.tolist()]
+
+    def _grow(self, count: int) -> None:
+        """Aumenta o número de entidades por tick (dobra até caber count)"""
+        capacity = self.x.shape[1]
+        while capacity < count:
+            capacity *= 2
+        for name in ("x", "y"):
+            old = getattr(self, name)
+            grown = np.zeros((self.size, capacity))
+            grown[:, :old.shape[1]] = old
+            setattr(self, name, grown)
@@ -0,0 +1,97 @@
+"""
+Sessões dos jogadores - mantêm o jogador de uma conexão que caiu para ser retomado
+
+Cada jogador recebe um id (o id da sua primeira conexão) e um token secreto. Quando a
+conexão cai, o jogador continua no mundo por RESUME_TIMEOUT segundos; uma nova conexão que
+apresente o id e o token nesse intervalo assume o mesmo jogador (ver networking/session).
+Se a conexão antiga ainda não foi encerrada, a nova a substitui
+"""
+import secrets
+from typing import Any, Dict, List, Optional
+from ..networking.session import RESUME_TIMEOUT
+
+
+class PlayerSession:
+    """Sessão de um jogador"""
+
+    __slots__ = ("player_id", "token", "sid", "held_until")
+
+    def __init__(self, player_id: str, sid: str):
+        self.player_id = player_id
+        self.token = secrets.token_hex(16)
+        # Conexão atual (None enquanto o jogador espera ser retomado)
+        self.sid: Optional[str] = sid
+        # Instante (s) em que o jogador guardado é descartado
+        self.held_until: Optional[float] = None
+
+
+class SessionManager:
+    """
+    Sessões por jogador e o jogador de cada conexão
+    """
+
+    def __init__(self, resume_timeout: float = RESUME_TIMEOUT):
+        """
+        resume_timeout: Tempo (s) que o jogador de uma conexão que caiu é guardado
+        """
+        self.resume_timeout = resume_timeout
+        # Id do jogador -> sessão
+        self.sessions: Dict[str, PlayerSession] = {}
+        # Id da conexão -> id do jogador
+        self.players_by_sid: Dict[str, str] = {}
+
+    def open(self, sid: str) -> PlayerSession:
+        """Cria a sessão de um jogador novo (o id do jogador é o id da conexão)"""
+        session = self.sessions[sid] = PlayerSession(sid, sid)
+        self.players_by_sid[sid] = sid
+        return session
+
+    def resume(self, sid: str, auth: Any) -> Optional[PlayerSession]:
+        """
+        Tenta retomar uma sessão com os dados do handshake ({"player_id", "token", ...})
+        Retorna a sessão, agora ligada à nova conexão, ou None (dados inválidos ou jogador
+        já descartado)
+        """
+        if not isinstance(auth, dict):
+            return None
+        session = self.sessions.get(auth.get("player_id"))
+        token = auth.get("token")
+        if session is None or not isinstance(token, str) or not secrets.compare_digest(session.token, token):
+            return None
+        if session.sid is not None:
+            # A conexão antiga ainda não caiu do lado do servidor: a nova a substitui
+            self.players_by_sid.pop(session.sid, None)
+        session.sid = sid
+        session.held_until = None
+        self.players_by_sid[sid] = session.player_id
+        return session
+
+    def player_of(self, sid: str) -> Optional[str]:
+        """Jogador de uma conexão (None se a conexão foi substituída ou não tem jogador)"""
+        return self.players_by_sid.get(sid)
+
+    def sid_of(self, player_id: str) -> Optional[str]:
+        """Conexão atual de um jogador (None enquanto ele espera ser retomado)"""
+        session = self.sessions.get(player_id)
+        return None if session is None else session.sid
+
+    def hold(self, sid: str, now: float) -> Optional[str]:
+        """
+        Registra a queda de uma conexão; o jogador é guardado até now + resume_timeout
+        Retorna o id do jogador, ou None se a conexão já tinha sido substituída
+        """
+        player_id = self.players_by_sid.pop(sid, None)
+        if player_id is None:
+            return None
+        session = self.sessions[player_id]
+        session.sid = None
+        session.held_until = now + self.resume_timeout
+        return player_id
+
+    def expire(self, now: float) -> List[str]:
+        """Descarta os jogadores guardados há mais tempo que o limite; retorna seus ids"""
+        expired = [player_id for player_id, session in self.sessions.items()
+                   if session.held_until is not None and now >= session.held_until]
+        for player_id in expired:
+            del self.sessions[player_id]
+        return expired
@@ -0,0 +1,343 @@
+"""
+Simulação autoritativa do servidor - roda o EntitySystem, os componentes e a IA do jogo
+em passos fixos, sem display
+
+É a mesma simulação do cliente (a do GameWorld): jogadores conectados são entidades
+criadas pela EntityFactory, inimigos são atualizados pelos mesmos sistemas, e a entrada
+dos jogadores é aplicada com apply_input, a função que o cliente usa para prever o próprio
+movimento (a reconciliação não depende mais de duas implementações idênticas)
+"""
+import random
+from typing import Any, Dict, Iterable, Optional
+
+from ..core.entity_system import EntitySystem
+from ..core.system_scheduler import SystemScheduler
+from ..entities.entity_factory import EntityFactory
+from ..systems import MovementSystem, CombatSystem, AISystem
+from ..networking.input_batcher import INPUT_KEYS
+from ..networking.messages import PlayerActionMessage
+from ..networking.prediction import apply_input
+from .lag_compensation import REWIND_HISTORY, PositionHistory
+
+# Velocidade dos jogadores (pixels por segundo, igual à do cliente)
+PLAYER_SPEED = 300
+# Limites da posição dos jogadores
+PLAYER_MAX_X = 800 - 50
+PLAYER_MAX_Y = 600 - 50
+# Sem pacotes de entrada (nem heartbeat) por este tempo, o jogador para (s)
+INPUT_TIMEOUT = 2.0
+# Tempo de simulação máximo que um cliente pode acumular para suas amostras (s);
+# limita clientes que enviam mais passos do que o tempo real permite
+MAX_INPUT_BUDGET = 1.0
+# Máximo de passos de uma amostra (1 s a 60 Hz): o orçamento limita o tempo simulado, não
+# o número de iterações, e uma amostra com dt minúsculo travaria o tick
+MAX_SAMPLE_STEPS = int(MAX_INPUT_BUDGET * 60)
+# Raio e dano do ataque dos jogadores
+ATTACK_RADIUS = 50.0
+ATTACK_DAMAGE = 10
+# Pontos por acerto em um inimigo derrotado
+KILL_SCORE = 10
+# Tamanho e cor dos inimigos enviados aos clientes (por tipo)
+ENEMY_SIZE = 30
+ENEMY_COLORS = {
+    "basic": (200, 60, 60),
+    "strong": (140, 30, 30),
+    "fast": (230, 140, 40),
+}
+# Tamanho das células do índice espacial (px)
+SPATIAL_CELL_SIZE = 64
+# Pontos em volta dos quais os inimigos são gerados
+ENEMY_SPAWN_POINTS = [(100, 100), (200, 200), (300, 300)]
+# Entrada sem nenhuma tecla pressionada
+IDLE_INPUT = {key: False for key in INPUT_KEYS}
+
+
+def quantize(value: Any) -> Any:
+    """Arredonda posições para 2 casas (evita enviar ruído de ponto flutuante)"""
+    if isinstance(value, float):
+        return round(value, 2)
+    return value
+
+
+class ConnectedPlayer:
+    """
+    Estado de rede de um jogador conectado (a posição e a saúde ficam no EntitySystem)
+    """
+
+    __slots__ = ("sid", "entity_id", "input", "last_input_seq", "last_input_at",
+                 "input_budget", "score")
+
+    def __init__(self, sid: str, entity_id: int, now: float):
+        self.sid = sid
+        self.entity_id = entity_id
+        # Teclas pressionadas (aplicadas a cada tick); None quando o cliente envia amostras
+        # com passos (aplicadas assim que chegam)
+        self.input: Optional[Dict[str, bool]] = dict(IDLE_INPUT)
+        # Sequência da última amostra aplicada (confirmada ao cliente no estado)
+        self.last_input_seq = 0
+        # Instante do último pacote de entrada (s)
+        self.last_input_at = now
+        # Tempo de simulação disponível para as amostras do cliente (s)
+        self.input_budget = MAX_INPUT_BUDGET
+        self.score = 0
+
+
+class ServerSimulation:
+    """
+    Mundo simulado pelo servidor: jogadores conectados e inimigos controlados por IA
+    """
+
+    def __init__(self, enemy_count: int = 5, rewind_history: int = REWIND_HISTORY):
+        """
+        enemy_count: Número de inimigos gerados no início
+        rewind_history: Ticks de posições guardados para a compensação de latência dos
+                        ataques (ver lag_compensation)
+        """
+        self.entity_system = EntitySystem(columnar=True)
+        self.entity_system.enable_spatial_index(SPATIAL_CELL_SIZE)
+        self.entity_factory = EntityFactory(self.entity_system)
+        # Mesmos sistemas do GameWorld; aqui a IA está sempre ativa
+        self.scheduler = SystemScheduler(self.entity_system)
+        self.scheduler.register(MovementSystem())
+        self.scheduler.register(CombatSystem())
+        self.scheduler.register(AISystem(tags=("enemy",)))
+        # Jogadores conectados (id da conexão -> estado)
+        self.players: Dict[str, ConnectedPlayer] = {}
+        # Tipo de cada inimigo (handle -> tipo)
+        self.enemy_types: Dict[int, str] = {}
+        # Posições dos últimos ticks, contra as quais os ataques são resolvidos
+        self.history = PositionHistory(rewind_history)
+        self.spawn_enemies(enemy_count)
+
+    def shutdown(self) -> None:
+        """Libera as threads do escalonador"""
+        self.scheduler.shutdown()
+
+    def spawn_enemies(self, count: int) -> None:
+        """Gera inimigos em volta dos pontos de spawn"""
+        for _ in range(count):
+            spawn_x, spawn_y = random.choice(ENEMY_SPAWN_POINTS)
+            enemy_type = random.choice(["basic", "strong", "fast"])
+            enemy = self.entity_factory.create_enemy(spawn_x + random.randint(-50, 50),
+                                                     spawn_y + random.randint(-50, 50), enemy_type)
+            self.enemy_types[enemy.entity_id] = enemy_type
+
+    def add_player(self, sid: str, now: float) -> ConnectedPlayer:
+        """
+        Cria a entidade de um jogador recém-conectado em uma posição aleatória
+        now: Instante atual (s)
+        """
+        player = self.entity_factory.create_player(random.uniform(200, 600), random.uniform(100, 500),
+                                                   is_local=False)
+        movement = self.entity_system.get_component(player.entity_id, "MovementComponent")
+        movement.speed = PLAYER_SPEED
+        self.entity_system.bind_external_id(player.entity_id, sid)
+        connected = self.players[sid] = ConnectedPlayer(sid, player.entity_id, now)
+        return connected
+
+    def remove_player(self, sid: str) -> None:
+        """Remove a entidade de um jogador desconectado"""
+        connected = self.players.pop(sid, None)
+        if connected is not None:
+            self.entity_system.remove_entity(connected.entity_id)
+
+    def handle_input(self, sid: str, data: Dict[str, Any], now: float) -> None:
+        """
+        Aplica um pacote 'player_input' (ver input_batcher)
+        Amostras com dt/steps são aplicadas na hora, passo a passo (o cliente prevê o mesmo
+        resultado e reconcilia com lastInputSeq); as demais definem as teclas pressionadas,
+        aplicadas a cada tick
+        now: Instante atual (s)
+        """
+        connected = self.players.get(sid)
+        if connected is None or not isinstance(data, dict):
+            return
+        connected.last_input_at = now
+        movement = self.entity_system.get_component(connected.entity_id, "MovementComponent")
+
+        # Compat: clientes antigos enviam o estado das teclas diretamente
+        samples = data.get("samples")
+        if not isinstance(samples, list):
+            samples = [data]
+        for sample in samples:
+            if not isinstance(sample, dict):
+                continue
+            # Ignora amostras repetidas ou fora de ordem
+            seq = sample.get("seq")
+            if seq is not None:
+                if not isinstance(seq, int) or isinstance(seq, bool) or seq <= connected.last_input_seq:
+                    continue
+                connected.last_input_seq = seq
+            keys = {key: bool(sample.get(key)) for key in INPUT_KEYS}
+            if "steps" in sample:
+                connected.input = None
+                self.apply_sample(connected, movement, keys, sample.get("dt"), sample.get("steps"))
+                continue
+            connected.input = keys
+
+    def apply_sample(self, connected: ConnectedPlayer, movement, keys: Dict[str, bool],
+                     dt: Any, steps: Any) -> None:
+        """Aplica os passos de uma amostra cobertos pelo tempo acumulado do cliente"""
+        try:
+            dt = float(dt)
+            steps = min(max(0, int(steps)), MAX_SAMPLE_STEPS)
+        except (TypeError, ValueError, OverflowError):
+            return
+        if not dt > 0:
+            return
+        steps = min(steps, int(connected.input_budget / dt + 1e-6))
+        connected.input_budget -= steps * dt
+        apply_input(movement, dict(keys, dt=dt, steps=steps), (PLAYER_MAX_X, PLAYER_MAX_Y))
+        # A velocidade não deve continuar sendo integrada pelo MovementSystem
+        movement.stop()
+        # Entre ticks o MovementSystem não roda: atualiza a célula do jogador já
+        self.entity_system.refresh_spatial_index(connected.entity_id)
+
+    def attack(self, sid: str, data: Dict[str, Any]) -> None:
+        """
+        Aplica um ataque de jogador: dano em todos os inimigos perto do alvo
+        Com "timestamp" (ms, relógio do servidor: o instante que o cliente estava desenhando),
+        os inimigos são procurados nas posições daquele tick (ver lag_compensation); sem ele,
+        nas posições atuais
+        """
+        connected = self.players.get(sid)
+        if connected is None or not isinstance(data, dict) or data.get("type") != "attack":
+            return
+        try:
+            target_x = float(data["target_x"])
+            target_y = float(data["target_y"])
+        except (KeyError, TypeError, ValueError):
+            return
+        entity_system = self.entity_system
+        timestamp = data.get("timestamp")
+        if isinstance(timestamp, (int, float)) and not isinstance(timestamp, bool) and len(self.history):
+            targets = self.history.query_radius(timestamp / 1000.0, target_x, target_y, ATTACK_RADIUS)
+        else:
+            targets = entity_system.spatial_index.query_radius(target_x, target_y, ATTACK_RADIUS)
+        for entity_id in targets:
+            if entity_id not in self.enemy_types:
+                continue
+            health = entity_system.get_component(entity_id, "HealthComponent")
+            if health is None or health.is_dead:
+                continue
+            health.take_damage(ATTACK_DAMAGE)
+            if health.is_dead:
+                connected.score += KILL_SCORE
+
+    def handle_action(self, message: PlayerActionMessage) -> None:
+        """Aplica uma PlayerActionMessage (mesmos campos do evento 'player_action')"""
+        if message.action_type == "attack":
+            self.attack(message.player_id, dict(message.action_data, type="attack"))
+
+    def record_positions(self, server_time: float) -> None:
+        """
+        Grava as posições atuais no histórico da compensação de latência
+        Deve ser chamado uma vez por tick, depois de step()
+        server_time: Instante do estado no relógio enviado aos clientes (s)
+        """
+        columns = self.entity_system.get_columns("MovementComponent")
+        self.history.record(server_time, columns.entity_ids, columns.column("x"), columns.column("y"))
+
+    def step(self, dt: float, now: float) -> None:
+        """
+        Executa um passo de simulação
+        dt: Duração do passo (s)
+        now: Instante atual (s)
+        """
+        entity_system = self.entity_system
+        bounds = (PLAYER_MAX_X, PLAYER_MAX_Y)
+        for connected in self.players.values():
+            connected.input_budget = min(MAX_INPUT_BUDGET, connected.input_budget + dt)
+            keys = connected.input
+            if keys is None:
+                continue
+            if now - connected.last_input_at > INPUT_TIMEOUT:
+                connected.input = dict(IDLE_INPUT)
+                continue
+            if any(keys.values()):
+                movement = entity_system.get_component(connected.entity_id, "MovementComponent")
+                apply_input(movement, dict(keys, dt=dt, steps=1), bounds)
+                movement.stop()
+
+        # Movimento, combate e IA dos inimigos
+        self.scheduler.update(dt)
+
+        # Inimigos derrotados saem do mundo
+        dead = [entity_id for entity_id in self.enemy_types
+                if entity_system.get_component(entity_id, "HealthComponent").is_dead]
+        for entity_id in dead:
+            del self.enemy_types[entity_id]
+            entity_system.remove_entity(entity_id)
+
+    def player_fields(self, connected: ConnectedPlayer) -> Dict[str, Any]:
+        """Campos de rede de um jogador"""
+        entity_system = self.entity_system
+        movement = entity_system.get_component(connected.entity_id, "MovementComponent")
+        health = entity_system.get_component(connected.entity_id, "HealthComponent")
+        return {
+            "x": quantize(movement.x),
+            "y": quantize(movement.y),
+            "health": health.current_health,
+            "score": connected.score,
+            "lastInputSeq": connected.last_input_seq,
+        }
+
+    def enemy_fields(self, entity_id: int) -> Dict[str, Any]:
+        """Campos de rede de um inimigo"""
+        entity_system = self.entity_system
+        movement = entity_system.get_component(entity_id, "MovementComponent")
+        health = entity_system.get_component(entity_id, "HealthComponent")
+        enemy_type = self.enemy_types[entity_id]
+        return {
+            "type": enemy_type,
+            "x": quantize(movement.x),
+            "y": quantize(movement.y),
+            "health": health.current_health,
+            "size": ENEMY_SIZE,
+            "color": ENEMY_COLORS.get(enemy_type, (150, 150, 150)),
+        }
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """
+        Estado atual com apenas os campos de rede (coleção -> id -> campos), usado nos deltas
+        Ids de inimigos são strings (chaves JSON), como os ids de conexão dos jogadores
+        """
+        return {
+            "players": {sid: self.player_fields(connected) for sid, connected in self.players.items()},
+            "entities": {str(entity_id): self.enemy_fields(entity_id) for entity_id in self.enemy_types},
+        }
+
+    def view(self, snapshot: Dict[str, Dict[str, Dict[str, Any]]],
+             handles: Iterable[int]) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """
+        Parte de um snapshot que um cliente enxerga (os campos são compartilhados, não copiados)
+        handles: Entidades visíveis para o cliente (ver InterestManager)
+        """
+        players = snapshot["players"]
+        entities = snapshot["entities"]
+        get_external_id = self.entity_system.get_external_id
+        view = {"players": {}, "entities": {}}
+        for entity_id in handles:
+            if entity_id in self.enemy_types:
+                key = str(entity_id)
+                if key in entities:
+                    view["entities"][key] = entities[key]
+                continue
+            sid = get_external_id(entity_id)
+            if sid in players:
+                view["players"][sid] = players[sid]
+        return view
+
+    def full_state(self, timestamp: int, snapshot: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Estado completo no formato de 'game_state' (clientes sem delta)
+        timestamp: Instante do estado (ms)
+        snapshot: Estado a enviar (ex: a parte visível para um cliente); padrão: snapshot()
+        """
+        if snapshot is None:
+            snapshot = self.snapshot()
+        return {
+            "players": {sid: dict(fields, id=sid) for sid, fields in snapshot["players"].items()},
+            "entities": [dict(fields, id=entity_id) for entity_id, fields in snapshot["entities"].items()],
+            "lastUpdate": timestamp,
+        }
@@ -0,0 +1,7 @@
+"""
+Módulo de sistemas - lógica do ECS que processa entidades com determinados componentes
+"""
+# Expõe os sistemas principais
+from .movement_system import MovementSystem
+from .combat_system import CombatSystem
+from .ai_system import AISystem
@@ -0,0 +1,31 @@
+"""
+Sistema de IA - atualiza os controladores de IA das entidades não jogáveis
+"""
+from typing import Iterable
+from ..core.system_scheduler import System
+
+class AISystem(System):
+    """
+    Atualiza os controladores de IA das entidades com as tags informadas
+    """
+
+    reads = ("AIController", "MovementComponent", "HealthComponent")
+    writes = ("AIController", "MovementComponent")
+    # Controladores de IA podem consultar qualquer parte do mundo
+    parallel_safe = False
+
+    def __init__(self, tags: Iterable[str] = ("enemy",)):
+        """
+        tags: Tags que uma entidade precisa ter para ter sua IA atualizada
+        """
+        super().__init__()
+        self.tags = tuple(tags)
+
+    def prepare(self, entity_system) -> None:
+        """Cria a consulta dos controladores de IA"""
+        entity_system.query("AIController", tags=self.tags)
+
+    def update(self, dt: float, entity_system) -> None:
+        """Atualiza cada controlador de IA"""
+        for entity_id, (ai_controller,) in entity_system.query("AIController", tags=self.tags):
+            ai_controller.update(dt, entity_system, entity_id)
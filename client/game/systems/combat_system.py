@@ -0,0 +1,29 @@
+"""
+Sistema de combate - mantém o estado dos componentes de combate entre ataques
+"""
+from ..core.system_scheduler import System
+
+class CombatSystem(System):
+    """
+    Limpa alvos de ataque que deixaram de existir ou morreram
+    """
+
+    reads = ("CombatComponent", "HealthComponent")
+    writes = ("CombatComponent",)
+
+    def prepare(self, entity_system) -> None:
+        """Cria a consulta dos componentes de combate"""
+        entity_system.query("CombatComponent")
+
+    def update(self, dt: float, entity_system) -> None:
+        """Descarta alvos inválidos dos componentes de combate"""
+        for entity_id, (combat,) in entity_system.query("CombatComponent"):
+            target = combat.attack_target
+            if target is None:
+                continue
+            if not entity_system.is_alive(target):
+                combat.attack_target = None
+                continue
+            health = entity_system.get_component(target, "HealthComponent")
+            if health is not None and health.is_dead:
+                combat.attack_target = None
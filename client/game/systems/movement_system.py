@@ -0,0 +1,70 @@
+"""
+Sistema de movimento - integra posição e velocidade de todas as entidades móveis
+"""
+import numpy as np
+from ..core.system_scheduler import System
+
+# Velocidade abaixo da qual o movimento para completamente (mesmo valor de MovementComponent)
+VELOCITY_CUTOFF = 0.1
+
+class MovementSystem(System):
+    """
+    Atualiza todos os componentes de movimento a cada passo de simulação
+    Com armazenamento colunar, integra todas as entidades em uma única passada NumPy
+    """
+
+    reads = ("MovementComponent",)
+    writes = ("MovementComponent",)
+
+    def prepare(self, entity_system) -> None:
+        """Cria a consulta do caminho sem armazenamento colunar (e do sync do índice espacial)"""
+        entity_system.query("MovementComponent")
+
+    def update(self, dt: float, entity_system) -> None:
+        """Aplica a integração de movimento de cada entidade"""
+        columns = entity_system.get_columns("MovementComponent")
+        if columns is not None:
+            moved = self.integrate_columns(columns, dt)
+            # Escritas diretas nas colunas não passam pelo rastreamento dos objetos
+            if entity_system.change_tracker is not None and len(moved):
+                entity_ids = columns.entity_ids
+                entity_system.mark_changed_many((entity_ids[slot] for slot in moved.tolist()),
+                                                "MovementComponent")
+        else:
+            # Sem armazenamento colunar: atualiza objeto por objeto
+            for entity_id, (movement,) in entity_system.query("MovementComponent"):
+                movement.update(dt)
+
+        # Mantém o índice espacial em dia com as novas posições
+        entity_system.sync_spatial_index()
+
+    @staticmethod
+    def integrate_columns(columns, dt: float) -> np.ndarray:
+        """
+        Integração vetorizada equivalente a MovementComponent.update para todas as entidades
+        columns: Colunas de MovementComponent (ComponentColumns)
+        dt: Tempo decorrido (em segundos)
+        Retorna os slots das entidades que estavam em movimento
+        """
+        if columns.count == 0:
+            return np.empty(0, dtype=np.intp)
+
+        x = columns.column("x")
+        y = columns.column("y")
+        velocity_x = columns.column("velocity_x")
+        velocity_y = columns.column("velocity_y")
+        deceleration = columns.column("deceleration")
+        moved = np.flatnonzero((velocity_x != 0) | (velocity_y != 0))
+
+        # Entidades paradas têm velocidade zero, então não precisam de máscara aqui
+        x += velocity_x * dt
+        y += velocity_y * dt
+
+        # Aplica desaceleração (atrito)
+        velocity_x *= deceleration
+        velocity_y *= deceleration
+
+        # Se a velocidade for muito pequena, para completamente
+        velocity_x[np.abs(velocity_x) < VELOCITY_CUTOFF] = 0.0
+        velocity_y[np.abs(velocity_y) < VELOCITY_CUTOFF] = 0.0
+        return moved
@@ -7,24 +7,113 @@ import subprocess
 import socket
 import time
 from enum import Enum, auto
+from itertools import chain
+from game.core.game_loop import FixedTimestep
+from game.networking.delta_state import DeltaStateReceiver
+from game.networking.input_batcher import InputBatcher
+from game.networking.prediction import ClientPrediction
+from game.networking.interpolation import InterpolationBuffer, ServerClock
+from game.networking.entity_mirror import EntityMirror
+from game.networking.inbound_queue import InboundQueue, allow_polling_bursts
+from game.networking.outbound_queue import OutboundQueue
+from game.networking.session import ClientSession, connect_with_retry, reconnection_options
+from game.networking.telemetry import NetworkTelemetry, payload_size
 
 class Player:
     """Representação simples de um jogador como sprite quadrado."""
     def __init__(self, x: float, y: float, size: int = 50, color=(200, 50, 50)):
         self.x = float(x)
         self.y = float(y)
+        # Posição no passo de simulação anterior (para interpolar a renderização)
+        self.prev_x = self.x
+        self.prev_y = self.y
         self.size = size
         self.color = color
 
-    def render(self, surface: pygame.Surface):
+    def reset(self, fields: dict):
+        """Reinicializa um jogador reaproveitado com os campos de uma nova entidade"""
+        self.size = 50
+        self.color = (200, 50, 50)
+        self.apply_fields(fields)
+
+    def snapshot(self):
+        """Guarda a posição atual como estado anterior, antes de um passo de simulação"""
+        self.prev_x = self.x
+        self.prev_y = self.y
 
-        rect = pygame.Rect(int(self.x), int(self.y), self.size, self.size)
+    def render(self, surface: pygame.Surface, alpha: float = 1.0):
+        """Desenha o jogador interpolando entre o estado anterior e o atual"""
+        x = self.prev_x + (self.x - self.prev_x) * alpha
+        y = self.prev_y + (self.y - self.prev_y) * alpha
+        rect = pygame.Rect(int(x), int(y), self.size, self.size)
         pygame.draw.rect(surface, self.color, rect)
 
+    def apply_fields(self, fields: dict):
+        """Aplica campos recebidos do servidor (apenas os presentes)"""
+        if 'x' in fields:
+            self.x = self.prev_x = float(fields['x'])
+        if 'y' in fields:
+            self.y = self.prev_y = float(fields['y'])
+        if 'size' in fields:
+            self.size = fields['size']
+        if 'color' in fields:
+            self.color = tuple(fields['color'])
+
+class EntityStub:
+    """Representação de uma entidade do servidor (apenas o necessário para desenhá-la)"""
+    def __init__(self, fields: dict):
+        self.reset(fields)
+
+    def reset(self, fields: dict):
+        """(Re)inicializa o stub com os campos de uma entidade"""
+        self.x = 0
+        self.y = 0
+        self.size = 30
+        self.color = (150, 150, 150)
+        self.health = None
+        self.apply_fields(fields)
+
+    def apply_fields(self, fields: dict):
+        """Aplica campos recebidos do servidor (apenas os presentes)"""
+        if 'x' in fields:
+            self.x = fields['x']
+        if 'y' in fields:
+            self.y = fields['y']
+        if 'size' in fields:
+            self.size = fields['size']
+        if 'color' in fields:
+            self.color = tuple(fields['color'])
+        if 'health' in fields:
+            self.health = fields['health']
+
+    def render(self, surface: pygame.Surface):
+        pygame.draw.rect(surface, self.color, (int(self.x), int(self.y), self.size, self.size))
+
+def create_remote_player(fields: dict) -> Player:
+    """Cria o objeto de um jogador remoto a partir dos campos recebidos do servidor"""
+    player = Player(fields.get('x', 0), fields.get('y', 0))
+    player.apply_fields(fields)
+    return player
+
 # Configurações do jogo :cite[4]
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
+# Limite de quadros renderizados por segundo
 FPS = 60
+# Passos de simulação por segundo (independente do FPS de renderização)
+SIMULATION_HZ = 60
+# Máximo de passos de simulação para recuperar atraso em um único frame
+MAX_CATCHUP_STEPS = 5
+# Velocidade do jogador local (pixels por segundo)
+PLAYER_SPEED = 300
+# Atraso com que jogadores remotos e entidades são desenhados (s), para interpolar entre estados
+INTERPOLATION_DELAY = 0.1
+# Tempo máximo de extrapolação quando os estados do servidor atrasam (s)
+MAX_EXTRAPOLATION = 0.15
+# Tempo máximo por frame processando mensagens do servidor (s)
+NETWORK_BUDGET = 0.004
+# Máximo de pacotes enviados ao servidor por segundo (as mensagens de um frame vão juntas)
+SEND_RATE = 30
 
 # Estados do jogo
 class GameState(Enum):
@@ -41,14 +130,43 @@ class GameClient:
         self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
         pygame.display.set_caption("2D Game with LAN Multiplayer")
         self.clock = pygame.time.Clock()
+        # Simulação em passo fixo, desacoplada da renderização
+        self.timestep = FixedTimestep(SIMULATION_HZ, MAX_CATCHUP_STEPS)
         self.running = True
         self.game_state = GameState.MAIN_MENU
         
-        # Conexão de rede
-        self.socket = socketio.Client()
-        self.socket = socketio.Client()
+        # Conexão de rede (o servidor Python sem eventlet usa long-polling, com vários
+        # estados por resposta); reconecta sozinha, com espera exponencial, se cair
+        allow_polling_bursts()
+        self.socket = socketio.Client(**reconnection_options())
         self.connected = False
         self.player_id = None              # <-- inicializa aqui para evitar AttributeError
+        # Jogador e token para retomar a sessão depois de uma queda
+        self.session = ClientSession()
+        # Mensagens recebidas pela thread do socket.io, processadas no loop principal
+        self.inbound = InboundQueue()
+        # Mensagens a enviar, agrupadas em um pacote por frame (flush_network_messages)
+        self.outbound = OutboundQueue(SEND_RATE)
+        # Evento -> manipulador (executado no loop principal)
+        self.network_handlers = {}
+        # Instante local (time.monotonic) em que a mensagem sendo processada chegou
+        self.message_received_at = None
+        # RTT, jitter, banda e contadores por evento (F3 mostra no HUD)
+        self.telemetry = NetworkTelemetry()
+        self.show_network_stats = False
+        # Reconstrói o estado do servidor a partir de deltas
+        self.delta_receiver = DeltaStateReceiver()
+        # Envia a entrada apenas quando ela muda (mais um heartbeat ocasional)
+        self.input_batcher = InputBatcher()
+        # Predição do movimento do jogador local (reconciliada com o servidor)
+        self.prediction = ClientPrediction(PLAYER_SPEED, (SCREEN_WIDTH - 50, SCREEN_HEIGHT - 50))
+        # Relógio do servidor e snapshots de jogadores remotos e entidades (para interpolação)
+        self.server_clock = ServerClock()
+        self.player_interpolation = InterpolationBuffer(INTERPOLATION_DELAY, MAX_EXTRAPOLATION)
+        self.entity_interpolation = InterpolationBuffer(INTERPOLATION_DELAY, MAX_EXTRAPOLATION)
+        # Objetos de jogadores remotos e entidades, atualizados no lugar (e reaproveitados)
+        self.player_mirror = EntityMirror(create_remote_player)
+        self.entity_mirror = EntityMirror(EntityStub)
         self.setup_network_handlers()
         
         # Recursos do jogo
@@ -70,9 +188,13 @@ class GameClient:
     def load_resources(self):
         """Carrega todos os recursos do jogo"""
         self.font = pygame.font.SysFont('Arial', 24)
-        self.players = {}
+        # Jogadores remotos e entidades do servidor por id (mantidos pelos espelhos)
+        self.players = self.player_mirror.objects
         self.local_player = None
         self.entities = []
+        self.entity_stubs = self.entity_mirror.objects
+        # Última entrada de movimento amostrada (aplicada a cada passo de simulação)
+        self.movement_input = {'up': False, 'down': False, 'left': False, 'right': False}
 
     def get_local_ip(self) -> str:
         """Retorna um IP local utilisável na LAN (não 127.0.0.1)"""
@@ -87,21 +209,30 @@ class GameClient:
         except Exception:
             return "127.0.0.1"
 
-    def start_local_server(self, host: str = "127.0.0.1") -> bool:
+    def start_local_server(self, host: str = "127.0.0.1", backend: str = None) -> bool:
         """
-        Inicia o servidor Node local (server/index.js).
+        Inicia o servidor local.
         host: '127.0.0.1' ou '0.0.0.0'
+        backend: 'node' (server/index.js, requer Node.js e dependências instaladas em ../server)
+                 ou 'python' (python -m game.server, mesma simulação do cliente);
+                 padrão: variável de ambiente GAME_SERVER_BACKEND, ou 'node'
         Retorna True se o processo foi iniciado.
-        Requer Node.js e dependências instaladas em ../server.
         """
         if self.server_process:
             print("Servidor já em execução.")
             return True
-        server_dir = os.path.join(os.path.dirname(__file__), "..", "server")
-        server_dir = os.path.abspath(server_dir)
-        if not os.path.exists(os.path.join(server_dir, "index.js")):
-            print(f"Não foi encontrado index.js em {server_dir}")
-            return False
+        if backend is None:
+            backend = os.environ.get("GAME_SERVER_BACKEND", "node")
+        if backend == "python":
+            server_dir = os.path.abspath(os.path.dirname(__file__))
+            command = [sys.executable, "-m", "game.server"]
+        else:
+            server_dir = os.path.join(os.path.dirname(__file__), "..", "server")
+            server_dir = os.path.abspath(server_dir)
+            if not os.path.exists(os.path.join(server_dir, "index.js")):
+                print(f"Não foi encontrado index.js em {server_dir}")
+                return False
+            command = ["node", "index.js"]
 
         env = os.environ.copy()
         env["HOST"] = host
@@ -109,17 +240,17 @@ class GameClient:
         try:
             # Inicia servidor em processo separado
             self.server_process = subprocess.Popen(
-                ["node", "index.js"],
+                command,
                 cwd=server_dir,
                 env=env,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
                 shell=False
             )
-            # Pequena espera para permitir boot do servidor
-            time.sleep(0.6)
+            # Espera o servidor aceitar conexões (o servidor Python demora mais para iniciar)
+            self.wait_for_local_server(int(env.get("PORT", 3000)))
             self.server_hosting = True
-            print(f"Servidor iniciado em {host} (PID {self.server_process.pid})")
+            print(f"Servidor {backend} iniciado em {host} (PID {self.server_process.pid})")
             return True
         except Exception as e:
             print(f"Falha ao iniciar servidor: {e}")
@@ -127,6 +258,19 @@ class GameClient:
             self.server_hosting = False
             return False
         
+    def wait_for_local_server(self, port: int, timeout: float = 5.0) -> bool:
+        """Espera até o servidor local aceitar conexões na porta (ou o tempo acabar)"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.server_process.poll() is not None:
+                return False  # O processo terminou (erro ao iniciar)
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+                return True
+            except OSError:
+                time.sleep(0.1)
+        return False
+
     def stop_local_server(self):
         """Encerra o servidor iniciado por start_local_server()"""
         if self.server_process:
@@ -142,44 +286,106 @@ class GameClient:
         self.server_process = None
         self.server_hosting = False
 
+    def network_handler(self, event, droppable=False):
+        """
+        Decorador: registra o manipulador de um evento do servidor
+        O socket.io apenas enfileira o evento na sua thread; o manipulador roda no loop
+        principal (process_network_messages), o único que altera o estado do jogo
+        droppable: Se a mensagem pode ser descartada quando a fila estiver cheia
+        """
+        def register(handler):
+            self.network_handlers[event] = handler
+
+            def enqueue(*args):
+                # O tamanho é medido aqui, fora do loop principal
+                self.inbound.push(event, (args, payload_size(args[0]) if args else 0), droppable)
+
+            self.socket.on(event, enqueue)
+            return handler
+        return register
+
+    def process_network_messages(self):
+        """Executa os manipuladores das mensagens recebidas, dentro do limite de tempo do frame"""
+        self.inbound.drain(self.dispatch_network_message, NETWORK_BUDGET)
+
+    def flush_network_messages(self):
+        """Envia em um único pacote as mensagens enfileiradas neste frame (ver safe_emit)"""
+        if not self.connected:
+            return
+        packet = self.outbound.flush()
+        if packet is None:
+            return
+        try:
+            self.socket.emit(*packet)
+            self.telemetry.record_packet(*packet)
+        except Exception as e:
+            print(f"Erro ao enviar mensagem: {e}")
+
+    def dispatch_network_message(self, event, payload, received_at):
+        """
+        Chama o manipulador de um evento enfileirado, medindo o tempo gasto nele
+        Um erro no manipulador descarta só a mensagem (não derruba o loop principal)
+        """
+        args, size = payload
+        handler = self.network_handlers.get(event)
+        start = time.perf_counter()
+        if handler is not None:
+            self.message_received_at = received_at
+            try:
+                handler(*args)
+            except Exception as e:
+                print(f"Erro ao processar '{event}' do servidor: {e!r}")
+        self.telemetry.record_received(event, size, time.perf_counter() - start, received_at)
+
     def setup_network_handlers(self):
         """Configura os manipuladores de eventos de rede"""
-        @self.socket.on('connect')
+        on = self.network_handler
+
+        @on('connect')
         def on_connect():
             print("Conectado ao servidor")
             self.connected = True
-            if self.game_state == GameState.MULTIPLAYER:
-                start_x = SCREEN_WIDTH // 2 - 25
-                start_y = SCREEN_HEIGHT // 2 - 25
-                join_payload = {
-                    'x': start_x,
-                    'y': start_y,
-                    'size': 50,
-                    'color': (50, 150, 200)
-                }
-                try:
-                    self.socket.emit('join', join_payload)
-                except Exception as e:
-                    print(f"Erro emit join: {e}")
+            # Numa reconexão, espera a resposta 'session' para saber se o estado local vale
+            if self.session.token is None:
+                self.start_session()
 
+        @on('session')
+        def on_session(data):
+            """Sessão aberta pelo servidor: retomada (mantém o estado) ou nova"""
+            had_session = self.session.token is not None
+            resumed = self.session.update(data)
+            if resumed:
+                print(f"Sessão retomada: {self.session.player_id}")
+            elif had_session:
+                # O servidor já descartou o jogador: recomeça como um jogador novo
+                print("Sessão expirada; entrando como um novo jogador")
+                self.start_session()
+            if self.session.player_id is not None:
+                self.player_id = self.session.player_id
             
-        @self.socket.on('disconnect')
-        def on_disconnect():
+        @on('disconnect')
+        def on_disconnect(reason=None):
             print("Desconectado do servidor")
             self.connected = False
-            self.player_id = None
+            # Jogador e predição são mantidos para retomar a sessão na reconexão
+            self.outbound.clear()
 
-        @self.socket.on('game_state')
+        @on('game_state', droppable=True)
         def on_game_state(data):
             """Compat: servidor envia 'game_state'"""
             self.handle_server_update(data)
             
-        @self.socket.on('game_state_update')
+        @on('game_state_update', droppable=True)
         def on_game_state_update(data):
             """Atualiza o estado do jogo com dados do servidor"""
             self.handle_server_update(data)
 
-        @self.socket.on('welcome')
+        @on('game_state_delta', droppable=True)
+        def on_game_state_delta(data):
+            """Aplica um delta do estado do jogo e confirma o snapshot ao servidor"""
+            self.handle_state_delta(data)
+
+        @on('welcome')
         def on_welcome(data):
             """Recebe player_id e estado inicial do servidor"""
             self.player_id = data.get('player_id')
@@ -190,27 +396,28 @@ class GameClient:
             
             print(f"Welcome: assigned id = {self.player_id}")
 
-        @self.socket.on('player_joined')
+        @on('player_joined')
         def on_player_joined(data):
             pid = data.get('id')
             pdata = data.get('player', {})
             if pid and pid != self.player_id:
-                self.players[pid] = Player(
-                    pdata.get('x', 0),
-                    pdata.get('y', 0),
-                    size=pdata.get('size', 50),
-                    color=tuple(pdata.get('color', (200,50,50)))
-                )
+                self.player_mirror.apply(pid, pdata)
                 print(f"Player joined: {pid}")
 
-        @self.socket.on('player_left')
+        @on('player_left')
         def on_player_left(data):
             pid = data.get('id')
             if pid in self.players:
-                del self.players[pid]
+                self.player_mirror.remove(pid)
+                self.player_interpolation.remove(pid)
                 print(f"Player left: {pid}")
 
-        @self.socket.on('player_update')
+        @on('net_pong')
+        def on_net_pong(data):
+            """Resposta a um ping: amostra de RTT"""
+            self.telemetry.record_pong(data, self.message_received_at)
+
+        @on('player_update', droppable=True)
         def on_player_update(data):
             pid = data.get('id')
             pdata = data.get('player', {})
@@ -219,52 +426,180 @@ class GameClient:
                 p.x = pdata.get('x', p.x)
                 p.y = pdata.get('y', p.y)
                 # opcional: size/color updates
-            
+
+    def start_session(self):
+        """Começa do zero como um jogador novo: limpa o estado de rede e entra no jogo"""
+        # Pede atualizações por delta em vez do estado completo a cada tick
+        self.delta_receiver.reset()
+        self.input_batcher.reset()
+        self.prediction.reset()
+        self.server_clock.reset()
+        self.player_interpolation.clear()
+        self.entity_interpolation.clear()
+        self.player_mirror.clear()
+        self.entity_mirror.clear()
+        self.entities = self.entity_mirror.values()
+        self.telemetry.reset()
+        self.outbound.clear()
+        # O id do jogador no servidor é o id da conexão
+        try:
+            self.player_id = self.socket.get_sid()
+        except Exception:
+            pass
+        self.safe_emit('state_mode', {'mode': 'delta'})
+        if self.game_state == GameState.MULTIPLAYER:
+            start_x = SCREEN_WIDTH // 2 - 25
+            start_y = SCREEN_HEIGHT // 2 - 25
+            join_payload = {
+                'x': start_x,
+                'y': start_y,
+                'size': 50,
+                'color': (50, 150, 200)
+            }
+            self.safe_emit('join', join_payload)
+
     def handle_server_update(self, data):
         """Processa atualizações do servidor"""
         if self.game_state != GameState.MULTIPLAYER:
             return  # Ignora se não estiver em multiplayer
         players = data.get('players', {}) if isinstance(data, dict) else {}
-        new_players = {}
-        for pid, pdata in players.items():
-            try:
-                color = tuple(pdata.get('color', (200, 50, 50)))
-            except Exception:
-                color = (200, 50, 50)
-            new_players[pid] = Player(
-                pdata.get('x', 0),
-                pdata.get('y', 0),
-                size=pdata.get('size', 50),
-                color=color
-            )
-        self.players = new_players
+        server_time = self.observe_server_time(data.get('lastUpdate') if isinstance(data, dict) else None)
+        local = players.get(self.player_id)
+        if local is not None:
+            # O jogador local é previsto no cliente e apenas corrigido pelo servidor
+            self.reconcile_local_player(local)
+        # Atualiza os objetos existentes no lugar; só jogadores novos criam (ou reaproveitam) objetos
+        self.player_mirror.sync((pid, pdata) for pid, pdata in players.items() if pid != self.player_id)
+        if server_time is not None:
+            for pid in self.players:
+                pdata = players[pid]
+                self.player_interpolation.push(pid, server_time, pdata.get('x', 0), pdata.get('y', 0))
+            for pid in list(self.player_interpolation.buffers):
+                if pid not in self.players:
+                    self.player_interpolation.remove(pid)
+            self.player_interpolation.advance(server_time)
 
-        # Entities: criar stubs simples com render(surface)
-        self.entities = []
+        # Entities: stubs simples com render(surface), por id (ou posição na lista)
         raw_entities = data.get('entities', []) if isinstance(data, dict) else []
-        for ent in raw_entities:
-            if not isinstance(ent, dict):
+        if isinstance(raw_entities, dict):
+            entries = raw_entities.items()
+        else:
+            entries = ((ent.get('id', index), ent) for index, ent in enumerate(raw_entities))
+        self.entity_mirror.sync((eid, ent) for eid, ent in entries if isinstance(ent, dict))
+        self.entities = self.entity_mirror.values()
+
+    def handle_state_delta(self, data):
+        """
+        Processa um delta do servidor: cria, altera (apenas os campos recebidos) e remove
+        jogadores e entidades, sem reconstruir o restante do estado
+        """
+        if self.game_state != GameState.MULTIPLAYER or not isinstance(data, dict):
+            return
+        changes = self.delta_receiver.apply(data)
+        if changes is None:
+            # Base desconhecida: pede o estado completo
+            if self.delta_receiver.last_seq is None or data.get('seq', 0) > self.delta_receiver.last_seq:
+                self.safe_emit('state_resync')
+            return
+        self.safe_emit('state_ack', {'seq': data['seq']})
+        server_time = self.observe_server_time(data.get('timestamp'))
+        state = self.delta_receiver.state
+
+        players = changes['players']
+        for pid in players.removed:
+            self.player_mirror.remove(pid)
+        if self.player_id in players.created or self.player_id in players.changed:
+            self.reconcile_local_player(self.delta_receiver.state['players'][self.player_id])
+        for pid, fields in players.created.items():
+            if pid == self.player_id:
                 continue
-            e = type("EntityStub", (), {})()
-            e.x = ent.get('x', 0)
-            e.y = ent.get('y', 0)
-            e.size = ent.get('size', 30)
-            color = tuple(ent.get('color', (150, 150, 150)))
-            def _render(self_obj, surface, _color=color):
-                pygame.draw.rect(surface, _color, (int(self_obj.x), int(self_obj.y), self_obj.size, self_obj.size))
-            e.render = _render.__get__(e, e.__class__)
-            # opcional: métodos adicionais (take_damage, etc.) podem ser adicionados se necessário
-            self.entities.append(e)
+            self.player_mirror.apply(pid, fields)
+        for pid, fields in players.changed.items():
+            if pid in self.players:
+                self.player_mirror.apply(pid, fields)
+        if server_time is not None:
+            self.push_snapshots(self.player_interpolation, players, state['players'], server_time)
+
+        entities = changes['entities']
+        for eid in entities.removed:
+            self.entity_mirror.remove(eid)
+        for eid, fields in entities.created.items():
+            self.entity_mirror.apply(eid, fields)
+        for eid, fields in entities.changed.items():
+            if eid in self.entity_stubs:
+                self.entity_mirror.apply(eid, fields)
+        if server_time is not None:
+            self.push_snapshots(self.entity_interpolation, entities, state['entities'], server_time)
+        # A lista de renderização só é refeita quando entidades entram ou saem
+        self.entities = self.entity_mirror.values()
     
+    def observe_server_time(self, timestamp):
+        """
+        Registra o instante (ms no servidor) de um estado recebido
+        Retorna o instante em segundos, ou None se o estado não tiver timestamp
+        """
+        if not isinstance(timestamp, (int, float)):
+            return None
+        server_time = timestamp / 1000.0
+        # Usa o instante de chegada (não o de processamento) para não somar a espera na fila
+        received_at = self.message_received_at
+        self.server_clock.observe(server_time, time.monotonic() if received_at is None else received_at)
+        return server_time
+
+    def push_snapshots(self, interpolation, changes, collection, server_time):
+        """
+        Registra nos buffers de interpolação as posições que mudaram em um delta
+        changes: Mudanças da coleção (CollectionDelta)
+        collection: Estado completo da coleção após o delta (id -> campos)
+        """
+        for entity_id in changes.removed:
+            interpolation.remove(entity_id)
+        for entity_id in chain(changes.created, changes.changed):
+            if entity_id == self.player_id:
+                continue
+            fields = collection.get(entity_id)
+            if fields is not None and 'x' in fields and 'y' in fields:
+                interpolation.push(entity_id, server_time, fields['x'], fields['y'])
+        interpolation.advance(server_time)
+
+    def apply_interpolation(self):
+        """Posiciona jogadores remotos e entidades no instante interpolado"""
+        server_now = self.server_clock.server_time(time.monotonic())
+        if server_now is None:
+            return
+        for pid, player in self.players.items():
+            position = self.player_interpolation.sample(pid, server_now)
+            if position is not None:
+                player.x = player.prev_x = position[0]
+                player.y = player.prev_y = position[1]
+        for eid, stub in self.entity_stubs.items():
+            position = self.entity_interpolation.sample(eid, server_now)
+            if position is not None:
+                stub.x, stub.y = position
+
+    def reconcile_local_player(self, fields):
+        """
+        Corrige a predição do jogador local com o seu estado no servidor
+        fields: Todos os campos do jogador local no servidor
+        """
+        if 'x' not in fields or 'y' not in fields:
+            return
+        self.prediction.reconcile(fields['x'], fields['y'], fields.get('lastInputSeq', 0))
+        if self.local_player is None:
+            self.local_player = Player(fields['x'], fields['y'], color=(50, 150, 200))
+        if 'size' in fields:
+            self.local_player.size = fields['size']
+        self.local_player.x, self.local_player.y = self.prediction.position
+
     def safe_emit(self, event, data=None):
-        """Envia mensagens apenas se conectado ao servidor"""
+        """
+        Enfileira uma mensagem apenas se conectado ao servidor
+        O envio acontece no fim do frame, junto com as demais (flush_network_messages)
+        """
         if self.connected:
-            try:
-                self.socket.emit(event, data)
-                return True
-            except Exception as e:
-                print(f"Erro ao enviar mensagem: {e}")
-                return False
+            # Confirmações e modo de estado vão no handshake de uma reconexão
+            self.session.observe_sent(event, data)
+            return self.outbound.push(event, data)
         else:
             print(f"Tentativa de enviar '{event}' sem conexão com o servidor")
             return False
@@ -295,14 +630,15 @@ class GameClient:
             'right': keys[pygame.K_d]
         }
         
-        # Envia entrada para o servidor em modo multiplayer
-        if self.game_state == GameState.MULTIPLAYER:
-            self.socket.emit('player_input', movement_input)
-        elif self.game_state == GameState.SINGLEPLAYER:
-            self.handle_local_input(movement_input)
+        # A entrada é aplicada (e, em multiplayer, enviada) a cada passo de simulação em update
+        self.movement_input = movement_input
     
     def handle_keydown(self, event):
         """Processa pressionamento de teclas"""
+        if event.key == pygame.K_F3:
+            # Mostra/esconde as estatísticas de rede no HUD
+            self.show_network_stats = not self.show_network_stats
+            return
         if self.game_state == GameState.MAIN_MENU:
             if event.key == pygame.K_UP:
                 self.selected_option = (self.selected_option - 1) % len(self.menu_options)
@@ -403,11 +739,15 @@ class GameClient:
         start_y = SCREEN_HEIGHT // 2 - 25
         self.local_player = Player(start_x, start_y, size=50, color=(50, 150, 200))
         # Limpa ou inicializa entidades locais
+        self.player_mirror.clear()
+        self.entity_mirror.clear()
         self.entities = []
     
     def initialize_multiplayer(self, server_url: str = None):
         """Inicializa o modo multiplayer; server_url opcional (ex: 'http://localhost:3000')."""
         print("Iniciando modo multiplayer...")
+        # O jogador local é criado com a primeira posição recebida do servidor
+        self.local_player = None
         # se foi passado explicitamente, prioriza
         if server_url is None:
             server_url = os.environ.get('GAME_SERVER_URL', None)
@@ -424,10 +764,9 @@ class GameClient:
             server_url = "http://localhost:3000"
 
         print(f"Tentando conectar em {server_url} ...")
-        try:
-            self.socket.connect(server_url)
-        except Exception as e:
-            print(f"Erro ao conectar ao servidor: {e}")
+        # Uma nova partida sempre cria um jogador novo no servidor
+        self.session.clear()
+        if not connect_with_retry(self.socket, server_url, self.session):
             self.game_state = GameState.MAIN_MENU
 
 
@@ -472,14 +811,25 @@ class GameClient:
             'type': 'attack',
             'target_x': mouse_pos[0],
             'target_y': mouse_pos[1],
-            'timestamp': pygame.time.get_ticks()
+            'timestamp': self.attack_timestamp()
         }
         
         if self.game_state == GameState.MULTIPLAYER:
-            self.socket.emit('player_action', attack_data)
+            self.safe_emit('player_action', attack_data)
         else:
             self.process_attack(attack_data)
     
+    def attack_timestamp(self):
+        """
+        Instante (ms, relógio do servidor) que está sendo desenhado: o servidor resolve o
+        ataque contra as posições desse instante (compensação de latência)
+        None sem estimativa do relógio do servidor (o servidor usa as posições atuais)
+        """
+        server_now = self.server_clock.server_time(time.monotonic())
+        if server_now is None:
+            return None
+        return int((server_now - INTERPOLATION_DELAY) * 1000)
+
     def process_attack(self, attack_data):
         """Processa ataque localmente"""
         # Lógica de ataque para singleplayer
@@ -489,10 +839,10 @@ class GameClient:
             if distance < 50:  # Raio de ataque
                 entity.take_damage(10)
     
-    def handle_local_input(self, movement_input):
-        """Processa entrada para singleplayer"""
+    def handle_local_input(self, movement_input, dt):
+        """Processa entrada para singleplayer (um passo de simulação de duração dt)"""
         if self.local_player:
-            speed = 5
+            speed = PLAYER_SPEED * dt
             if movement_input['up']:
                 self.local_player.y -= speed
             if movement_input['down']:
@@ -506,23 +856,47 @@ class GameClient:
             self.local_player.x = max(0, min(SCREEN_WIDTH - 50, self.local_player.x))
             self.local_player.y = max(0, min(SCREEN_HEIGHT - 50, self.local_player.y))
     
-    def update(self):
-        """Atualiza a lógica do jogo"""
+    def update(self, dt):
+        """Atualiza a lógica do jogo por um passo fixo de simulação (dt em segundos)"""
         if self.game_state == GameState.SINGLEPLAYER:
-            self.update_singleplayer()
+            self.update_singleplayer(dt)
         elif self.game_state == GameState.MULTIPLAYER:
-            self.update_multiplayer()
+            self.update_multiplayer(dt)
     
-    def update_singleplayer(self):
+    def update_singleplayer(self, dt):
         """Atualiza lógica do singleplayer"""
+        if self.local_player:
+            self.local_player.snapshot()
+        self.handle_local_input(self.movement_input, dt)
         for entity in self.entities:
             if hasattr(entity, 'ai_controller'):
                 entity.ai_controller.update()
     
-    def update_multiplayer(self):
-        """Atualiza lógica do multiplayer - o servidor é a autoridade"""
-        # Em multiplayer, o servidor é a autoridade sobre o estado do jogo
-        pass
+    def update_multiplayer(self, dt):
+        """
+        Atualiza lógica do multiplayer - o servidor é a autoridade, mas o movimento do
+        jogador local é previsto imediatamente e corrigido quando o servidor responde
+        """
+        if not self.connected:
+            return
+        now = time.monotonic()
+        # Amostra a entrada deste passo (amostras só mudam quando as teclas mudam)
+        sample = self.input_batcher.sample(self.movement_input, now, dt)
+        if self.local_player:
+            self.local_player.snapshot()
+        self.prediction.predict(sample, dt)
+        position = self.prediction.position
+        if self.local_player and position is not None:
+            self.local_player.x, self.local_player.y = position
+
+        # Envia as amostras pendentes (ou o heartbeat)
+        packet = self.input_batcher.flush(now)
+        if packet is not None:
+            self.safe_emit('player_input', packet)
+        # Mede o RTT periodicamente
+        ping = self.telemetry.make_ping(now)
+        if ping is not None:
+            self.safe_emit('net_ping', ping)
     
     
 
@@ -561,6 +935,7 @@ class GameClient:
     def render_multiplayer(self):
         """Renderiza o modo multiplayer"""
         self.screen.fill((50, 50, 100))  # Cor de fundo
+        self.apply_interpolation()
         # TODO: Implementar renderização do multiplayer
         self.render_game()
 
@@ -597,12 +972,12 @@ class GameClient:
             entity.render(self.screen)
         
         # Renderiza jogadores
-        if self.game_state == GameState.SINGLEPLAYER:
-            if self.local_player:
-                self.local_player.render(self.screen)
-        else:
+        if self.game_state != GameState.SINGLEPLAYER:
             for player_id, player in self.players.items():
                 player.render(self.screen)
+        if self.local_player:
+            # Interpola entre os dois últimos passos de simulação
+            self.local_player.render(self.screen, self.timestep.alpha)
         
         # Renderiza HUD
         self.render_hud()
@@ -611,13 +986,42 @@ class GameClient:
         """Renderiza interface do usuário"""
         fps_text = self.font.render(f"FPS: {int(self.clock.get_fps())}", True, (255, 255, 255))
         self.screen.blit(fps_text, (10, 10))
+        if self.show_network_stats and self.game_state == GameState.MULTIPLAYER:
+            self.render_network_stats()
+
+    def render_network_stats(self):
+        """Sobrepõe ao HUD as medições de rede (RTT, jitter, banda e os eventos mais pesados)"""
+        stats = self.telemetry.summary()
+        rtt = stats['smoothed_rtt_ms']
+        lines = [
+            f"RTT: {'-' if rtt is None else f'{rtt:.0f}'} ms  jitter: {stats['jitter_ms']:.1f} ms",
+            f"In: {stats['received_bytes_per_second'] / 1024:.1f} kB/s  "
+            f"{stats['received_messages_per_second']:.0f} msg/s",
+            f"Out: {stats['sent_bytes_per_second'] / 1024:.1f} kB/s  "
+            f"{stats['sent_messages_per_second']:.0f} msg/s em {stats['sent_packets_per_second']:.0f} pacotes/s",
+            f"Fila: {len(self.inbound)}  descartadas: {self.inbound.dropped}",
+        ]
+        received = sorted(stats['received'].items(), key=lambda item: -item[1]['bytes_per_second'])
+        for event, event_stats in received[:4]:
+            lines.append(f"  {event}: {event_stats['bytes_per_second'] / 1024:.1f} kB/s  "
+                         f"{event_stats['messages_per_second']:.0f}/s  "
+                         f"{event_stats['mean_handle_ms']:.2f} ms")
+        for index, line in enumerate(lines):
+            text = self.font.render(line, True, (255, 255, 0))
+            self.screen.blit(text, (10, 40 + index * 26))
     
     def run(self):
         """Loop principal do jogo"""
         while self.running:
-            self.clock.tick(FPS)  # Controla a taxa de quadros :cite[4]
+            # Limita a taxa de quadros e mede o tempo real do frame :cite[4]
+            frame_dt = self.clock.tick(FPS) / 1000.0
             self.handle_events()
-            self.update()
+            # Aplica as mensagens do servidor recebidas desde o último frame
+            self.process_network_messages()
+            # Executa zero ou mais passos fixos de simulação para o tempo decorrido
+            self.timestep.advance(frame_dt, self.update)
+            # Envia o que foi enfileirado neste frame (entrada, ações, confirmações, ping)
+            self.flush_network_messages()
             self.render()
         
         pygame.quit()
@@ -13,6 +13,7 @@ const express = require('express');
 const http = require('http');
 const socketIo = require('socket.io');
 const path = require('path');
+const crypto = require('crypto');
 const { Sequelize, DataTypes } = require('sequelize');
 const PORT = process.env.PORT || 3000;
 // HOST configurável: '127.0.0.1' para localhost-only, '0.0.0.0' para aceitar conexões da LAN
@@ -76,11 +77,241 @@ let gameState = {
   lastUpdate: Date.now()
 };
 
+// Velocidade dos jogadores (pixels por segundo)
+const PLAYER_SPEED = 300;
+// Estado de entrada sem nenhuma tecla pressionada
+const IDLE_INPUT = { up: false, down: false, left: false, right: false };
+// Sem pacotes de entrada (nem heartbeat) por este tempo, o jogador para (ms)
+const INPUT_TIMEOUT = 2000;
+// Tempo de simulação máximo que um cliente pode acumular para suas amostras (ms);
+// limita clientes que enviam mais passos do que o tempo real permite
+const MAX_INPUT_BUDGET = 1000;
+// Máximo de passos de uma amostra (1 s a 60 Hz): o orçamento limita o tempo simulado, não
+// o número de iterações, e uma amostra com dt minúsculo travaria o tick
+const MAX_SAMPLE_STEPS = 60;
+// Limites da posição dos jogadores
+const PLAYER_MAX_X = 800 - 50;
+const PLAYER_MAX_Y = 600 - 50;
+
+// Aplica os passos de uma amostra de entrada ao jogador
+// Deve ser idêntico a apply_input (client/game/networking/prediction.py), que o cliente
+// usa para prever o próprio movimento e reaplicar amostras ainda não confirmadas
+function applyInputSample(player, sample) {
+  let directionX = (sample.right ? 1 : 0) - (sample.left ? 1 : 0);
+  let directionY = (sample.down ? 1 : 0) - (sample.up ? 1 : 0);
+  // Diagonal normalizada, como em MovementComponent.move
+  if (directionX !== 0 && directionY !== 0) {
+    directionX *= 0.7071;
+    directionY *= 0.7071;
+  }
+  const velocityX = directionX * PLAYER_SPEED;
+  const velocityY = directionY * PLAYER_SPEED;
+  const dt = Number(sample.dt);
+  if (!(dt > 0)) return;
+
+  // Só aplica os passos cobertos pelo tempo acumulado do cliente
+  const budgetSteps = Math.floor(player.inputBudget / (dt * 1000) + 1e-6);
+  const steps = Math.min(Math.max(0, Math.floor(Number(sample.steps) || 0)), budgetSteps, MAX_SAMPLE_STEPS);
+  player.inputBudget -= steps * dt * 1000;
+
+  for (let i = 0; i < steps; i++) {
+    player.x += velocityX * dt;
+    player.y += velocityY * dt;
+    player.x = Math.max(0, Math.min(PLAYER_MAX_X, player.x));
+    player.y = Math.max(0, Math.min(PLAYER_MAX_Y, player.y));
+  }
+}
+
 // Geração de ID único
 function generateId() {
   return Math.random().toString(36).substr(2, 9);
 }
 
+// Frequência da simulação e do envio de estado aos clientes (por segundo)
+// Os clientes interpolam entre estados, então o envio pode ser menor que a simulação
+const TICK_RATE = 60;
+const SEND_RATE = Math.min(TICK_RATE, Number(process.env.SEND_RATE) || TICK_RATE);
+// Número de ticks entre dois envios
+const SEND_EVERY = Math.max(1, Math.round(TICK_RATE / SEND_RATE));
+let tickCount = 0;
+// Eventos que não podem chegar dentro de um pacote 'batch'
+const RESERVED_EVENTS = new Set(['batch', 'connect', 'connection', 'disconnect', 'disconnecting', 'error']);
+// Duração (ms) dos ticks recentes, lida pelo gerador de carga com 'server_stats' (~10 s)
+const TICK_HISTORY = 600;
+const tickTimes = [];
+
+// Sincronização por delta
+// Número de snapshots guardados como possíveis bases de delta (~1 s a 60 Hz)
+const SNAPSHOT_HISTORY = 64;
+// Campos enviados pela rede para jogadores e entidades
+const PLAYER_FIELDS = ['x', 'y', 'health', 'score', 'size', 'color', 'lastInputSeq'];
+const ENTITY_FIELDS = ['type', 'x', 'y', 'health', 'size', 'color'];
+// Sequência do snapshot atual
+let stateSeq = 0;
+// Snapshots recentes (seq -> {players, entities})
+const snapshots = new Map();
+// Clientes em modo delta (socket.id -> último snapshot confirmado, ou null)
+const deltaClients = {};
+
+// Compensação de latência: posições das entidades nos últimos ticks (buffer circular,
+// ~0.5 s a 60 Hz); os ataques são resolvidos no tick mais próximo do instante que o cliente
+// estava desenhando (client/game/server/lag_compensation.py)
+const REWIND_HISTORY = 32;
+// Tick -> {time, positions: [x0, y0, x1, y1, ...] na ordem de gameState.entities}
+const positionHistory = new Array(REWIND_HISTORY).fill(null);
+let historyHead = 0;
+
+// Grava as posições das entidades deste tick (reaproveita o array do tick sobrescrito)
+function recordPositions() {
+  const entities = gameState.entities;
+  let frame = positionHistory[historyHead];
+  if (!frame || frame.positions.length !== entities.length * 2) {
+    frame = positionHistory[historyHead] = { time: 0, positions: new Float64Array(entities.length * 2) };
+  }
+  frame.time = gameState.lastUpdate;
+  for (let index = 0; index < entities.length; index++) {
+    frame.positions[index * 2] = entities[index].x;
+    frame.positions[index * 2 + 1] = entities[index].y;
+  }
+  historyHead = (historyHead + 1) % REWIND_HISTORY;
+}
+
+// Tick gravado mais próximo de um instante (ms), ou null
+function positionsAt(time) {
+  let best = null;
+  for (const frame of positionHistory) {
+    if (frame && (!best || Math.abs(frame.time - time) < Math.abs(best.time - time))) best = frame;
+  }
+  return best;
+}
+
+// Sessões: depois de uma queda o jogador fica no mundo por RESUME_TIMEOUT ms, e uma nova
+// conexão que apresente no handshake o id e o token dele o retoma
+// (client/game/networking/session.py)
+const RESUME_TIMEOUT = 10000;
+// Id do jogador -> {token, socketId (null enquanto espera ser retomado), timer}
+const sessions = {};
+
+// Retoma a sessão apresentada no handshake ({player_id, token, ...}); null se inválida ou expirada
+function resumeSession(auth) {
+  if (!auth || typeof auth.token !== 'string') return null;
+  const session = sessions[auth.player_id];
+  if (!session || !gameState.players[auth.player_id]) return null;
+  const expected = Buffer.from(session.token);
+  const given = Buffer.from(auth.token);
+  if (expected.length !== given.length || !crypto.timingSafeEqual(expected, given)) return null;
+  return session;
+}
+
+// Arredonda posições para 2 casas (evita enviar ruído de ponto flutuante)
+function quantize(value) {
+  return typeof value === 'number' ? Math.round(value * 100) / 100 : value;
+}
+
+// Converte uma coleção em id -> campos de rede
+function snapshotCollection(items, fields) {
+  const snapshot = {};
+  for (const item of items) {
+    // Entidades sem id recebem um na primeira sincronização
+    if (item.id === undefined) item.id = generateId();
+    snapshot[item.id] = networkFields(item, fields);
+  }
+  return snapshot;
+}
+
+// Campos de rede de um jogador ou entidade (sem o estado interno: entrada, IA, orçamento)
+function networkFields(item, fields) {
+  const state = {};
+  for (const field of fields) {
+    if (item[field] !== undefined) state[field] = quantize(item[field]);
+  }
+  return state;
+}
+
+// Estado completo no formato de 'game_state' (mesmo do servidor Python: full_state)
+function fullState() {
+  const snapshot = takeSnapshot();
+  const players = {};
+  for (const [id, fields] of Object.entries(snapshot.players)) players[id] = { ...fields, id };
+  const entities = Object.entries(snapshot.entities).map(([id, fields]) => ({ ...fields, id }));
+  return { players, entities, lastUpdate: gameState.lastUpdate };
+}
+
+// Captura o estado atual do jogo (apenas os campos de rede)
+function takeSnapshot() {
+  return {
+    players: snapshotCollection(Object.values(gameState.players), PLAYER_FIELDS),
+    entities: snapshotCollection(gameState.entities, ENTITY_FIELDS)
+  };
+}
+
+function sameValue(a, b) {
+  if (a === b) return true;
+  if (Array.isArray(a) && Array.isArray(b)) {
+    return a.length === b.length && a.every((value, i) => value === b[i]);
+  }
+  return false;
+}
+
+// Diferença de uma coleção entre a base (pode ser undefined) e o estado atual
+function diffCollection(baseline, current) {
+  const created = {};
+  const changed = {};
+  const removed = [];
+  let hasCreated = false;
+  let hasChanged = false;
+
+  for (const id in current) {
+    const fields = current[id];
+    const previous = baseline ? baseline[id] : undefined;
+    if (previous === undefined) {
+      created[id] = fields;
+      hasCreated = true;
+      continue;
+    }
+    let diff = null;
+    for (const key in fields) {
+      if (!sameValue(fields[key], previous[key])) {
+        if (!diff) diff = {};
+        diff[key] = fields[key];
+      }
+    }
+    if (diff) {
+      changed[id] = diff;
+      hasChanged = true;
+    }
+  }
+  if (baseline) {
+    for (const id in baseline) {
+      if (!(id in current)) removed.push(id);
+    }
+  }
+
+  // Partes vazias são omitidas
+  const delta = {};
+  if (hasCreated) delta.created = created;
+  if (hasChanged) delta.changed = changed;
+  if (removed.length) delta.removed = removed;
+  return delta;
+}
+
+// Monta a mensagem de delta de 'snapshot' em relação ao snapshot 'baselineSeq'
+// (sem base conhecida, envia o estado completo com baseline null)
+function encodeDelta(snapshot, baselineSeq) {
+  const baseline = baselineSeq === null ? undefined : snapshots.get(baselineSeq);
+  const message = {
+    seq: stateSeq,
+    baseline: baseline ? baselineSeq : null,
+    // Instante do snapshot no servidor (ms), usado pelos clientes para interpolar
+    timestamp: gameState.lastUpdate
+  };
+  for (const name of ['players', 'entities']) {
+    const delta = diffCollection(baseline && baseline[name], snapshot[name]);
+    if (Object.keys(delta).length) message[name] = delta;
+  }
+  return message;
+}
+
 // Sistema de IA para entidades não controláveis
 class AIController {
   constructor(entity) {
@@ -165,55 +396,156 @@ class AIController {
 
 // Manipuladores de Socket.IO
 io.on('connection', (socket) => {
-  console.log('Novo cliente conectado:', socket.id);
-  
-  // Adiciona jogador ao estado do jogo
-  gameState.players[socket.id] = {
-    id: socket.id,
-    x: Math.random() * 400 + 200,
-    y: Math.random() * 400 + 100,
-    health: 100,
-    score: 0
-  };
-  
-  // Envia estado inicial para o novo cliente
-  socket.emit('game_state', gameState);
-  
-  // Notifica outros jogadores
-  socket.broadcast.emit('player_joined', gameState.players[socket.id]);
+  const auth = socket.handshake.auth;
+  let session = resumeSession(auth);
+  // Jogador desta conexão (o id da primeira conexão dele)
+  let playerId;
+  if (session) {
+    playerId = auth.player_id;
+    console.log('Cliente retomou a sessão', playerId + ':', socket.id);
+    clearTimeout(session.timer);
+    session.timer = null;
+    // A conexão antiga ainda não caiu do lado do servidor: a nova a substitui
+    const replaced = session.socketId && io.sockets.sockets.get(session.socketId);
+    session.socketId = socket.id;
+    if (replaced) replaced.disconnect(true);
+    socket.emit('session', { player_id: playerId, token: session.token, resumed: true });
+    if (auth.mode === 'delta') {
+      // O próximo delta parte do último snapshot confirmado, se ainda estiver no histórico
+      deltaClients[socket.id] = snapshots.has(auth.seq) ? auth.seq : null;
+      socket.join('delta');
+    } else {
+      socket.emit('game_state', fullState());
+    }
+  } else {
+    console.log('Novo cliente conectado:', socket.id);
+    playerId = socket.id;
+    session = sessions[playerId] = {
+      token: crypto.randomBytes(16).toString('hex'),
+      socketId: socket.id,
+      timer: null
+    };
+
+    // Adiciona jogador ao estado do jogo
+    gameState.players[playerId] = {
+      id: playerId,
+      x: Math.random() * 400 + 200,
+      y: Math.random() * 400 + 100,
+      health: 100,
+      score: 0,
+      // Teclas pressionadas (aplicadas a cada tick) e sequência da última amostra recebida
+      input: { ...IDLE_INPUT },
+      lastInputSeq: 0,
+      lastInputAt: Date.now(),
+      inputBudget: MAX_INPUT_BUDGET
+    };
+
+    socket.emit('session', { player_id: playerId, token: session.token, resumed: false });
+    // Envia estado inicial para o novo cliente
+    socket.emit('game_state', fullState());
+    // Notifica outros jogadores
+    socket.broadcast.emit('player_joined', {
+      id: playerId,
+      player: networkFields(gameState.players[playerId], PLAYER_FIELDS)
+    });
+  }
+
+  // Cliente pede atualizações por delta em vez do estado completo
+  socket.on('state_mode', (data) => {
+    if (data && data.mode === 'delta') {
+      deltaClients[socket.id] = null;
+      socket.join('delta');
+    } else {
+      delete deltaClients[socket.id];
+      socket.leave('delta');
+    }
+  });
+
+  // Cliente confirma o último snapshot aplicado (passa a ser a base dos próximos deltas)
+  socket.on('state_ack', (data) => {
+    if (socket.id in deltaClients && data && snapshots.has(data.seq)) {
+      const acked = deltaClients[socket.id];
+      if (acked === null || data.seq > acked) deltaClients[socket.id] = data.seq;
+    }
+  });
+
+  // Cliente perdeu a base: o próximo delta leva o estado completo
+  socket.on('state_resync', () => {
+    if (socket.id in deltaClients) deltaClients[socket.id] = null;
+  });
+
+  // Medição de RTT: devolve o ping imediatamente, sem esperar o tick
+  socket.on('net_ping', (data) => {
+    socket.emit('net_pong', data);
+  });
+
+  // Várias mensagens de um frame do cliente em um só pacote
+  // (client/game/networking/outbound_queue.py): cada uma vai para o seu manipulador, em ordem
+  socket.on('batch', (batch) => {
+    if (!batch || !Array.isArray(batch.messages)) return;
+    for (const entry of batch.messages) {
+      if (!Array.isArray(entry) || entry.length !== 2 || RESERVED_EVENTS.has(entry[0])) continue;
+      for (const listener of socket.listeners(entry[0])) listener(entry[1]);
+    }
+  });
+
+  // Estatísticas do servidor para o gerador de carga (client/game/load_generator.py)
+  socket.on('server_stats', () => {
+    socket.emit('server_stats', serverStats());
+  });
   
   // Manipula entrada do jogador
+  // O cliente envia amostras apenas quando as teclas mudam ({samples: [...]}, com seq e
+  // timestamp) e um heartbeat ocasional. Amostras com dt/steps são aplicadas na hora, passo
+  // a passo (o cliente prevê o mesmo resultado e reconcilia com lastInputSeq); as demais
+  // definem as teclas pressionadas, aplicadas a cada tick
   socket.on('player_input', (inputData) => {
-    if (gameState.players[socket.id]) {
-      const player = gameState.players[socket.id];
-      const speed = 5;
-      
-      // Atualiza posição baseada na entrada
-      if (inputData.up) player.y -= speed;
-      if (inputData.down) player.y += speed;
-      if (inputData.left) player.x -= speed;
-      if (inputData.right) player.x += speed;
-      
-      // Mantém o jogador dentro dos limites
-      player.x = Math.max(0, Math.min(800 - 50, player.x));
-      player.y = Math.max(0, Math.min(600 - 50, player.y));
+    const player = gameState.players[playerId];
+    if (!player || !inputData) return;
+    player.lastInputAt = Date.now();
+
+    // Compat: clientes antigos enviam o estado das teclas diretamente
+    const samples = Array.isArray(inputData.samples) ? inputData.samples : [inputData];
+    for (const sample of samples) {
+      if (!sample || typeof sample !== 'object') continue;
+      // Ignora amostras repetidas ou fora de ordem
+      if (sample.seq !== undefined) {
+        if (sample.seq <= player.lastInputSeq) continue;
+        player.lastInputSeq = sample.seq;
+      }
+      if (sample.steps !== undefined) {
+        player.input = null;
+        applyInputSample(player, sample);
+        continue;
+      }
+      player.input = {
+        up: !!sample.up,
+        down: !!sample.down,
+        left: !!sample.left,
+        right: !!sample.right
+      };
     }
   });
   
   // Manipula ações do jogador (ataques)
   socket.on('player_action', (actionData) => {
+    const player = gameState.players[playerId];
+    if (!player || !actionData) return;
     if (actionData.type === 'attack') {
+      // Posições do instante que o cliente estava desenhando (sem timestamp: as atuais)
+      const frame = typeof actionData.timestamp === 'number' ? positionsAt(actionData.timestamp) : null;
       // Verifica se acertou alguma entidade
-      gameState.entities.forEach(entity => {
-        const dx = entity.x - actionData.target_x;
-        const dy = entity.y - actionData.target_y;
+      gameState.entities.forEach((entity, index) => {
+        const rewound = frame !== null && index * 2 < frame.positions.length;
+        const dx = (rewound ? frame.positions[index * 2] : entity.x) - actionData.target_x;
+        const dy = (rewound ? frame.positions[index * 2 + 1] : entity.y) - actionData.target_y;
         const distance = Math.sqrt(dx * dx + dy * dy);
         
         if (distance < 50) { // Raio de ataque
           entity.health -= 10;
           if (entity.health <= 0) {
             // Entidade derrotada
-            gameState.players[socket.id].score += 10;
+            player.score += 10;
           }
         }
       });
@@ -223,17 +555,68 @@ io.on('connection', (socket) => {
   // Manipula desconexão
   socket.on('disconnect', () => {
     console.log('Cliente desconectado:', socket.id);
-    delete gameState.players[socket.id];
-    socket.broadcast.emit('player_left', socket.id);
+    delete deltaClients[socket.id];
+    // Conexão substituída por uma reconexão: o jogador continua com a nova
+    if (session.socketId !== socket.id) return;
+    // O jogador fica no mundo até a sessão expirar
+    session.socketId = null;
+    session.timer = setTimeout(() => {
+      console.log('Jogador removido (sessão expirada):', playerId);
+      delete sessions[playerId];
+      delete gameState.players[playerId];
+      io.emit('player_left', { id: playerId });
+    }, RESUME_TIMEOUT);
   });
 });
 
-// Loop de atualização do jogo
-setInterval(() => {
+// Resumo dos tempos de tick recentes (mesmo formato do servidor Python)
+function serverStats() {
+  const values = [...tickTimes].sort((a, b) => a - b);
+  const count = values.length;
+  const at = (fraction) => (count ? values[Math.min(count - 1, Math.floor(count * fraction))] : 0);
+  return {
+    server: 'node',
+    tick_rate: TICK_RATE,
+    tick_count: tickCount,
+    players: Object.keys(gameState.players).length,
+    tick_ms: {
+      count,
+      mean: count ? values.reduce((sum, value) => sum + value, 0) / count : 0,
+      p50: at(0.5),
+      p95: at(0.95),
+      p99: at(0.99),
+      max: count ? values[count - 1] : 0
+    }
+  };
+}
+
+// Atualização do jogo (um tick)
+function updateGame() {
   const now = Date.now();
   const deltaTime = now - gameState.lastUpdate;
   gameState.lastUpdate = now;
   
+  // Move os jogadores de acordo com as teclas pressionadas
+  const step = PLAYER_SPEED * deltaTime / 1000;
+  for (const playerId in gameState.players) {
+    const player = gameState.players[playerId];
+    player.inputBudget = Math.min(MAX_INPUT_BUDGET, player.inputBudget + deltaTime);
+    const input = player.input;
+    if (!input) continue;
+    if (now - player.lastInputAt > INPUT_TIMEOUT) {
+      player.input = { ...IDLE_INPUT };
+      continue;
+    }
+    if (input.up) player.y -= step;
+    if (input.down) player.y += step;
+    if (input.left) player.x -= step;
+    if (input.right) player.x += step;
+
+    // Mantém o jogador dentro dos limites
+    player.x = Math.max(0, Math.min(PLAYER_MAX_X, player.x));
+    player.y = Math.max(0, Math.min(PLAYER_MAX_Y, player.y));
+  }
+
   // Atualiza entidades com IA
   gameState.entities.forEach(entity => {
     if (entity.aiController) {
@@ -241,9 +624,48 @@ setInterval(() => {
     }
   });
   
-  // Envia atualização de estado para todos os clientes
-  io.emit('game_state_update', gameState);
-}, 1000 / 60); // 60 updates por segundo
+  recordPositions();
+
+  // Envia o estado apenas a cada SEND_EVERY ticks
+  tickCount++;
+  if (tickCount % SEND_EVERY !== 0) return;
+
+  // Clientes sem delta recebem o estado completo
+  io.except('delta').emit('game_state_update', fullState());
+
+  // Clientes em modo delta recebem apenas o que mudou desde o último snapshot confirmado
+  const clientIds = Object.keys(deltaClients);
+  if (clientIds.length) {
+    stateSeq++;
+    const snapshot = takeSnapshot();
+    snapshots.set(stateSeq, snapshot);
+    snapshots.delete(stateSeq - SNAPSHOT_HISTORY);
+
+    // Clientes com a mesma base compartilham a mesma mensagem
+    const messages = new Map();
+    for (const id of clientIds) {
+      let baselineSeq = deltaClients[id];
+      if (baselineSeq !== null && !snapshots.has(baselineSeq)) {
+        // Base antiga demais: volta ao estado completo
+        baselineSeq = deltaClients[id] = null;
+      }
+      let message = messages.get(baselineSeq);
+      if (!message) {
+        message = encodeDelta(snapshot, baselineSeq);
+        messages.set(baselineSeq, message);
+      }
+      io.to(id).emit('game_state_delta', message);
+    }
+  }
+}
+
+// Loop de atualização do jogo
+setInterval(() => {
+  const start = performance.now();
+  updateGame();
+  tickTimes.push(performance.now() - start);
+  if (tickTimes.length > TICK_HISTORY) tickTimes.shift();
+}, 1000 / TICK_RATE); // TICK_RATE updates por segundo
 
 // Inicia o servidor :cite[7]
 server.listen(PORT, HOST, () => {